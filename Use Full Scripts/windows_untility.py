@@ -6722,6 +6722,7 @@ from threading import Thread
 import threading
 import re
 import psutil
+import numpy
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import platform
@@ -6741,6 +6742,45 @@ try:
 except ImportError:
     pass  # Handle later in the code
 
+# Shared engine modules live in the windowsutilities folder
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "windowsutilities"))
+from folder_scanner import FolderScanner, ScanProgress
+from folder_index import FolderIndex
+from metrics_store import MetricsStore
+from chart_renderer import BlitRenderer
+from powershell_pool import PowerShellError, get_default_pool
+from cleanup_engine import CleanupEngine, CleanupTarget, RateLimiter
+from cleanup_plan import CleanupPlan
+from tombstone_reaper import get_default_reaper
+from browser_data import BrowserDataEngine, discover_profiles, summarize, CACHE, COOKIES, HISTORY
+from process_control import close_programs
+from network_probe import ProbeEngine, format_summary, split_hosts, PING, TRACEROUTE
+from latency_prober import LatencyProber, format_row
+from dns_resolver import get_default_resolver, format_results, FORWARD, OK
+
+# Temp cleanup: targets cleaned at once, and files deleted per second (0 = no limit)
+TEMP_CLEANUP_WORKERS = 4
+TEMP_CLEANUP_FILES_PER_SECOND = 0
+
+# Categories the cleanup planner can scan, in display order
+CLEANUP_PLAN_CATEGORIES = ["Temporary Files", "Windows Cache", "Windows Update Files", "Browser Cache"]
+
+# Hosts the Network tab probes at once
+NETWORK_PROBE_CONCURRENCY = 16
+
+# Latency monitor: seconds between probes of a target, seconds before a probe
+# counts as lost, and how often the statistics table is redrawn (ms)
+LATENCY_PROBE_INTERVAL = 1.0
+LATENCY_PROBE_TIMEOUT = 1.0
+LATENCY_REFRESH_MS = 1000
+
+# Columns of the latency monitor table: (id, heading, width); the last error comes after format_row()'s cells
+LATENCY_COLUMNS = [("target", "Target", 200), ("sent", "Sent", 60), ("loss", "Loss", 70), ("p50", "p50", 70),
+                   ("p95", "p95", 70), ("p99", "p99", 70), ("jitter", "Jitter", 70), ("error", "Last Error", 260)]
+
+# Process image of each browser the browser data engine cleans
+BROWSER_PROCESSES = {'Chrome': "chrome.exe", 'Edge': "msedge.exe", 'Firefox': "firefox.exe"}
+
 # Set better UI fonts and colors
 HEADING_FONT = ('Segoe UI', 12, 'bold')
 NORMAL_FONT = ('Segoe UI', 10)
@@ -6762,6 +6802,9 @@ SUCCESS_BG = "#d4edda"
 SUCCESS_FG = "#155724"
 LOG_BG = "#f8f9fa"
 
+# Refresh interval of the folder analysis view while a scan is running
+FOLDER_SCAN_FRAME_MS = 250
+
 # Thread safety lock for UI updates
 ui_lock = threading.Lock()
 
@@ -6987,6 +7030,14 @@ class SystemUtilities:
         self.log("System Utilities initialized successfully", "info")
         self.update_status("Ready")
         
+        # Folders left half-deleted by the last session are deleted again in the background
+        reaper = get_default_reaper()
+        reaper.on_change = self._on_reaper_change
+        reaper_stats = reaper.stats()
+        if reaper_stats['pending']:
+            self.log(f"Resuming background deletion of {reaper_stats['pending']} folders from the last session")
+        self._show_reaper_status(reaper_stats)
+        
         # Start background system monitoring for detailed logging
         self.start_background_monitoring()
         
@@ -7693,8 +7744,11 @@ Do you want to restart as administrator?"):
         self.create_button(additional_cleanup_frame, "Clean Browser Data", 
                           lambda: self.clean_browser_data(), 0, 1)
         
+        self.create_button(additional_cleanup_frame, "Plan Cleanup", 
+                          lambda: self.plan_cleanup(), 0, 2)
+        
         self.create_button(additional_cleanup_frame, "Full System Cleanup", 
-                          lambda: self.full_system_cleanup(), 0, 2, is_primary=True)
+                          lambda: self.full_system_cleanup(), 0, 3, is_primary=True)
         
         # Description area for cleanup tab
         desc_frame = ttk.LabelFrame(frame, text="Description", padding=10, style='Group.TLabelframe')
@@ -7707,6 +7761,10 @@ Do you want to restart as administrator?"):
         self.cleanup_desc_text.pack(fill=tk.BOTH, expand=True)
         self.cleanup_desc_text.config(state=tk.DISABLED)
         
+        # Backlog of folders being deleted in the background
+        self.reaper_status_var = tk.StringVar(value="Background deletion: idle")
+        ttk.Label(frame, textvariable=self.reaper_status_var).grid(column=0, row=3, columnspan=2, sticky=tk.W, padx=5, pady=(5, 0))
+        
         # Configure grid weights
         frame.columnconfigure(0, weight=2)
         frame.columnconfigure(1, weight=3)
@@ -8166,92 +8224,47 @@ pause
         self.log("Refreshing Windows Update status...")
         
         try:
-            # Use PowerShell to get update service status
-            ps_command = [
-                "powershell", 
-                "-Command", 
-                "(Get-Service -Name wuauserv).Status"
-            ]
-            
-            process = subprocess.Popen(
-                ps_command, 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
+            # One request to the shared PowerShell workers instead of up to three cold starts
+            au_key = "HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows\\WindowsUpdate\\AU"
+            try:
+                result = get_default_pool().run(
+                    "$au = Get-ItemProperty -Path '" + au_key + "' -ErrorAction SilentlyContinue; "
+                    "[pscustomobject]@{ "
+                    "Service = \"$((Get-Service -Name wuauserv).Status)\"; "
+                    "NoAutoUpdate = $au.NoAutoUpdate; "
+                    "AUOptions = $au.AUOptions }",
+                    timeout=10
+                )
+            except PowerShellError as e:
+                self.log(f"PowerShell error: {str(e)}", "warning")
+                result = []
             
-            stdout, stderr = process.communicate(timeout=10)
+            settings = result[0] if result else {}
+            service_status = settings.get('Service')
             
-            if process.returncode == 0 and stdout.strip():
-                service_status = stdout.strip()
-                
-                # Now check update settings using registry
-                ps_registry_command = [
-                    "powershell",
-                    "-Command",
-                    "Get-ItemProperty -Path 'HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows\\WindowsUpdate\\AU' -Name 'NoAutoUpdate' -ErrorAction SilentlyContinue | Select-Object -ExpandProperty NoAutoUpdate"
-                ]
+            if service_status:
+                no_auto_update = settings.get('NoAutoUpdate')
+                au_option = settings.get('AUOptions')
                 
-                registry_process = subprocess.Popen(
-                    ps_registry_command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-                
-                reg_stdout, reg_stderr = registry_process.communicate(timeout=10)
-                
-                # Determine update policy based on registry value
-                if registry_process.returncode == 0 and reg_stdout.strip():
-                    try:
-                        no_auto_update = int(reg_stdout.strip())
-                        if no_auto_update == 1:
-                            policy_status = "Disabled"
-                            self.update_config_var.set("disable")
-                        else:
-                            # Check for AUOptions value
-                            ps_au_command = [
-                                "powershell",
-                                "-Command",
-                                "Get-ItemProperty -Path 'HKLM:\\SOFTWARE\\Policies\\Microsoft\\Windows\\WindowsUpdate\\AU' -Name 'AUOptions' -ErrorAction SilentlyContinue | Select-Object -ExpandProperty AUOptions"
-                            ]
-                            
-                            au_process = subprocess.Popen(
-                                ps_au_command,
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                text=True,
-                                creationflags=subprocess.CREATE_NO_WINDOW
-                            )
-                            
-                            au_stdout, au_stderr = au_process.communicate(timeout=10)
-                            
-                            if au_process.returncode == 0 and au_stdout.strip():
-                                try:
-                                    au_option = int(au_stdout.strip())
-                                    if au_option == 2:
-                                        policy_status = "Notify Only"
-                                        self.update_config_var.set("notify")
-                                    elif au_option == 3:
-                                        policy_status = "Download Only"
-                                        self.update_config_var.set("download")
-                                    else:
-                                        policy_status = "Microsoft Managed"
-                                        self.update_config_var.set("default")
-                                except ValueError:
-                                    policy_status = "Microsoft Managed (Default)"
-                                    self.update_config_var.set("default")
-                            else:
-                                policy_status = "Microsoft Managed (Default)"
-                                self.update_config_var.set("default")
-                    except ValueError:
-                        policy_status = "Unknown"
-                        self.update_config_var.set("default")
-                else:
+                # Determine update policy based on the registry values
+                if no_auto_update is None:
+                    policy_status = "Microsoft Managed (Default)"
+                    self.update_config_var.set("default")
+                elif no_auto_update == 1:
+                    policy_status = "Disabled"
+                    self.update_config_var.set("disable")
+                elif au_option == 2:
+                    policy_status = "Notify Only"
+                    self.update_config_var.set("notify")
+                elif au_option == 3:
+                    policy_status = "Download Only"
+                    self.update_config_var.set("download")
+                elif au_option is None:
                     policy_status = "Microsoft Managed (Default)"
                     self.update_config_var.set("default")
+                else:
+                    policy_status = "Microsoft Managed"
+                    self.update_config_var.set("default")
                 
                 # Update the status label
                 status_text = f"Service Status: {service_status}, Policy: {policy_status}"
@@ -8731,6 +8744,21 @@ echo.
         self.create_button(analysis_frame, "Analyze Folder", 
                           lambda: self.analyze_folder(), 0, 2, columnspan=2, is_primary=True)
         
+        self.create_button(analysis_frame, "Full Rescan", 
+                          lambda: self.analyze_folder(full_rescan=True), 1, 2)
+        
+        self.cancel_analysis_button = self.create_button(analysis_frame, "Cancel", 
+                          lambda: self.cancel_folder_analysis(), 1, 3)
+        self.cancel_analysis_button.state(['disabled'])
+        self.folder_scanner = None
+        
+        # Folder sizes from previous analyses, so repeat scans only revisit changed folders
+        try:
+            self.folder_index = FolderIndex()
+        except Exception as e:
+            self.folder_index = None
+            self.log(f"Folder size index unavailable, analyses will rescan everything: {str(e)}", "warning")
+        
         # Add a separator
         ttk.Separator(analysis_frame, orient='horizontal').grid(column=0, row=3, columnspan=2, sticky=tk.EW, pady=10)
         
@@ -8749,6 +8777,9 @@ echo.
         self.folder_results_tree.column("size", width=100)
         self.folder_results_tree.column("percent", width=100)
         
+        # Subfolders are filled in from the scan result when expanded
+        self.folder_results_tree.bind("<<TreeviewOpen>>", self.on_folder_result_open)
+        
         # Scrollbar for results
         results_scrollbar = ttk.Scrollbar(analysis_frame, orient="vertical", command=self.folder_results_tree.yview)
         results_scrollbar.grid(column=2, row=5, sticky=tk.NS, pady=5)
@@ -8979,7 +9010,7 @@ echo.
         if folder_path:
             self.folder_path_var.set(folder_path)
     
-    def analyze_folder(self):
+    def analyze_folder(self, full_rescan=False):
         """Analyze the selected folder for storage usage"""
         folder_path = self.folder_path_var.get()
         
@@ -8987,98 +9018,189 @@ echo.
             messagebox.showinfo("Invalid Path", "Please select a valid folder to analyze.")
             return
         
+        if self.folder_scanner is not None:
+            messagebox.showinfo("Analysis Running", "A folder analysis is already running.")
+            return
+        
+        # Drop the cached sizes so every folder is listed again
+        if full_rescan and self.folder_index is not None:
+            self.folder_index.clear(os.path.abspath(folder_path))
+        
         self.log(f"Analyzing folder: {folder_path}...")
         self.update_status(f"Analyzing folder: {folder_path}...")
         
+        # Clear previous results
+        self.folder_results_tree.delete(*self.folder_results_tree.get_children())
+        
+        # Reuse the indexed totals of folders that did not change
+        self.folder_scanner = FolderScanner(index=self.folder_index)
+        self._folder_snapshot = None
+        self._folder_snapshot_shown = None
+        self._folder_view_frame = 0
+        self.cancel_analysis_button.state(['!disabled'])
+        
         # Start analysis in a thread
-        analysis_thread = Thread(target=self._analyze_folder_thread, args=(folder_path,))
+        analysis_thread = Thread(target=self._analyze_folder_thread, args=(folder_path, self.folder_scanner))
         analysis_thread.daemon = True
         analysis_thread.start()
+        
+        # Refresh the view at a fixed rate while the sizes converge
+        self.root.after(FOLDER_SCAN_FRAME_MS, self._refresh_folder_analysis_view)
     
-    def _analyze_folder_thread(self, folder_path):
+    def cancel_folder_analysis(self):
+        """Stop the running folder analysis"""
+        if self.folder_scanner is not None:
+            self.folder_scanner.cancel()
+            self.cancel_analysis_button.state(['disabled'])
+            self.update_status("Cancelling folder analysis...")
+    
+    def _analyze_folder_thread(self, folder_path, scanner):
         """Thread to analyze folder storage usage"""
         try:
-            # Clear previous results
-            self.root.after(0, lambda: self.folder_results_tree.delete(*self.folder_results_tree.get_children()))
-            
-            # Get the total size of the folder
-            total_size = self._get_folder_size(folder_path)
-            if total_size == 0:
-                self.root.after(0, lambda: messagebox.showinfo("Empty Folder", 
-                                                            f"The folder '{folder_path}' is empty or cannot be analyzed."))
-                return
-            
-            # Get the top-level subfolders and their sizes
-            self.root.after(0, lambda: self.log(f"Getting subfolder sizes for {folder_path}..."))
-            
-            # Get all immediate subfolders
-            subfolders = []
-            files_size = 0
-            
-            for item in os.listdir(folder_path):
-                item_path = os.path.join(folder_path, item)
-                
-                if os.path.isdir(item_path):
-                    # For directories, calculate size and add to list
-                    size = self._get_folder_size(item_path)
-                    subfolders.append((item_path, item, size))
-                elif os.path.isfile(item_path):
-                    # For files, add to files_size
-                    try:
-                        files_size += os.path.getsize(item_path)
-                    except:
-                        pass
-            
-            # Sort by size (largest first)
-            subfolders.sort(key=lambda x: x[2], reverse=True)
-            
-            # Display the results
-            folder_name = os.path.basename(folder_path) or folder_path
-            
-            # Add the root folder
-            root_id = self.root.after(0, lambda: self.folder_results_tree.insert("", tk.END, text=folder_name, 
-                                                             values=(self._format_size(total_size), "100.0%")))
-            
-            # Add all subfolders
-            for path, name, size in subfolders:
-                percent = (size / total_size) * 100 if total_size > 0 else 0
-                self.root.after(0, lambda p=path, n=name, s=size, perc=percent: 
-                           self.folder_results_tree.insert(root_id, tk.END, text=n, values=(self._format_size(s), f"{perc:.1f}%")))
-            
-            # Add a node for direct files
-            if files_size > 0:
-                percent = (files_size / total_size) * 100
-                self.root.after(0, lambda: self.folder_results_tree.insert(root_id, tk.END, text="Files", 
-                                                          values=(self._format_size(files_size), f"{percent:.1f}%")))
-            
-            # Create visualization
-            self.root.after(0, lambda: self._create_folder_visualization(folder_name, subfolders, files_size, total_size))
-            
-            self.root.after(0, lambda: self.log(f"Folder analysis complete: {folder_path}", "success"))
-            self.root.after(0, lambda: self.update_status("Folder analysis complete"))
+            # Only the latest snapshot matters, the view picks it up at its own pace
+            for snapshot in scanner.iter_scan(folder_path, interval=FOLDER_SCAN_FRAME_MS / 1000):
+                self._folder_snapshot = snapshot
             
         except Exception as e:
             error_msg = f"Error analyzing folder: {str(e)}"
             self.root.after(0, lambda msg=error_msg: self.log(msg, "error"))
             self.root.after(0, lambda: self.update_status("Error analyzing folder"))
             self.root.after(0, lambda msg=error_msg: messagebox.showerror("Error", msg))
+            # Let the view loop know the scan is over
+            self._folder_snapshot = ScanProgress(folder_path, 0, 0, [], 0, done=True)
+    
+    def _refresh_folder_analysis_view(self):
+        """Render the latest folder scan snapshot (runs on the UI thread)"""
+        snapshot = self._folder_snapshot
+        if snapshot is not None and snapshot is not self._folder_snapshot_shown:
+            self._folder_snapshot_shown = snapshot
+            if snapshot.done:
+                self._finish_folder_analysis(snapshot)
+                return
+            self._update_folder_progress(snapshot)
+        
+        self.root.after(FOLDER_SCAN_FRAME_MS, self._refresh_folder_analysis_view)
+    
+    def _update_folder_progress(self, snapshot):
+        """Update the result rows and the chart from a partial scan result"""
+        tree = self.folder_results_tree
+        root_id = snapshot.root_path
+        total_size = snapshot.total_size
+        name = os.path.basename(root_id.rstrip("\\/")) or root_id
+        
+        if not tree.exists(root_id):
+            tree.insert("", tk.END, iid=root_id, text=name, open=True)
+            self._folder_progress_rows = {}
+        tree.item(root_id, values=(f"{self._format_size(total_size)} (scanning...)", "100.0%"))
+        
+        # Only touch rows whose size or position changed since the last frame
+        for index, (path, child_name, size) in enumerate(snapshot.subfolders):
+            percent = (size / total_size) * 100 if total_size > 0 else 0
+            previous = self._folder_progress_rows.get(path)
+            if previous is None:
+                tree.insert(root_id, index, iid=path, text=child_name,
+                            values=(self._format_size(size), f"{percent:.1f}%"))
+            else:
+                if previous[1] != size or previous[2] != total_size:
+                    tree.item(path, values=(self._format_size(size), f"{percent:.1f}%"))
+                if previous[0] != index:
+                    tree.move(path, root_id, index)
+            self._folder_progress_rows[path] = (index, size, total_size)
+        
+        # The pie chart is more expensive, redraw it once per second
+        self._folder_view_frame += 1
+        if total_size > 0 and self._folder_view_frame % max(1, 1000 // FOLDER_SCAN_FRAME_MS) == 0:
+            self._create_folder_visualization(name, snapshot.subfolders, snapshot.files_size, total_size)
+        
+        self.update_status(f"Analyzing folder: {snapshot.dirs_scanned} folders scanned, "
+                           f"{self._format_size(total_size)} so far...")
+    
+    def _finish_folder_analysis(self, snapshot):
+        """Show the final result of a folder scan"""
+        scanner = self.folder_scanner
+        self.folder_scanner = None
+        self.cancel_analysis_button.state(['disabled'])
+        
+        result = snapshot.result
+        if result is None:
+            return
+        
+        if snapshot.cancelled:
+            if self.folder_results_tree.exists(result.path):
+                self.folder_results_tree.item(result.path, values=("(cancelled)", ""))
+            self.log(f"Folder analysis cancelled: {result.path}", "warning")
+            self.update_status("Folder analysis cancelled")
+            return
+        
+        if result.size == 0:
+            self.folder_results_tree.delete(*self.folder_results_tree.get_children())
+            messagebox.showinfo("Empty Folder", 
+                                f"The folder '{result.path}' is empty or cannot be analyzed.")
+            return
+        
+        if scanner.error_count:
+            self.log(f"Skipped {scanner.error_count} inaccessible items while analyzing {result.path}", "warning")
+        
+        # Build the tree view and the chart from the final scan result
+        self._show_folder_analysis(result)
+        
+        self.log(f"Folder analysis complete: {result.path} ({result.file_count} files, "
+                 f"{result.dir_count} folders in {scanner.elapsed:.1f}s, "
+                 f"{scanner.dirs_reused} folders unchanged since the last analysis)", "success")
+        self.update_status("Folder analysis complete")
+    
+    def _show_folder_analysis(self, result):
+        """Populate the results tree and the pie chart from a folder scan result"""
+        tree = self.folder_results_tree
+        tree.delete(*tree.get_children())
+        
+        # Keep the scanned nodes so subfolders can be expanded without rescanning
+        self.folder_analysis_nodes = {result.path: result}
+        
+        root_id = tree.insert("", tk.END, iid=result.path, text=result.name, open=True,
+                              values=(self._format_size(result.size), "100.0%"))
+        self._insert_folder_children(root_id, result)
+        
+        # Create visualization
+        subfolders = [(child.path, child.name, child.size) for child in result.sorted_children()]
+        self._create_folder_visualization(result.name, subfolders, result.files_size, result.size)
+    
+    def _insert_folder_children(self, parent_id, node):
+        """Insert the subfolders and direct files of a scanned folder under a tree row"""
+        tree = self.folder_results_tree
+        
+        for child in node.sorted_children():
+            percent = (child.size / node.size) * 100 if node.size > 0 else 0
+            self.folder_analysis_nodes[child.path] = child
+            child_id = tree.insert(parent_id, tk.END, iid=child.path, text=child.name, 
+                                   values=(self._format_size(child.size), f"{percent:.1f}%"))
+            # Add a placeholder so the row can be expanded later
+            if child.children or child.files_size:
+                tree.insert(child_id, tk.END, text="...")
+        
+        # Add a node for direct files
+        if node.files_size > 0:
+            percent = (node.files_size / node.size) * 100
+            tree.insert(parent_id, tk.END, text="Files", 
+                        values=(self._format_size(node.files_size), f"{percent:.1f}%"))
+    
+    def on_folder_result_open(self, event):
+        """Expand a subfolder row from the stored scan result"""
+        tree = self.folder_results_tree
+        item_id = tree.focus()
+        node = getattr(self, 'folder_analysis_nodes', {}).get(item_id)
+        if node is None:
+            return
+        
+        # Replace the placeholder with the real children on first expansion
+        children = tree.get_children(item_id)
+        if len(children) == 1 and tree.item(children[0], "text") == "...":
+            tree.delete(children[0])
+            self._insert_folder_children(item_id, node)
     
     def _get_folder_size(self, folder_path):
         """Get the total size of a folder and its contents"""
-        total_size = 0
-        
-        try:
-            for dirpath, dirnames, filenames in os.walk(folder_path):
-                for f in filenames:
-                    fp = os.path.join(dirpath, f)
-                    try:
-                        total_size += os.path.getsize(fp)
-                    except (PermissionError, FileNotFoundError, OSError):
-                        continue
-        except (PermissionError, FileNotFoundError, OSError):
-            pass
-            
-        return total_size
+        return FolderScanner().scan(folder_path).size
     
     def _format_size(self, size_bytes):
         """Format size in bytes to a human-readable format"""
@@ -9157,7 +9279,11 @@ echo.
     
     def export_folder_analysis(self):
         """Export folder analysis results to a CSV file"""
-        if not self.folder_results_tree.get_children():
+        # The index holds every folder of the last analysis, not just the visible rows
+        folder_path = os.path.abspath(self.folder_path_var.get()) if self.folder_path_var.get() else ""
+        use_index = bool(folder_path) and self.folder_index is not None and self.folder_index.has_scan(folder_path)
+        
+        if not use_index and not self.folder_results_tree.get_children():
             messagebox.showinfo("No Data", "There is no analysis data to export.")
             return
         
@@ -9172,6 +9298,13 @@ echo.
             return  # User cancelled
         
         try:
+            if use_index:
+                row_count = self.folder_index.export_csv(folder_path, file_path, self._format_size)
+                self.log(f"Exported {row_count} folders from the folder index to {file_path}", "success")
+                self.update_status("Folder analysis exported")
+                messagebox.showinfo("Export Complete", f"Folder analysis has been exported to:\n{file_path}")
+                return
+            
             with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
                 csv_writer = csv.writer(csvfile)
                 
@@ -9214,18 +9347,16 @@ echo.
             # Get the folder name
             item_text = self.folder_results_tree.item(selected_items[0], "text")
             
-            # Get the full path
-            parent_id = self.folder_results_tree.parent(selected_items[0])
+            # Get the full path (scanned folders use their path as the row id)
+            item_id = selected_items[0]
+            parent_id = self.folder_results_tree.parent(item_id)
+            analysis_nodes = getattr(self, 'folder_analysis_nodes', {})
             
-            if parent_id:  # This is a subfolder
-                # Get the path from the root item
-                root_path = self.folder_path_var.get()
-                folder_path = os.path.join(root_path, item_text)
-            else:  # This is the root folder
-                folder_path = self.folder_path_var.get()
-            
-            # Handle 'Files' special case
-            if item_text == "Files":
+            if item_id in analysis_nodes:
+                folder_path = item_id
+            elif parent_id in analysis_nodes:  # 'Files' row opens its parent folder
+                folder_path = parent_id
+            else:
                 folder_path = self.folder_path_var.get()
             
             # Open the folder if it exists
@@ -9271,6 +9402,12 @@ echo.
         self.create_button(diagnostics_frame, "DNS Lookup", 
                           lambda: self.run_dns_lookup(), 0, 2)
         
+        # Latency monitor probes TCP/UDP ports continuously until stopped
+        self.latency_prober = None
+        self.latency_after_id = None    # Pending redraw, cancelled on stop so a restart doesn't run two loops
+        self.latency_button = self.create_button(diagnostics_frame, "Latency Monitor", 
+                          lambda: self.toggle_latency_monitor(), 1, 0)
+        
         # IP Configuration frame
         ipconfig_frame = ttk.LabelFrame(frame, text="IP Configuration", padding=8, style='Group.TLabelframe')
         ipconfig_frame.grid(column=0, row=2, sticky=tk.NSEW, pady=5, padx=5)
@@ -9309,6 +9446,18 @@ echo.
         self.network_output.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         self.network_output.config(state=tk.DISABLED)
         
+        # Latency monitor table, shown once the monitor starts; it has its own widget so
+        # ping and trace route output keeps streaming into the output above
+        self.latency_frame = ttk.LabelFrame(frame, text="Latency (ms)", padding=8, style='Group.TLabelframe')
+        self.latency_frame.grid(column=0, row=4, columnspan=2, sticky=tk.NSEW, padx=5, pady=5)
+        self.latency_tree = ttk.Treeview(self.latency_frame, columns=[column for column, _, _ in LATENCY_COLUMNS],
+                                         show="headings", height=5)
+        for column, heading, width in LATENCY_COLUMNS:
+            self.latency_tree.heading(column, text=heading)
+            self.latency_tree.column(column, width=width, anchor=tk.W if column in ("target", "error") else tk.E)
+        self.latency_tree.pack(fill=tk.BOTH, expand=True)
+        self.latency_frame.grid_remove()
+        
         # Configure grid weights
         frame.columnconfigure(0, weight=1)
         frame.columnconfigure(1, weight=2)
@@ -9319,171 +9468,200 @@ echo.
         self.root.after(500, self.show_ip_config)
     
     def run_ping_test(self):
-        """Run a ping test to a specified host"""
+        """Run a ping test to one or more hosts"""
         self.log("Preparing to run ping test...")
         self.update_status("Preparing to run ping test...")
         
-        # Ask for host
-        host = simpledialog.askstring("Ping Test", "Enter hostname or IP address to ping:", 
-                                     initialvalue="google.com")
-        if not host:
+        # Ask for hosts; several can be probed at once
+        host_text = simpledialog.askstring("Ping Test", "Enter hostnames or IP addresses to ping:\n(separate several hosts with spaces or commas)", 
+                                          initialvalue="google.com")
+        hosts = split_hosts(host_text or "")
+        if not hosts:
             return
         
         # Clear the network output
         self.clear_network_output()
-        self.update_network_output(f"Pinging {host}...
-")
+        self.update_network_output(f"Pinging {', '.join(hosts)}...\n")
         
-        # Start ping in a thread
-        ping_thread = Thread(target=self._run_ping_test_thread, args=(host,))
-        ping_thread.daemon = True
-        ping_thread.start()
+        # Start the probes in a thread
+        probe_thread = Thread(target=self._run_ping_test_thread, args=(hosts,))
+        probe_thread.daemon = True
+        probe_thread.start()
     
-    def _run_ping_test_thread(self, host):
+    def _run_ping_test_thread(self, hosts):
         """Thread to run ping test"""
-        try:
-            # Run ping command
-            cmd = ["ping", "-n", "4", host]
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
-                                     text=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            
-            stdout, stderr = process.communicate()
-            
-            if stderr:
-                self.root.after(0, lambda: self.update_network_output(f"Error: {stderr}"))
-                self.root.after(0, lambda: self.log(f"Ping error: {stderr}", "error"))
-            else:
-                self.root.after(0, lambda: self.update_network_output(stdout))
-                self.root.after(0, lambda: self.log("Ping test completed", "success"))
-            
-            self.root.after(0, lambda: self.update_status("Ping test completed"))
-            
-        except Exception as e:
-            error_msg = f"Error performing ping test: {str(e)}"
-            self.root.after(0, lambda: self.update_network_output(f"Error: {error_msg}"))
-            self.root.after(0, lambda: self.log(error_msg, "error"))
-            self.root.after(0, lambda: self.update_status("Ping test failed"))
+        self._run_network_probe(hosts, PING, "Ping test")
     
     def run_traceroute(self):
-        """Run a traceroute to a specified host"""
+        """Run a traceroute to one or more hosts"""
         self.log("Preparing to run traceroute...")
         self.update_status("Preparing to run traceroute...")
         
-        # Ask for host
-        host = simpledialog.askstring("Traceroute", "Enter hostname or IP address to trace:", 
-                                    initialvalue="google.com")
-        if not host:
+        # Ask for hosts; several can be probed at once
+        host_text = simpledialog.askstring("Traceroute", "Enter hostnames or IP addresses to trace:\n(separate several hosts with spaces or commas)", 
+                                          initialvalue="google.com")
+        hosts = split_hosts(host_text or "")
+        if not hosts:
             return
         
         # Clear the network output
         self.clear_network_output()
-        self.update_network_output(f"Tracing route to {host}...
-")
+        self.update_network_output(f"Tracing route to {', '.join(hosts)}...\n")
         
-        # Start traceroute in a thread
-        trace_thread = Thread(target=self._run_traceroute_thread, args=(host,))
-        trace_thread.daemon = True
-        trace_thread.start()
+        # Start the probes in a thread
+        probe_thread = Thread(target=self._run_traceroute_thread, args=(hosts,))
+        probe_thread.daemon = True
+        probe_thread.start()
     
-    def _run_traceroute_thread(self, host):
+    def _run_traceroute_thread(self, hosts):
         """Thread to run traceroute"""
+        self._run_network_probe(hosts, TRACEROUTE, "Traceroute")
+    
+    def _run_network_probe(self, hosts, tool, name):
+        """Probe hosts concurrently, streaming their output and ending with a summary table"""
         try:
-            # Run tracert command
-            cmd = ["tracert", host]
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
-                                     text=True, creationflags=subprocess.CREATE_NO_WINDOW)
+            # Output of several hosts interleaves, so each line says which host it is from
+            prefix = len(hosts) > 1
             
-            # Stream the output
-            while True:
-                line = process.stdout.readline()
-                if not line and process.poll() is not None:
-                    break
-                if line:
-                    self.root.after(0, lambda l=line: self.update_network_output(l))
+            def on_line(host, line):
+                text = f"[{host}] {line}\n" if prefix else line + "\n"
+                self.root.after(0, lambda: self.update_network_output(text))
             
-            stderr = process.stderr.read()
-            if stderr:
-                self.root.after(0, lambda: self.update_network_output(f"Error: {stderr}"))
-                self.root.after(0, lambda: self.log(f"Traceroute error: {stderr}", "error"))
-            else:
-                self.root.after(0, lambda: self.log("Traceroute completed", "success"))
+            def on_result(result):
+                if result.error:
+                    self.root.after(0, lambda: self.log(f"{name} to {result.host} failed: {result.error}", "warning"))
+            
+            engine = ProbeEngine(concurrency=NETWORK_PROBE_CONCURRENCY, on_line=on_line, on_result=on_result)
+            results = engine.run(hosts, tool)
             
-            self.root.after(0, lambda: self.update_status("Traceroute completed"))
+            summary = "\n".join(["", "Summary:"] + format_summary(results)) + "\n"
+            self.root.after(0, lambda: self.update_network_output(summary))
+            self.root.after(0, lambda: self.log(f"{name} completed for {len(hosts)} hosts", "success"))
+            self.root.after(0, lambda: self.update_status(f"{name} completed"))
             
         except Exception as e:
-            error_msg = f"Error performing traceroute: {str(e)}"
+            error_msg = f"Error performing {name.lower()}: {str(e)}"
             self.root.after(0, lambda: self.update_network_output(f"Error: {error_msg}"))
             self.root.after(0, lambda: self.log(error_msg, "error"))
-            self.root.after(0, lambda: self.update_status("Traceroute failed"))
+            self.root.after(0, lambda: self.update_status(f"{name} failed"))
+    
+    def toggle_latency_monitor(self):
+        """Start measuring TCP connect / UDP echo latency, or stop the running monitor"""
+        if self.latency_prober is not None:
+            self.stop_latency_monitor()
+            return
+        
+        # Ask for targets; a bare host is probed on port 443
+        target_text = simpledialog.askstring("Latency Monitor", "Enter targets as host:port (TCP) or udp://host:port (UDP echo):\n(separate several targets with spaces or commas)", 
+                                            initialvalue="google.com:443, 1.1.1.1:53")
+        targets = split_hosts(target_text or "")
+        if not targets:
+            return
+        
+        try:
+            self.latency_prober = LatencyProber(targets, interval=LATENCY_PROBE_INTERVAL,
+                                                timeout=LATENCY_PROBE_TIMEOUT)
+        except ValueError as e:
+            messagebox.showerror("Latency Monitor", f"Invalid target: {e}")
+            return
+        
+        self.latency_prober.start()
+        self.latency_tree.delete(*self.latency_tree.get_children())
+        self.latency_frame.config(text="Latency (ms), updated every second")
+        self.latency_frame.grid()
+        self.latency_button.config(text="Stop Latency Monitor")
+        self.log(f"Latency monitor started for {', '.join(targets)}")
+        self.update_status("Latency monitor running...")
+        self._refresh_latency_monitor()
+    
+    def _refresh_latency_monitor(self):
+        """Update the latency table rows in place while the monitor runs"""
+        if self.latency_prober is None:
+            return
+        for entry in self.latency_prober.stats():
+            # The last error is only shown for targets that are currently failing
+            values = format_row(entry) + (entry['error'] or "",)
+            if self.latency_tree.exists(entry['target']):
+                self.latency_tree.item(entry['target'], values=values)
+            else:
+                self.latency_tree.insert("", tk.END, iid=entry['target'], values=values)
+        self.latency_after_id = self.root.after(LATENCY_REFRESH_MS, self._refresh_latency_monitor)
+    
+    def stop_latency_monitor(self):
+        """Stop the latency monitor, leaving its last table on screen"""
+        if self.latency_prober is None:
+            return
+        prober = self.latency_prober
+        self.latency_prober = None
+        if self.latency_after_id is not None:
+            self.root.after_cancel(self.latency_after_id)
+            self.latency_after_id = None
+        # Joining the prober thread can take up to a probe timeout, so do it off the UI thread
+        Thread(target=prober.stop, daemon=True).start()
+        
+        self.latency_frame.config(text="Latency (ms), stopped")
+        self.latency_button.config(text="Latency Monitor")
+        self.log("Latency monitor stopped", "success")
+        self.update_status("Latency monitor stopped")
     
     def run_dns_lookup(self):
-        """Run a DNS lookup for a hostname"""
+        """Run a DNS lookup for one or more hostnames"""
         self.log("Preparing to run DNS lookup...")
         self.update_status("Preparing to run DNS lookup...")
         
-        # Ask for host
-        host = simpledialog.askstring("DNS Lookup", "Enter hostname to lookup:", 
-                                     initialvalue="google.com")
-        if not host:
+        # Ask for hosts; several can be looked up at once, and IP addresses are reverse-resolved
+        host_text = simpledialog.askstring("DNS Lookup", "Enter hostnames or IP addresses to lookup:\n(separate several with spaces or commas)", 
+                                          initialvalue="google.com")
+        hosts = split_hosts(host_text or "")
+        if not hosts:
             return
         
         # Clear the network output
         self.clear_network_output()
-        self.update_network_output(f"Looking up DNS for {host}...
-")
+        self.update_network_output(f"Looking up DNS for {', '.join(hosts)}...\n")
         
         # Start DNS lookup in a thread
-        dns_thread = Thread(target=self._run_dns_lookup_thread, args=(host,))
+        dns_thread = Thread(target=self._run_dns_lookup_thread, args=(hosts,))
         dns_thread.daemon = True
         dns_thread.start()
     
-    def _run_dns_lookup_thread(self, host):
-        """Thread to run DNS lookup"""
-        try:
-            # Run nslookup command
-            cmd = ["nslookup", host]
-            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
-                                     text=True, creationflags=subprocess.CREATE_NO_WINDOW)
-            
-            stdout, stderr = process.communicate()
-            
-            if stderr:
-                self.root.after(0, lambda: self.update_network_output(f"Error: {stderr}"))
-                self.root.after(0, lambda: self.log(f"DNS lookup error: {stderr}", "error"))
-            else:
-                self.root.after(0, lambda: self.update_network_output(stdout))
-                self.root.after(0, lambda: self.log("DNS lookup completed", "success"))
-            
+    def _run_dns_lookup_thread(self, hosts):
+        """Thread to run DNS lookups through the shared caching resolver"""
+        try:
+            resolver = get_default_resolver()
+            results = resolver.lookup_many(hosts)
+            
+            # Reverse-resolve the first address of every name found, all at once
+            first_addresses = [result.addresses[0] for result in results
+                               if result.kind == FORWARD and result.addresses]
+            reverse_names = {reverse.query: reverse.names
+                             for reverse in resolver.reverse_many(first_addresses)}
+            
+            lines = []
+            for result in results:
+                timing = "from cache" if result.cached else f"{result.elapsed * 1000:.1f} ms"
+                lines.append(f"Name:      {result.query}  ({timing}, TTL {result.ttl}s)")
+                if result.status != OK:
+                    lines.append(f"Result:    {result.error or result.status}")
+                if result.aliases:
+                    lines.append(f"Aliases:   {', '.join(result.aliases)}")
+                if result.addresses:
+                    lines.append(f"Addresses: {', '.join(result.addresses)}")
+                    names = reverse_names.get(result.addresses[0])
+                    if names:
+                        lines.append(f"Reverse:   {result.addresses[0]} -> {', '.join(names)}")
+                if result.names:
+                    lines.append(f"Host:      {', '.join(result.names)}")
+                lines.append("")
+            
+            text = "\n".join(lines + ["Summary:"] + format_results(results)) + "\n"
+            self.root.after(0, lambda: self.update_network_output(text))
+            
+            stats = resolver.stats()
+            self.root.after(0, lambda: self.log(f"DNS lookup completed for {len(hosts)} hosts "
+                                                f"({stats['hits']} cache hits this session)", "success"))
             self.root.after(0, lambda: self.update_status("DNS lookup completed"))
             
-            # Try to get detailed IP information
-            try:
-                ip_addresses = []
-                for line in stdout.splitlines():
-                    line = line.strip()
-                    if line and "Address:" in line and not ":" in line.split("Address:")[1].strip():
-                        ip = line.split("Address:")[1].strip()
-                        if ip not in ["127.0.0.1", "::1"] and not ip.startswith("192.168.") and not ip.startswith("10."):
-                            ip_addresses.append(ip)
-                
-                if ip_addresses:
-                    self.root.after(0, lambda: self.update_network_output("
-
-Detailed IP Information:
-"))
-                    # Get information about the first IP
-                    try:
-                        # Try to get geographic information using a Python socket
-                        import socket
-                        hostname, aliaslist, ipaddrlist = socket.gethostbyaddr(ip_addresses[0])
-                        self.root.after(0, lambda: self.update_network_output(f"Hostname: {hostname}
-"))
-                    except:
-                        pass
-            except:
-                # Ignore errors in the additional info section
-                pass
-            
         except Exception as e:
             error_msg = f"Error performing DNS lookup: {str(e)}"
             self.root.after(0, lambda: self.update_network_output(f"Error: {error_msg}"))
@@ -10007,26 +10185,19 @@ A system restart may be required for the changes to take effect.
             # Check if Hyper-V is enabled using PowerShell
             self.root.after(0, lambda: self.hyperv_status_var.set("Checking Hyper-V status..."))
             
-            # Check if Hyper-V feature is installed
-            ps_command = [
-                "powershell",
-                "-Command",
-                "(Get-WindowsOptionalFeature -FeatureName Microsoft-Hyper-V-All -Online).State"
-            ]
-            
-            process = subprocess.Popen(
-                ps_command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            stdout, stderr = process.communicate(timeout=20)
+            # Check if Hyper-V feature is installed (on the shared PowerShell workers)
+            try:
+                state = get_default_pool().run_text(
+                    "(Get-WindowsOptionalFeature -FeatureName Microsoft-Hyper-V-All -Online).State",
+                    timeout=20
+                )
+                stderr = ""
+            except PowerShellError as e:
+                state = ""
+                stderr = str(e)
             
             is_enabled = False
-            if process.returncode == 0 and stdout.strip():
-                state = stdout.strip()
+            if state:
                 is_enabled = state == "Enabled"
                 
                 if is_enabled:
@@ -10299,64 +10470,43 @@ Service status: {s}"))
             # Clear the VM list
             self.root.after(0, lambda: self.vm_listbox.delete(0, tk.END))
             
-            # Check if Hyper-V is enabled
-            ps_check_command = [
-                "powershell",
-                "-Command",
-                "(Get-WindowsOptionalFeature -FeatureName Microsoft-Hyper-V-All -Online).State"
-            ]
+            pool = get_default_pool()
             
-            check_process = subprocess.Popen(
-                ps_check_command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            check_stdout, check_stderr = check_process.communicate(timeout=20)
+            # Check if Hyper-V is enabled
+            try:
+                state = pool.run_text(
+                    "(Get-WindowsOptionalFeature -FeatureName Microsoft-Hyper-V-All -Online).State",
+                    timeout=20
+                )
+            except PowerShellError:
+                state = ""
             
-            if check_process.returncode != 0 or check_stdout.strip() != "Enabled":
+            if state != "Enabled":
                 self.root.after(0, lambda: self.vm_listbox.insert(tk.END, "Hyper-V is not enabled."))
                 return
             
-            # Get list of VMs
-            ps_command = [
-                "powershell",
-                "-Command",
-                "Get-VM | Select-Object -Property Name, State | Format-Table -HideTableHeaders | Out-String -Width 1000"
-            ]
-            
-            process = subprocess.Popen(
-                ps_command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            stdout, stderr = process.communicate(timeout=20)
-            
-            if process.returncode == 0 and stdout.strip():
-                # Process the VM list
-                vm_lines = stdout.strip().split('
-')
-                vm_lines = [line.strip() for line in vm_lines if line.strip()]
-                
-                if vm_lines:
-                    for line in vm_lines:
-                        self.root.after(0, lambda l=line: self.vm_listbox.insert(tk.END, l))
-                else:
-                    self.root.after(0, lambda: self.vm_listbox.insert(tk.END, "No virtual machines found."))
-                    
+            # Get list of VMs as objects; the state enum is converted to its name
+            try:
+                vms = pool.run(
+                    "Get-VM | Select-Object Name, @{Name='State'; Expression={\"$($_.State)\"}}",
+                    timeout=20
+                )
+                error = None
+            except PowerShellError as e:
+                vms = []
+                error = str(e)
+            
+            if vms:
+                for vm in vms:
+                    line = f"{vm.get('Name', '')}  {vm.get('State', '')}"
+                    self.root.after(0, lambda l=line: self.vm_listbox.insert(tk.END, l))
                 self.root.after(0, lambda: self.log("Virtual machines list refreshed", "success"))
+            elif error is None or "ObjectNotFound" in error:
+                self.root.after(0, lambda: self.vm_listbox.insert(tk.END, "No virtual machines found."))
+                self.root.after(0, lambda: self.log("No virtual machines found", "info"))
             else:
-                if "ObjectNotFound" in stderr:
-                    self.root.after(0, lambda: self.vm_listbox.insert(tk.END, "No virtual machines found."))
-                    self.root.after(0, lambda: self.log("No virtual machines found", "info"))
-                else:
-                    self.root.after(0, lambda: self.vm_listbox.insert(tk.END, "Error listing virtual machines."))
-                    self.root.after(0, lambda: self.log(f"Error listing virtual machines: {stderr}", "error"))
+                self.root.after(0, lambda: self.vm_listbox.insert(tk.END, "Error listing virtual machines."))
+                self.root.after(0, lambda msg=error: self.log(f"Error listing virtual machines: {msg}", "error"))
             
             self.root.after(0, lambda: self.update_status("VM list refreshed"))
             
@@ -10594,18 +10744,34 @@ Service status: {s}"))
         self.disk_ax = self.fig_perf.add_subplot(413)
         self.network_ax = self.fig_perf.add_subplot(414)
         
-        # Setup monitor data
-        self.monitor_data = {
-            'times': [],
-            'cpu': [],
-            'memory': [],
-            'disk': [],
-            'network': []
-        }
+        # Setup monitor data (fixed-size ring buffers, 24 hours at one sample per second)
+        self.metrics_retention = 24 * 60 * 60
+        self.monitor_data = MetricsStore(['cpu', 'memory', 'disk', 'network'], self.metrics_retention)
         
-        # Max data points to keep
+        # Max data points to show in the charts
         self.max_data_points = 60
         
+        # Build the axes and lines once; each refresh only updates their data
+        self.perf_renderer = BlitRenderer(self.canvas_perf, self.fig_perf)
+        for key, axes, style, title in (
+            ('cpu', self.cpu_ax, 'r-', 'CPU Usage (%)'),
+            ('memory', self.memory_ax, 'b-', 'Memory Usage (%)'),
+            ('disk', self.disk_ax, 'g-', 'Disk Activity'),
+            ('network', self.network_ax, 'c-', 'Network Activity'),
+        ):
+            self.perf_renderer.add_line(key, axes, linestyle='-', color=style[0])
+            axes.set_title(title)
+            axes.set_ylim(0, 100)
+            axes.set_xlim(-(self.max_data_points - 1), 0)
+            if axes is not self.network_ax:
+                axes.set_xticklabels([])
+        # A fixed "seconds ago" axis keeps the background static between frames
+        self.network_ax.set_xlabel('Seconds ago')
+        
+        # Chart rendering cost
+        self.perf_cost_label = ttk.Label(monitor_frame, text="Chart rendering: -", font=DESCRIPTION_FONT)
+        self.perf_cost_label.pack(pady=(5, 0))
+        
         # Auto-refresh checkbox
         self.auto_refresh_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(
@@ -10647,9 +10813,6 @@ Service status: {s}"))
     def update_performance_monitor(self):
         """Update system performance monitor graphs"""
         try:
-            # Get current time
-            current_time = datetime.now().strftime('%H:%M:%S')
-            
             # Get CPU usage
             cpu_percent = psutil.cpu_percent()
             
@@ -10686,64 +10849,38 @@ Service status: {s}"))
             except:
                 net_speed = 0
             
-            # Update the data lists
-            self.monitor_data['times'].append(current_time)
-            self.monitor_data['cpu'].append(cpu_percent)
-            self.monitor_data['memory'].append(memory_percent)
-            self.monitor_data['disk'].append(disk_speed)
-            self.monitor_data['network'].append(net_speed)
-            
-            # Limit the data points
-            if len(self.monitor_data['times']) > self.max_data_points:
-                self.monitor_data['times'] = self.monitor_data['times'][-self.max_data_points:]
-                self.monitor_data['cpu'] = self.monitor_data['cpu'][-self.max_data_points:]
-                self.monitor_data['memory'] = self.monitor_data['memory'][-self.max_data_points:]
-                self.monitor_data['disk'] = self.monitor_data['disk'][-self.max_data_points:]
-                self.monitor_data['network'] = self.monitor_data['network'][-self.max_data_points:]
-            
-            # Only display the last 10 time labels to avoid crowding
-            display_times = self.monitor_data['times'][::6] if len(self.monitor_data['times']) > 10 else self.monitor_data['times']
-            time_positions = list(range(0, len(self.monitor_data['times']), 6)) if len(self.monitor_data['times']) > 10 else range(len(self.monitor_data['times']))
-            
-            # Update the plots
-            self.fig_perf.clear()
-            
-            # CPU plot
-            self.cpu_ax = self.fig_perf.add_subplot(411)
-            self.cpu_ax.plot(self.monitor_data['cpu'], 'r-')
-            self.cpu_ax.set_title('CPU Usage (%)')
-            self.cpu_ax.set_ylim(0, 100)
-            self.cpu_ax.set_xticks(time_positions)
-            self.cpu_ax.set_xticklabels([])
-            
-            # Memory plot
-            self.memory_ax = self.fig_perf.add_subplot(412)
-            self.memory_ax.plot(self.monitor_data['memory'], 'b-')
-            self.memory_ax.set_title('Memory Usage (%)')
-            self.memory_ax.set_ylim(0, 100)
-            self.memory_ax.set_xticks(time_positions)
-            self.memory_ax.set_xticklabels([])
-            
-            # Disk plot
-            self.disk_ax = self.fig_perf.add_subplot(413)
-            self.disk_ax.plot(self.monitor_data['disk'], 'g-')
-            self.disk_ax.set_title('Disk Activity')
-            self.disk_ax.set_ylim(0, 100)
-            self.disk_ax.set_xticks(time_positions)
-            self.disk_ax.set_xticklabels([])
-            
-            # Network plot
-            self.network_ax = self.fig_perf.add_subplot(414)
-            self.network_ax.plot(self.monitor_data['network'], 'c-')
-            self.network_ax.set_title('Network Activity')
-            self.network_ax.set_ylim(0, 100)
-            self.network_ax.set_xticks(time_positions)
-            if display_times:
-                self.network_ax.set_xticklabels(display_times, rotation=45, ha='right')
-            
-            # Adjust layout and draw
-            self.fig_perf.tight_layout()
-            self.canvas_perf.draw()
+            # Record the sample (O(1) ring buffer appends)
+            self.monitor_data.append(
+                cpu=cpu_percent,
+                memory=memory_percent,
+                disk=disk_speed,
+                network=net_speed
+            )
+            
+            # Samples shown in the charts; matplotlib can't take the store's
+            # memoryviews, so wrap them as numpy arrays (still zero-copy)
+            cpu_data = numpy.frombuffer(self.monitor_data.window('cpu', self.max_data_points))
+            memory_data = numpy.frombuffer(self.monitor_data.window('memory', self.max_data_points))
+            disk_data = numpy.frombuffer(self.monitor_data.window('disk', self.max_data_points))
+            network_data = numpy.frombuffer(self.monitor_data.window('network', self.max_data_points))
+            
+            # Newest sample at 0, older ones to the left
+            x_values = range(1 - len(cpu_data), 1)
+            
+            # Update the lines and blit them over the cached background
+            self.perf_renderer.update(lines={
+                'cpu': (x_values, cpu_data),
+                'memory': (x_values, memory_data),
+                'disk': (x_values, disk_data),
+                'network': (x_values, network_data),
+            })
+            
+            stats = self.perf_renderer.stats()
+            self.perf_cost_label.config(
+                text=f"Chart rendering: {stats['last_ms']:.1f} ms/frame "
+                     f"(avg {stats['avg_ms']:.1f} ms, max {stats['max_ms']:.1f} ms, "
+                     f"{stats['full_redraws']} full redraws)"
+            )
             
         except Exception as e:
             self.log(f"Error updating performance monitor: {str(e)}", "error")
@@ -11219,14 +11356,8 @@ Service status: {s}"))
                     creationflags=subprocess.CREATE_NO_WINDOW
                 )
                 
-                # Rename SoftwareDistribution folder
-                subprocess.run(
-                    ["cmd", "/c", "ren %systemroot%\\SoftwareDistribution SoftwareDistribution.old"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
+                # Move the SoftwareDistribution folder to background deletion
+                self._remove_tree(os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'SoftwareDistribution'))
                 
                 # Start Windows Update service
                 subprocess.run(
@@ -11651,37 +11782,36 @@ Service status: {s}"))
             sd_path = os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'SoftwareDistribution')
             self.root.after(0, lambda: self.log(f"Cleaning Windows Update files in {sd_path}..."))
             
-            # Create a backup of the SoftwareDistribution folder
+            # Left behind by earlier versions, which renamed the folder aside
             sd_old_path = os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'SoftwareDistribution.old')
-            
-            # Remove old backup if exists
             if os.path.exists(sd_old_path):
                 self.root.after(0, lambda: self.log("Removing old backup..."))
-                try:
-                    shutil.rmtree(sd_old_path, ignore_errors=True)
-                except:
-                    pass
-            
-            # Try to rename the folder (most reliable method)
+                self._remove_tree(sd_old_path)
+            
+            # Measure the folder with the planner while it is still in place, rather
+            # than walking the renamed copy afterwards just to estimate the space
+            update_plan = CleanupEngine(max_workers=TEMP_CLEANUP_WORKERS).plan(
+                {"Windows Update Files": [CleanupTarget("SoftwareDistribution", sd_path)]})
+            self.root.after(0, lambda: self.log(
+                f"Windows Update files: {update_plan.file_count} files, {self._format_size(update_plan.total_bytes)}"))
+            
+            # Move the folder into a tombstone (one rename) so the service can be
+            # restarted right away; the files are deleted in the background
+            renamed = False
             if os.path.exists(sd_path):
-                try:
-                    os.rename(sd_path, sd_old_path)
-                    self.root.after(0, lambda: self.log("Windows Update folder renamed successfully"))
-                except Exception as e:
-                    self.root.after(0, lambda: self.log(f"Error renaming folder: {str(e)}", "warning"))
+                if get_default_reaper().remove(sd_path) is not None:
+                    renamed = True
+                    self.root.after(0, lambda: self.log("Windows Update folder moved to background deletion"))
+                else:
+                    self.root.after(0, lambda: self.log("Could not move the Windows Update folder (files in use)", "warning"))
                     
                     # If rename fails, try to clear the contents
                     self.root.after(0, lambda: self.log("Trying to clear contents instead..."))
                     try:
-                        # Clear Download folder
-                        download_path = os.path.join(sd_path, "Download")
-                        if os.path.exists(download_path):
-                            shutil.rmtree(download_path, ignore_errors=True)
-                            
-                        # Clear DataStore folder
-                        datastore_path = os.path.join(sd_path, "DataStore")
-                        if os.path.exists(datastore_path):
-                            shutil.rmtree(datastore_path, ignore_errors=True)
+                        for folder in ("Download", "DataStore"):
+                            folder_path = os.path.join(sd_path, folder)
+                            if os.path.exists(folder_path):
+                                self._remove_tree(folder_path)
                     except Exception as inner_e:
                         self.root.after(0, lambda: self.log(f"Error clearing folder contents: {str(inner_e)}", "warning"))
             
@@ -11697,17 +11827,10 @@ Service status: {s}"))
                 creationflags=subprocess.CREATE_NO_WINDOW
             )
             
-            # Calculate space saved
+            # Space saved is what the plan measured before the rename
             space_saved = "Unknown"
-            if os.path.exists(sd_old_path):
-                total_size = 0
-                for dirpath, dirnames, filenames in os.walk(sd_old_path):
-                    for f in filenames:
-                        fp = os.path.join(dirpath, f)
-                        try:
-                            total_size += os.path.getsize(fp)
-                        except:
-                            pass
+            if renamed:
+                total_size = update_plan.total_bytes
                 
                 # Convert to human-readable format
                 if total_size > 1024**3:  # GB
@@ -11722,7 +11845,7 @@ Service status: {s}"))
             
             if space_saved != "Unknown":
                 success_msg += f"
-Space freed: {space_saved}"
+Space freed: {space_saved} (deleted in the background)"
             
             self.root.after(0, lambda msg=success_msg: messagebox.showinfo("Cleanup Complete", msg))
             
@@ -11751,7 +11874,7 @@ Space freed: {space_saved}"
         # Create a dialog to select browsers
         browser_dialog = tk.Toplevel(self.root)
         browser_dialog.title("Clean Browser Data")
-        browser_dialog.geometry("400x300")
+        browser_dialog.geometry("400x380")
         browser_dialog.resizable(False, False)
         browser_dialog.transient(self.root)
         browser_dialog.grab_set()
@@ -11829,6 +11952,21 @@ Space freed: {space_saved}"
         ttk.Checkbutton(options_frame, text="Cookies", variable=cookies_var).grid(row=1, column=0, sticky=tk.W, pady=2)
         ttk.Checkbutton(options_frame, text="History", variable=history_var).grid(row=2, column=0, sticky=tk.W, pady=2)
         
+        # Compaction keeps cookies and history but prunes old rows and shrinks the databases
+        compact_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            options_frame,
+            text="Compact cookie and history databases instead of deleting them",
+            variable=compact_var
+        ).grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=2)
+        prune_frame = ttk.Frame(options_frame)
+        prune_frame.grid(row=4, column=0, columnspan=2, sticky=tk.W, padx=(20, 0), pady=2)
+        ttk.Label(prune_frame, text="Keep entries from the last").pack(side=tk.LEFT)
+        prune_days_var = tk.StringVar(value="All")
+        ttk.Combobox(prune_frame, textvariable=prune_days_var, values=["All", "365", "90", "30", "7"],
+                     width=5, state="readonly").pack(side=tk.LEFT, padx=5)
+        ttk.Label(prune_frame, text="days").pack(side=tk.LEFT)
+        
         # Buttons frame
         button_frame = ttk.Frame(browser_dialog)
         button_frame.pack(fill=tk.X, pady=(15, 10), padx=20)
@@ -11847,7 +11985,8 @@ Space freed: {space_saved}"
             command=lambda: self._process_browser_clean(
                 browser_dialog,
                 chrome_var.get(), firefox_var.get(), edge_var.get(), ie_var.get(),
-                cache_var.get(), cookies_var.get(), history_var.get()
+                cache_var.get(), cookies_var.get(), history_var.get(),
+                compact_var.get(), None if prune_days_var.get() == "All" else int(prune_days_var.get())
             )
         ).pack(side=tk.RIGHT, padx=5)
         
@@ -11863,14 +12002,14 @@ Space freed: {space_saved}"
         )
     
     def _process_browser_clean(self, dialog, clean_chrome, clean_firefox, clean_edge, clean_ie, 
-                             clean_cache, clean_cookies, clean_history):
+                             clean_cache, clean_cookies, clean_history, compact=False, prune_days=None):
         """Process browser cleaning selections"""
         # Check if at least one browser and one option is selected
         if not (clean_chrome or clean_firefox or clean_edge or clean_ie):
             messagebox.showinfo("No Selection", "Please select at least one browser to clean.")
             return
         
-        if not (clean_cache or clean_cookies or clean_history):
+        if not (clean_cache or clean_cookies or clean_history or compact):
             messagebox.showinfo("No Selection", "Please select at least one data type to clean.")
             return
         
@@ -11880,43 +12019,82 @@ Space freed: {space_saved}"
         # Start cleaning in a thread
         clean_thread = Thread(
             target=self._clean_browser_thread,
-            args=(clean_chrome, clean_firefox, clean_edge, clean_ie, clean_cache, clean_cookies, clean_history)
+            args=(clean_chrome, clean_firefox, clean_edge, clean_ie, clean_cache, clean_cookies, clean_history,
+                  compact, prune_days)
         )
         clean_thread.daemon = True
         clean_thread.start()
     
     def _clean_browser_thread(self, clean_chrome, clean_firefox, clean_edge, clean_ie, 
-                            clean_cache, clean_cookies, clean_history):
+                            clean_cache, clean_cookies, clean_history, compact=False, prune_days=None):
         """Thread to clean browser data"""
         try:
             self.root.after(0, lambda: self.log("Starting browser data cleanup..."))
             self.root.after(0, lambda: self.update_status("Cleaning browser data..."))
             
-            # Track results
-            results = []
-            
-            # Clean Chrome
-            if clean_chrome:
-                self.root.after(0, lambda: self.log("Cleaning Google Chrome data..."))
-                chrome_result = self._clean_chrome(clean_cache, clean_cookies, clean_history)
-                results.append(f"Chrome: {chrome_result}")
+            browsers = [browser for browser, selected in
+                        (("Chrome", clean_chrome), ("Firefox", clean_firefox), ("Edge", clean_edge)) if selected]
+            # Compacting keeps cookies and history, so only the cache is deleted then
+            kinds = [kind for kind, selected in
+                     ((CACHE, clean_cache), (COOKIES, clean_cookies and not compact),
+                      (HISTORY, clean_history and not compact)) if selected]
+            
+            # Close the browsers and wait until they have exited, so their files aren't locked
+            if browsers:
+                closed = close_programs([BROWSER_PROCESSES[browser] for browser in browsers])
+                if closed.freed_pids:
+                    self.root.after(0, lambda: self.log(
+                        f"Closed {len(closed.freed_pids)} browser processes ({len(closed.killed)} had to be killed)"))
+                if closed.survivors or closed.denied:
+                    self.root.after(0, lambda: self.log(
+                        f"{len(closed.survivors) + len(closed.denied)} browser processes could not be closed", "warning"))
+            
+            # Every profile is sized, then cleaned, on its own worker
+            engine = BrowserDataEngine(remove_tree=self._remove_tree)
+            profiles = engine.discover(browsers)
+            estimated = engine.estimate(profiles, kinds)
+            self.root.after(0, lambda: self.log(
+                f"Found {len(profiles)} browser profiles, {self._format_size(estimated)} to clean"))
+            reports = engine.clean(profiles, kinds) if kinds else []
+            
+            compacted = {}
+            if compact:
+                for db_report in engine.compact(profiles, prune_days):
+                    if db_report.error:
+                        db_msg = f"{db_report.browser} {db_report.profile} {db_report.database}: skipped ({db_report.error})"
+                        self.root.after(0, lambda msg=db_msg: self.log(msg, "warning"))
+                        continue
+                    compacted[db_report.browser] = compacted.get(db_report.browser, 0) + db_report.bytes_reclaimed
+                    db_msg = (f"{db_report.browser} {db_report.profile} {db_report.database}: "
+                              f"{db_report.rows_pruned} old rows pruned, {self._format_size(db_report.bytes_reclaimed)} reclaimed")
+                    self.root.after(0, lambda msg=db_msg: self.log(msg))
             
-            # Clean Firefox
-            if clean_firefox:
-                self.root.after(0, lambda: self.log("Cleaning Mozilla Firefox data..."))
-                firefox_result = self._clean_firefox(clean_cache, clean_cookies, clean_history)
-                results.append(f"Firefox: {firefox_result}")
+            for report in reports:
+                report_msg = (f"{report.browser} {report.profile}: {self._format_size(report.bytes_reclaimed)} reclaimed"
+                              + (f", {report.errors} items in use" if report.errors else ""))
+                self.root.after(0, lambda msg=report_msg: self.log(msg))
             
-            # Clean Edge
-            if clean_edge:
-                self.root.after(0, lambda: self.log("Cleaning Microsoft Edge data..."))
-                edge_result = self._clean_edge(clean_cache, clean_cookies, clean_history)
-                results.append(f"Edge: {edge_result}")
+            # Track results
+            results = []
+            summary = summarize(reports)
+            for browser in browsers:
+                if browser in summary:
+                    profile_count, reclaimed, errors = summary[browser]
+                    result = f"{profile_count} profiles, {self._format_size(reclaimed)} reclaimed"
+                    if errors:
+                        result += f", {errors} items could not be removed"
+                    if browser in compacted:
+                        result += f", databases compacted by {self._format_size(compacted[browser])}"
+                elif browser in compacted:
+                    result = f"databases compacted by {self._format_size(compacted[browser])}"
+                else:
+                    result = "Not installed or not found"
+                results.append(f"{browser}: {result}")
             
             # Clean IE
             if clean_ie:
                 self.root.after(0, lambda: self.log("Cleaning Internet Explorer data..."))
-                ie_result = self._clean_ie(clean_cache, clean_cookies, clean_history)
+                ie_result = self._clean_ie(clean_cache, clean_cookies and not compact, clean_history and not compact)
                 results.append(f"Internet Explorer: {ie_result}")
             
             # Update status
@@ -11924,10 +12102,7 @@ Space freed: {space_saved}"
             self.root.after(0, lambda: self.update_status("Browser data cleanup completed"))
             
             # Show results
-            result_msg = "Browser Data Cleanup Results:
-
-" + "
-".join(results)
+            result_msg = "Browser Data Cleanup Results:\n\n" + "\n".join(results)
             self.root.after(0, lambda msg=result_msg: messagebox.showinfo("Cleanup Complete", msg))
             
         except Exception as e:
@@ -11936,256 +12111,6 @@ Space freed: {space_saved}"
             self.root.after(0, lambda: self.update_status("Error cleaning browser data"))
             self.root.after(0, lambda msg=error_msg: messagebox.showerror("Error", msg))
     
-    def _clean_chrome(self, clean_cache, clean_cookies, clean_history):
-        """Clean Google Chrome data"""
-        try:
-            # Kill Chrome processes
-            os.system("taskkill /F /IM chrome.exe /T 2>nul")
-            
-            # Get Chrome profile path
-            chrome_path = os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Google', 'Chrome', 'User Data')
-            
-            if not os.path.exists(chrome_path):
-                return "Not installed or not found"
-            
-            # Find all profile directories
-            profiles = ['Default']
-            profile_dir = os.path.join(chrome_path, 'Default')
-            
-            # Look for additional profiles
-            for item in os.listdir(chrome_path):
-                if item.startswith('Profile ') and os.path.isdir(os.path.join(chrome_path, item)):
-                    profiles.append(item)
-            
-            # Clean each profile
-            cleaned_items = []
-            
-            for profile in profiles:
-                profile_path = os.path.join(chrome_path, profile)
-                
-                # Clean cache
-                if clean_cache:
-                    cache_path = os.path.join(profile_path, 'Cache')
-                    if os.path.exists(cache_path):
-                        shutil.rmtree(cache_path, ignore_errors=True)
-                    
-                    # Modern Chrome uses different cache location
-                    modern_cache_path = os.path.join(profile_path, 'Service Worker', 'CacheStorage')
-                    if os.path.exists(modern_cache_path):
-                        shutil.rmtree(modern_cache_path, ignore_errors=True)
-                    
-                    cleaned_items.append('Cache')
-                
-                # Clean cookies
-                if clean_cookies:
-                    cookies_path = os.path.join(profile_path, 'Cookies')
-                    if os.path.exists(cookies_path):
-                        try:
-                            os.remove(cookies_path)
-                        except:
-                            pass
-                    
-                    cookies_journal_path = os.path.join(profile_path, 'Cookies-journal')
-                    if os.path.exists(cookies_journal_path):
-                        try:
-                            os.remove(cookies_journal_path)
-                        except:
-                            pass
-                    
-                    cleaned_items.append('Cookies')
-                
-                # Clean history
-                if clean_history:
-                    history_path = os.path.join(profile_path, 'History')
-                    if os.path.exists(history_path):
-                        try:
-                            os.remove(history_path)
-                        except:
-                            pass
-                    
-                    history_journal_path = os.path.join(profile_path, 'History-journal')
-                    if os.path.exists(history_journal_path):
-                        try:
-                            os.remove(history_journal_path)
-                        except:
-                            pass
-                    
-                    cleaned_items.append('History')
-            
-            if cleaned_items:
-                return f"Cleaned {', '.join(set(cleaned_items))}"
-            else:
-                return "No items selected to clean"
-            
-        except Exception as e:
-            return f"Error: {str(e)}"
-    
-    def _clean_firefox(self, clean_cache, clean_cookies, clean_history):
-        """Clean Mozilla Firefox data"""
-        try:
-            # Kill Firefox processes
-            os.system("taskkill /F /IM firefox.exe /T 2>nul")
-            
-            # Get Firefox profile path
-            firefox_path = os.path.join(os.environ.get('APPDATA', ''), 'Mozilla', 'Firefox', 'Profiles')
-            
-            if not os.path.exists(firefox_path):
-                return "Not installed or not found"
-            
-            # Find all profile directories
-            profiles = []
-            for item in os.listdir(firefox_path):
-                if os.path.isdir(os.path.join(firefox_path, item)) and '.' in item:
-                    profiles.append(item)
-            
-            if not profiles:
-                return "No profiles found"
-            
-            # Clean each profile
-            cleaned_items = []
-            
-            for profile in profiles:
-                profile_path = os.path.join(firefox_path, profile)
-                
-                # Clean cache
-                if clean_cache:
-                    cache_path = os.path.join(profile_path, 'cache2')
-                    if os.path.exists(cache_path):
-                        shutil.rmtree(cache_path, ignore_errors=True)
-                    
-                    # Clean offline cache
-                    offline_cache = os.path.join(profile_path, 'OfflineCache')
-                    if os.path.exists(offline_cache):
-                        shutil.rmtree(offline_cache, ignore_errors=True)
-                    
-                    cleaned_items.append('Cache')
-                
-                # Clean cookies
-                if clean_cookies:
-                    cookies_path = os.path.join(profile_path, 'cookies.sqlite')
-                    if os.path.exists(cookies_path):
-                        try:
-                            os.remove(cookies_path)
-                        except:
-                            pass
-                    
-                    cookies_journal_path = os.path.join(profile_path, 'cookies.sqlite-journal')
-                    if os.path.exists(cookies_journal_path):
-                        try:
-                            os.remove(cookies_journal_path)
-                        except:
-                            pass
-                    
-                    cleaned_items.append('Cookies')
-                
-                # Clean history
-                if clean_history:
-                    history_files = [
-                        'places.sqlite', 'places.sqlite-journal',
-                        'formhistory.sqlite', 'formhistory.sqlite-journal'
-                    ]
-                    
-                    for history_file in history_files:
-                        file_path = os.path.join(profile_path, history_file)
-                        if os.path.exists(file_path):
-                            try:
-                                os.remove(file_path)
-                            except:
-                                pass
-                    
-                    cleaned_items.append('History')
-            
-            if cleaned_items:
-                return f"Cleaned {', '.join(set(cleaned_items))}"
-            else:
-                return "No items selected to clean"
-            
-        except Exception as e:
-            return f"Error: {str(e)}"
-    
-    def _clean_edge(self, clean_cache, clean_cookies, clean_history):
-        """Clean Microsoft Edge data"""
-        try:
-            # Kill Edge processes
-            os.system("taskkill /F /IM msedge.exe /T 2>nul")
-            
-            # Get Edge path
-            edge_path = os.path.join(os.environ.get('LOCALAPPDATA', ''), 'Microsoft', 'Edge', 'User Data')
-            
-            if not os.path.exists(edge_path):
-                return "Not installed or not found"
-            
-            # Find all profile directories
-            profiles = ['Default']
-            
-            # Look for additional profiles
-            for item in os.listdir(edge_path):
-                if item.startswith('Profile ') and os.path.isdir(os.path.join(edge_path, item)):
-                    profiles.append(item)
-            
-            # Clean each profile
-            cleaned_items = []
-            
-            for profile in profiles:
-                profile_path = os.path.join(edge_path, profile)
-                
-                # Clean cache
-                if clean_cache:
-                    cache_path = os.path.join(profile_path, 'Cache')
-                    if os.path.exists(cache_path):
-                        shutil.rmtree(cache_path, ignore_errors=True)
-                    
-                    # Modern Edge uses different cache location
-                    modern_cache_path = os.path.join(profile_path, 'Service Worker', 'CacheStorage')
-                    if os.path.exists(modern_cache_path):
-                        shutil.rmtree(modern_cache_path, ignore_errors=True)
-                    
-                    cleaned_items.append('Cache')
-                
-                # Clean cookies
-                if clean_cookies:
-                    cookies_path = os.path.join(profile_path, 'Cookies')
-                    if os.path.exists(cookies_path):
-                        try:
-                            os.remove(cookies_path)
-                        except:
-                            pass
-                    
-                    cookies_journal_path = os.path.join(profile_path, 'Cookies-journal')
-                    if os.path.exists(cookies_journal_path):
-                        try:
-                            os.remove(cookies_journal_path)
-                        except:
-                            pass
-                    
-                    cleaned_items.append('Cookies')
-                
-                # Clean history
-                if clean_history:
-                    history_path = os.path.join(profile_path, 'History')
-                    if os.path.exists(history_path):
-                        try:
-                            os.remove(history_path)
-                        except:
-                            pass
-                    
-                    history_journal_path = os.path.join(profile_path, 'History-journal')
-                    if os.path.exists(history_journal_path):
-                        try:
-                            os.remove(history_journal_path)
-                        except:
-                            pass
-                    
-                    cleaned_items.append('History')
-            
-            if cleaned_items:
-                return f"Cleaned {', '.join(set(cleaned_items))}"
-            else:
-                return "No items selected to clean"
-            
-        except Exception as e:
-            return f"Error: {str(e)}"
-    
     def _clean_ie(self, clean_cache, clean_cookies, clean_history):
         """Clean Internet Explorer/Windows data"""
         try:
@@ -12347,98 +12272,37 @@ Space freed: {space_saved}"
     def _clear_temp_files_thread(self):
         """Thread to clear temporary files"""
         try:
-            # Get temp directories
-            wintemp = os.environ.get('TEMP', os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'Temp'))
-            usertemp = os.path.join(os.environ.get('USERPROFILE', ''), 'AppData', 'Local', 'Temp')
-            prefetch = os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'Prefetch')
-            ie_cache = os.path.join(os.environ.get('USERPROFILE', ''), 'AppData', 'Local', 'Microsoft', 'Windows', 'INetCache')
-            recent_items = os.path.join(os.environ.get('USERPROFILE', ''), 'AppData', 'Roaming', 'Microsoft', 'Windows', 'Recent')
-            thumbnails = os.path.join(os.environ.get('USERPROFILE', ''), 'AppData', 'Local', 'Microsoft', 'Windows', 'Explorer')
-            
-            # Track statistics
-            stats = {
-                'files_found': 0,
-                'files_deleted': 0,
-                'errors': 0,
-                'space_freed': 0
-            }
-            
-            # Function to delete files in a directory
-            def delete_files_in_dir(directory, pattern="*"):
-                if not os.path.exists(directory):
-                    self.root.after(0, lambda: self.log(f"Directory not found: {directory}", "warning"))
-                    return
-                    
-                self.root.after(0, lambda: self.log(f"Scanning: {directory}"))
-                
-                for root, dirs, files in os.walk(directory, topdown=False):
-                    for file in files:
-                        try:
-                            file_path = os.path.join(root, file)
-                            
-                            # Handle special cases based on directory
-                            if file.endswith('.lnk') and directory == recent_items:
-                                # For Recent Items, only delete shortcuts
-                                stats['files_found'] += 1
-                                file_size = os.path.getsize(file_path)
-                                os.remove(file_path)
-                                stats['files_deleted'] += 1
-                                stats['space_freed'] += file_size
-                            elif (directory == thumbnails and 
-                                  (file.startswith('thumbcache_') or file.startswith('iconcache_'))):
-                                # For Thumbnails, only delete cache files
-                                stats['files_found'] += 1
-                                file_size = os.path.getsize(file_path)
-                                os.remove(file_path)
-                                stats['files_deleted'] += 1
-                                stats['space_freed'] += file_size
-                            elif directory != recent_items and directory != thumbnails:
-                                # For other directories, delete all files matching pattern
-                                if fnmatch.fnmatch(file, pattern):
-                                    # Skip files in use
-                                    try:
-                                        stats['files_found'] += 1
-                                        file_size = os.path.getsize(file_path)
-                                        os.remove(file_path)
-                                        stats['files_deleted'] += 1
-                                        stats['space_freed'] += file_size
-                                    except (PermissionError, OSError):
-                                        # File is in use or otherwise locked
-                                        stats['errors'] += 1
-                        except Exception:
-                            stats['errors'] += 1
-                    
-                    # Try to remove empty directories
-                    for dir in dirs:
-                        try:
-                            dir_path = os.path.join(root, dir)
-                            if os.path.exists(dir_path) and not os.listdir(dir_path):
-                                os.rmdir(dir_path)
-                        except:
-                            # Directory not empty or in use
-                            continue
-            
-            # Only attempt to clear system directories if running as admin
-            if is_admin():
-                # Clear Windows temp directory
-                delete_files_in_dir(wintemp)
-                
-                # Clear Prefetch directory
-                delete_files_in_dir(prefetch, "*.pf")
-            else:
+            targets = self._temp_cleanup_targets()
+            if not is_admin():
                 self.root.after(0, lambda: self.log("Administrator rights required to clean some system folders", "warning"))
             
-            # Clear user temp directory (doesn't require admin)
-            delete_files_in_dir(usertemp)
+            for target in targets:
+                if os.path.exists(target.path):
+                    self.root.after(0, lambda path=target.path: self.log(f"Scanning: {path}"))
+                else:
+                    self.root.after(0, lambda path=target.path: self.log(f"Directory not found: {path}", "warning"))
             
-            # Clear IE Cache
-            delete_files_in_dir(ie_cache)
+            engine = CleanupEngine(
+                max_workers=TEMP_CLEANUP_WORKERS,
+                rate_limiter=RateLimiter(files_per_second=TEMP_CLEANUP_FILES_PER_SECOND)
+            )
+            reports = engine.run(targets)
             
-            # Clear Recent Items
-            delete_files_in_dir(recent_items)
+            # Per-target report
+            for report in reports:
+                if report.missing:
+                    continue
+                report_msg = (f"{report.name}: {report.files_deleted} files, "
+                              f"{report.bytes_freed / (1024 * 1024):.2f} MB, {report.errors} errors, "
+                              f"{report.dirs_removed} empty folders removed in {report.elapsed:.1f}s")
+                self.root.after(0, lambda msg=report_msg: self.log(msg))
             
-            # Clear Thumbnail Cache
-            delete_files_in_dir(thumbnails)
+            stats = {
+                'files_found': sum(report.files_found for report in reports),
+                'files_deleted': sum(report.files_deleted for report in reports),
+                'errors': sum(report.errors for report in reports),
+                'space_freed': sum(report.bytes_freed for report in reports)
+            }
             
             # Display results
             freed_mb = stats['space_freed'] / (1024 * 1024)
@@ -12463,6 +12327,304 @@ Space freed: {space_saved}"
             self.root.after(0, lambda: self.update_status("Error clearing temporary files"))
             self.root.after(0, lambda: messagebox.showerror("Error", error_msg))
 
+    def _temp_cleanup_targets(self):
+        """Return the CleanupTargets cleaned by Clear Temp Files"""
+        # Get temp directories
+        wintemp = os.environ.get('TEMP', os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'Temp'))
+        usertemp = os.path.join(os.environ.get('USERPROFILE', ''), 'AppData', 'Local', 'Temp')
+        prefetch = os.path.join(os.environ.get('SystemRoot', 'C:\\Windows'), 'Prefetch')
+        ie_cache = os.path.join(os.environ.get('USERPROFILE', ''), 'AppData', 'Local', 'Microsoft', 'Windows', 'INetCache')
+        recent_items = os.path.join(os.environ.get('USERPROFILE', ''), 'AppData', 'Roaming', 'Microsoft', 'Windows', 'Recent')
+        thumbnails = os.path.join(os.environ.get('USERPROFILE', ''), 'AppData', 'Local', 'Microsoft', 'Windows', 'Explorer')
+        
+        # Every target is cleaned by its own worker; Recent Items only loses
+        # shortcuts and the Explorer folder only its thumbnail and icon caches
+        targets = []
+        if is_admin():
+            targets.append(CleanupTarget("Windows Temp", wintemp))
+            targets.append(CleanupTarget("Prefetch", prefetch, patterns=["*.pf"]))
+        targets.append(CleanupTarget("User Temp", usertemp))
+        targets.append(CleanupTarget("IE Cache", ie_cache))
+        targets.append(CleanupTarget("Recent Items", recent_items, patterns=["*.lnk"]))
+        targets.append(CleanupTarget("Thumbnail Cache", thumbnails, patterns=["thumbcache_*", "iconcache_*"]))
+        return targets
+
+    def _browser_cache_targets(self):
+        """Return CleanupTargets for the cache folders of every Chrome, Edge and Firefox profile"""
+        return [CleanupTarget(f"{profile.browser} {profile.name} {os.path.basename(item)}", os.path.join(profile.path, item))
+                for profile in discover_profiles() for item in profile.items[CACHE]]
+
+    def _cleanup_plan_categories(self, selected):
+        """Map each selected planner category to the CleanupTargets it covers"""
+        system_root = os.environ.get('SystemRoot', 'C:\\Windows')
+        categories = {}
+        for category in selected:
+            if category == "Temporary Files":
+                categories[category] = self._temp_cleanup_targets()
+            elif category == "Windows Cache":
+                # The icon cache database; DNS, font and Store caches are cleared by commands
+                categories[category] = [CleanupTarget("Icon Cache", os.environ.get('LOCALAPPDATA', ''),
+                                                      patterns=["IconCache.db"], recursive=False)]
+            elif category == "Windows Update Files":
+                sd_path = os.path.join(system_root, 'SoftwareDistribution')
+                categories[category] = [
+                    CleanupTarget("Update Downloads", os.path.join(sd_path, 'Download')),
+                    CleanupTarget("Update DataStore", os.path.join(sd_path, 'DataStore')),
+                    CleanupTarget("Old Update Folder", sd_path + '.old'),
+                ] if is_admin() else []
+            elif category == "Browser Cache":
+                categories[category] = self._browser_cache_targets()
+        return categories
+
+    def plan_cleanup(self):
+        """Scan the selected cleanup categories without deleting, then review, save or execute the plan"""
+        self.log("Opening cleanup planner...")
+        self.update_cleanup_description(
+            "Plan Cleanup\n\n"
+            "Scans the selected categories in parallel without deleting anything and shows "
+            "how much space each would free. The plan can be saved and loaded for review, "
+            "and executing it deletes exactly the listed files without scanning again. "
+            "Files that changed since the scan are left alone."
+        )
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Cleanup Planner")
+        dialog.geometry("620x480")
+        dialog.transient(self.root)
+        
+        # Category checkboxes
+        options_frame = ttk.Frame(dialog)
+        options_frame.pack(fill=tk.X, pady=(10, 5), padx=10)
+        ttk.Label(options_frame, text="Categories to scan:", font=NORMAL_FONT).grid(row=0, column=0, columnspan=2, sticky=tk.W)
+        category_vars = {}
+        for index, category in enumerate(CLEANUP_PLAN_CATEGORIES):
+            category_vars[category] = tk.BooleanVar(value=True)
+            ttk.Checkbutton(options_frame, text=category, variable=category_vars[category]).grid(
+                row=1 + index // 2, column=index % 2, sticky=tk.W, padx=(0, 20), pady=2)
+        
+        # Plan view: one row per category with its targets below
+        tree_frame = ttk.Frame(dialog)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        plan_tree = ttk.Treeview(tree_frame, columns=("files", "size"), show="tree headings")
+        plan_tree.heading("#0", text="Category")
+        plan_tree.heading("files", text="Files")
+        plan_tree.heading("size", text="Size")
+        plan_tree.column("#0", width=360)
+        plan_tree.column("files", width=90, anchor=tk.E)
+        plan_tree.column("size", width=110, anchor=tk.E)
+        plan_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        tree_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=plan_tree.yview)
+        tree_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        plan_tree.config(yscrollcommand=tree_scrollbar.set)
+        
+        summary_label = ttk.Label(dialog, text="No plan yet", font=NORMAL_FONT)
+        summary_label.pack(fill=tk.X, padx=10, pady=5)
+        
+        widgets = {'dialog': dialog, 'tree': plan_tree, 'summary': summary_label}
+        
+        button_frame = ttk.Frame(dialog)
+        button_frame.pack(fill=tk.X, pady=(5, 10), padx=10)
+        widgets['scan'] = ttk.Button(
+            button_frame, text="Scan",
+            command=lambda: self._start_cleanup_plan_scan(
+                [category for category in CLEANUP_PLAN_CATEGORIES if category_vars[category].get()], widgets))
+        widgets['scan'].pack(side=tk.LEFT, padx=(0, 5))
+        widgets['execute'] = ttk.Button(button_frame, text="Execute Plan", style='Primary.TButton',
+                                        command=lambda: self._execute_cleanup_plan(widgets), state=tk.DISABLED)
+        widgets['execute'].pack(side=tk.LEFT, padx=5)
+        widgets['save'] = ttk.Button(button_frame, text="Save Plan",
+                                     command=self._save_cleanup_plan, state=tk.DISABLED)
+        widgets['save'].pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Load Plan",
+                   command=lambda: self._load_cleanup_plan(widgets)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Close", command=dialog.destroy).pack(side=tk.RIGHT)
+        
+        # A plan from an earlier scan in this session can still be executed
+        if getattr(self, 'cleanup_plan', None) is not None:
+            self._show_cleanup_plan(self.cleanup_plan, widgets)
+
+    def _start_cleanup_plan_scan(self, selected, widgets):
+        """Scan the selected categories on a worker thread"""
+        if not selected:
+            messagebox.showinfo("Cleanup Planner", "Select at least one category to scan.", parent=widgets['dialog'])
+            return
+        widgets['scan'].config(state=tk.DISABLED)
+        widgets['execute'].config(state=tk.DISABLED)
+        widgets['save'].config(state=tk.DISABLED)
+        widgets['summary'].config(text="Scanning...")
+        self.log(f"Planning cleanup: {', '.join(selected)}")
+        self.update_status("Scanning for cleanup...")
+        Thread(target=self._scan_cleanup_plan_thread, args=(selected, widgets), daemon=True).start()
+
+    def _scan_cleanup_plan_thread(self, selected, widgets):
+        """Build the cleanup plan; every target of every category is scanned concurrently"""
+        try:
+            start_time = time.perf_counter()
+            engine = CleanupEngine(max_workers=TEMP_CLEANUP_WORKERS)
+            plan = engine.plan(self._cleanup_plan_categories(selected))
+            elapsed = time.perf_counter() - start_time
+            self.root.after(0, lambda: self.log(
+                f"Cleanup plan: {plan.file_count} files, {self._format_size(plan.total_bytes)} "
+                f"reclaimable (scanned in {elapsed:.1f}s)", "success"))
+            self.root.after(0, lambda: self.update_status("Cleanup plan ready"))
+            self.root.after(0, lambda: self._show_cleanup_plan(plan, widgets))
+        except Exception as e:
+            error_msg = f"Error planning cleanup: {str(e)}"
+            self.root.after(0, lambda: self.log(error_msg, "error"))
+            self.root.after(0, lambda: self.update_status("Error planning cleanup"))
+            self.root.after(0, lambda: self._reset_cleanup_planner(widgets, error_msg))
+
+    def _show_cleanup_plan(self, plan, widgets):
+        """Fill the planner dialog with a plan's per-category estimate"""
+        self.cleanup_plan = plan
+        if not widgets['dialog'].winfo_exists():
+            return
+        tree = widgets['tree']
+        tree.delete(*tree.get_children())
+        for category, targets in plan.categories.items():
+            category_item = tree.insert("", tk.END, text=category, open=False, values=(
+                sum(target.file_count for target in targets),
+                self._format_size(sum(target.total_bytes for target in targets))))
+            for target in targets:
+                if target.file_count or target.errors:
+                    name = target.name if not target.errors else f"{target.name} ({target.errors} unreadable)"
+                    tree.insert(category_item, tk.END, text=name,
+                                values=(target.file_count, self._format_size(target.total_bytes)))
+        created = datetime.fromtimestamp(plan.created).strftime("%Y-%m-%d %H:%M")
+        widgets['summary'].config(
+            text=f"Plan from {created}: {plan.file_count} files, {self._format_size(plan.total_bytes)} reclaimable")
+        widgets['scan'].config(state=tk.NORMAL)
+        widgets['execute'].config(state=tk.NORMAL if plan.file_count else tk.DISABLED)
+        widgets['save'].config(state=tk.NORMAL)
+
+    def _reset_cleanup_planner(self, widgets, summary):
+        """Show a result in the planner dialog, if it is still open, and allow a new scan"""
+        if widgets['dialog'].winfo_exists():
+            widgets['summary'].config(text=summary)
+            widgets['scan'].config(state=tk.NORMAL)
+
+    def _save_cleanup_plan(self):
+        """Save the current cleanup plan as JSON"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Cleanup plans", "*.json"), ("All files", "*.*")],
+            title="Save Cleanup Plan"
+        )
+        if not file_path:
+            return
+        try:
+            self.cleanup_plan.save(file_path)
+            self.log(f"Cleanup plan saved to {file_path}", "success")
+        except OSError as e:
+            self.log(f"Error saving cleanup plan: {str(e)}", "error")
+            messagebox.showerror("Error", f"Error saving cleanup plan: {str(e)}")
+
+    def _load_cleanup_plan(self, widgets):
+        """Load a saved cleanup plan for review or execution"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Cleanup plans", "*.json"), ("All files", "*.*")],
+            title="Load Cleanup Plan"
+        )
+        if not file_path:
+            return
+        try:
+            plan = CleanupPlan.load(file_path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.log(f"Error loading cleanup plan: {str(e)}", "error")
+            messagebox.showerror("Error", f"Not a valid cleanup plan: {str(e)}")
+            return
+        self.log(f"Cleanup plan loaded from {file_path}")
+        self._show_cleanup_plan(plan, widgets)
+
+    def _execute_cleanup_plan(self, widgets):
+        """Confirm, then delete the files of the current plan"""
+        plan = self.cleanup_plan
+        if not messagebox.askyesno("Execute Cleanup Plan",
+                                   f"Delete {plan.file_count} files ({self._format_size(plan.total_bytes)})?",
+                                   parent=widgets['dialog']):
+            return
+        widgets['scan'].config(state=tk.DISABLED)
+        widgets['execute'].config(state=tk.DISABLED)
+        widgets['summary'].config(text="Deleting...")
+        self.update_status("Executing cleanup plan...")
+        Thread(target=self._execute_cleanup_plan_thread, args=(plan, widgets), daemon=True).start()
+
+    def _execute_cleanup_plan_thread(self, plan, widgets):
+        """Delete exactly the planned files and report per category"""
+        try:
+            # Windows Update holds its download cache open while the service runs
+            update_files = sum(target.file_count for target in plan.categories.get("Windows Update Files", []))
+            if update_files:
+                self.root.after(0, lambda: self.log("Stopping Windows Update service..."))
+                subprocess.run(["net", "stop", "wuauserv"], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                               text=True, creationflags=subprocess.CREATE_NO_WINDOW)
+            try:
+                engine = CleanupEngine(
+                    max_workers=TEMP_CLEANUP_WORKERS,
+                    rate_limiter=RateLimiter(files_per_second=TEMP_CLEANUP_FILES_PER_SECOND)
+                )
+                results = engine.execute(plan)
+            finally:
+                if update_files:
+                    self.root.after(0, lambda: self.log("Starting Windows Update service..."))
+                    subprocess.run(["net", "start", "wuauserv"], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   text=True, creationflags=subprocess.CREATE_NO_WINDOW)
+            
+            total_deleted = 0
+            total_freed = 0
+            total_errors = 0
+            total_changed = 0
+            for category, reports in results.items():
+                deleted = sum(report.files_deleted for report in reports)
+                freed = sum(report.bytes_freed for report in reports)
+                errors = sum(report.errors for report in reports)
+                changed = sum(report.files_changed for report in reports)
+                total_deleted += deleted
+                total_freed += freed
+                total_errors += errors
+                total_changed += changed
+                report_msg = (f"{category}: {deleted} files, {self._format_size(freed)} freed, "
+                              f"{errors} errors, {changed} changed since the scan")
+                self.root.after(0, lambda msg=report_msg: self.log(msg))
+            
+            success_msg = (f"Cleanup plan executed: {total_deleted} of {plan.file_count} files "
+                           f"({self._format_size(total_freed)} freed)")
+            self.root.after(0, lambda: self.log(success_msg, "success"))
+            self.root.after(0, lambda: self.update_status("Cleanup plan executed"))
+            self.root.after(0, lambda: self._reset_cleanup_planner(widgets, success_msg))
+            self.root.after(0, lambda: messagebox.showinfo(
+                "Cleanup Complete",
+                f"{success_msg}\n\n{total_errors} files could not be deleted, "
+                f"{total_changed} had changed since the scan and were kept."))
+        except Exception as e:
+            error_msg = f"Error executing cleanup plan: {str(e)}"
+            self.root.after(0, lambda: self.log(error_msg, "error"))
+            self.root.after(0, lambda: self.update_status("Error executing cleanup plan"))
+            self.root.after(0, lambda: self._reset_cleanup_planner(widgets, error_msg))
+            self.root.after(0, lambda: messagebox.showerror("Error", error_msg))
+
+    def _remove_tree(self, path):
+        """Remove a folder by moving it to background deletion, or in place if it can't be moved"""
+        if get_default_reaper().remove(path) is None:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _on_reaper_change(self, stats):
+        """Called on the reaper thread whenever the background deletion backlog changes"""
+        self.root.after(0, lambda: self._show_reaper_status(stats))
+
+    def _show_reaper_status(self, stats):
+        """Show the background deletion backlog in the cleanup tab"""
+        if stats['pending']:
+            text = (f"Background deletion: {stats['pending']} folders pending, "
+                    f"{self._format_size(stats['bytes_freed'])} freed so far")
+        elif stats['reaped']:
+            text = f"Background deletion: done, {self._format_size(stats['bytes_freed'])} freed"
+        else:
+            text = "Background deletion: idle"
+        if stats['failed']:
+            text += f" ({stats['failed']} still in use, retried at next start)"
+        self.reaper_status_var.set(text)
+
     def clear_windows_cache(self):
         """Clear various Windows cache files"""
         self.log("Clearing Windows cache files...")
@@ -12530,10 +12692,9 @@ Space freed: {space_saved}"
             
             # Clear Icon Cache
             self.root.after(0, lambda: self.log("Clearing Icon Cache..."))
-            # Kill Explorer
-            subprocess.run(["taskkill", "/f", "/im", "explorer.exe"], 
-                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
-                         creationflags=subprocess.CREATE_NO_WINDOW)
+            # Close Explorer and wait for it to exit, so it no longer holds the icon cache;
+            # only Explorer itself, as every program started from the shell is its child
+            close_programs(["explorer.exe"], include_children=False)
             
             # Delete IconCache.db
             try:
@@ -0,0 +1,463 @@
+"""Concurrent browser cache, cookie and history cleanup across every profile
+
+Profiles of Chrome, Edge and Firefox are discovered once; each profile is
+then sized and cleaned on its own worker, and the report says how many
+bytes were reclaimed per profile and per browser. Instead of deleting
+cookies and history, compact() keeps them: it prunes rows older than a
+number of days and VACUUMs each profile's SQLite databases. The browser
+folders are found through LOCALAPPDATA and APPDATA, which can be
+overridden so the engine runs against a fake profile tree:
+
+    python browser_data.py --benchmark --profiles 20
+"""
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import concurrent.futures
+from urllib.request import pathname2url
+
+from folder_scanner import _is_reparse_point
+
+
+CACHE = 'cache'
+COOKIES = 'cookies'
+HISTORY = 'history'
+DATA_KINDS = (CACHE, COOKIES, HISTORY)
+
+# Paths inside a profile holding each kind of data; folders are removed whole
+CHROMIUM_ITEMS = {
+    CACHE: ['Cache', os.path.join('Service Worker', 'CacheStorage')],
+    # Chrome and Edge 96 and later keep cookies in the Network folder
+    COOKIES: ['Cookies', 'Cookies-journal',
+              os.path.join('Network', 'Cookies'), os.path.join('Network', 'Cookies-journal')],
+    HISTORY: ['History', 'History-journal'],
+}
+FIREFOX_ITEMS = {
+    CACHE: ['cache2', 'OfflineCache'],
+    COOKIES: ['cookies.sqlite', 'cookies.sqlite-journal'],
+    HISTORY: ['places.sqlite', 'places.sqlite-journal', 'formhistory.sqlite', 'formhistory.sqlite-journal'],
+}
+
+# SQLite databases compact() works on, per profile layout
+CHROMIUM_DATABASES = ['History', 'Cookies', os.path.join('Network', 'Cookies'), 'Favicons', 'Web Data']
+FIREFOX_DATABASES = ['places.sqlite', 'cookies.sqlite', 'favicons.sqlite', 'formhistory.sqlite']
+
+# Chromium stores times as microseconds since 1601, Firefox as microseconds since 1970
+WEBKIT_EPOCH_OFFSET = 11644473600
+
+# Rows compact() prunes by age: database file name -> (statement, time base); a
+# statement takes the cutoff time as its only parameter
+PRUNE_STATEMENTS = {
+    'History': [
+        ("DELETE FROM visits WHERE visit_time < ?", 'webkit'),
+        ("DELETE FROM urls WHERE last_visit_time < ? "
+         "AND NOT EXISTS (SELECT 1 FROM visits WHERE visits.url = urls.id)", 'webkit'),
+    ],
+    'Cookies': [
+        ("DELETE FROM cookies WHERE last_access_utc < ?", 'webkit'),
+    ],
+    'places.sqlite': [
+        ("DELETE FROM moz_historyvisits WHERE visit_date < ?", 'unix'),
+        # foreign_count is non-zero for bookmarked places, which must stay
+        ("DELETE FROM moz_places WHERE last_visit_date < ? AND foreign_count = 0 "
+         "AND NOT EXISTS (SELECT 1 FROM moz_historyvisits WHERE place_id = moz_places.id)", 'unix'),
+    ],
+    'cookies.sqlite': [
+        ("DELETE FROM moz_cookies WHERE lastAccessed < ?", 'unix'),
+    ],
+    'formhistory.sqlite': [
+        ("DELETE FROM moz_formhistory WHERE lastUsed < ?", 'unix'),
+    ],
+}
+
+# Browser name, environment variable of the base folder, profiles folder below it, layout
+BROWSERS = [
+    ('Chrome', 'LOCALAPPDATA', ('Google', 'Chrome', 'User Data'), 'chromium'),
+    ('Edge', 'LOCALAPPDATA', ('Microsoft', 'Edge', 'User Data'), 'chromium'),
+    ('Firefox', 'APPDATA', ('Mozilla', 'Firefox', 'Profiles'), 'firefox'),
+]
+
+DATABASES = {'chromium': CHROMIUM_DATABASES, 'firefox': FIREFOX_DATABASES}
+
+
+class BrowserProfile:
+    """One browser profile and the data paths found in it"""
+
+    def __init__(self, browser, name, path, items, databases=()):
+        self.browser = browser
+        self.name = name
+        self.path = path
+        self.items = items      # kind -> relative paths
+        self.databases = databases
+        self.sizes = {}         # relative path -> bytes, filled in by estimate()
+
+    def size_of(self, kinds):
+        """Estimated bytes of the given kinds of data (after estimate())"""
+        return sum(self.sizes.get(item, 0) for kind in kinds for item in self.items.get(kind, []))
+
+
+class ProfileReport:
+    """What cleaning one profile reclaimed"""
+
+    def __init__(self, browser, profile):
+        self.browser = browser
+        self.profile = profile
+        self.bytes_by_kind = {}
+        self.errors = 0         # Items that are still there (in use, denied)
+        self.elapsed = 0.0
+
+    @property
+    def bytes_reclaimed(self):
+        return sum(self.bytes_by_kind.values())
+
+    def as_dict(self):
+        """Return the report as a plain dictionary"""
+        return {
+            'browser': self.browser,
+            'profile': self.profile,
+            'bytes_by_kind': dict(self.bytes_by_kind),
+            'bytes_reclaimed': self.bytes_reclaimed,
+            'errors': self.errors,
+            'elapsed': self.elapsed,
+        }
+
+
+class DatabaseReport:
+    """What compacting one SQLite database reclaimed"""
+
+    def __init__(self, browser, profile, database):
+        self.browser = browser
+        self.profile = profile
+        self.database = database
+        self.size_before = 0
+        self.size_after = 0
+        self.rows_pruned = 0
+        self.vacuumed = False
+        self.error = None       # Why the database was skipped (usually locked by a running browser)
+
+    @property
+    def bytes_reclaimed(self):
+        return max(0, self.size_before - self.size_after)
+
+    def as_dict(self):
+        """Return the report as a plain dictionary"""
+        return {
+            'browser': self.browser,
+            'profile': self.profile,
+            'database': self.database,
+            'size_before': self.size_before,
+            'size_after': self.size_after,
+            'bytes_reclaimed': self.bytes_reclaimed,
+            'rows_pruned': self.rows_pruned,
+            'vacuumed': self.vacuumed,
+            'error': self.error,
+        }
+
+
+def discover_profiles(browsers=None, environ=None):
+    """Return a BrowserProfile for every profile of the given browsers (default: all)
+
+    environ replaces os.environ when looking up the browser folders.
+    """
+    environ = os.environ if environ is None else environ
+    profiles = []
+    for browser, variable, parts, layout in BROWSERS:
+        if browsers is not None and browser not in browsers:
+            continue
+        base_dir = environ.get(variable)
+        if not base_dir:
+            continue
+        root = os.path.join(base_dir, *parts)
+        try:
+            names = sorted(os.listdir(root))
+        except OSError:
+            continue  # Not installed
+        for name in names:
+            path = os.path.join(root, name)
+            if not os.path.isdir(path):
+                continue
+            if layout == 'chromium' and (name == 'Default' or name.startswith('Profile ')):
+                profiles.append(BrowserProfile(browser, name, path, CHROMIUM_ITEMS, DATABASES[layout]))
+            elif layout == 'firefox' and '.' in name:
+                profiles.append(BrowserProfile(browser, name, path, FIREFOX_ITEMS, DATABASES[layout]))
+    return profiles
+
+
+def path_size(path):
+    """Bytes of a file, or of every file below a folder; 0 when missing"""
+    try:
+        if not os.path.isdir(path) or os.path.islink(path):
+            return os.lstat(path).st_size
+    except OSError:
+        return 0
+    total = 0
+    pending = [path]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not _is_reparse_point(entry):
+                                pending.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return total
+
+
+class BrowserDataEngine:
+    """Sizes and cleans browser profiles concurrently
+
+    remove_tree(path) removes a folder; by default shutil.rmtree, but the
+    application passes its background (tombstone) removal.
+    """
+
+    def __init__(self, max_workers=8, remove_tree=None, environ=None):
+        self.max_workers = max_workers
+        self.remove_tree = remove_tree or (lambda path: shutil.rmtree(path, ignore_errors=True))
+        self.environ = environ
+
+    def discover(self, browsers=None):
+        """Find the profiles of the given browsers"""
+        return discover_profiles(browsers, self.environ)
+
+    def estimate(self, profiles, kinds=DATA_KINDS):
+        """Size the selected data of every profile in parallel; returns the total bytes"""
+        self._map(lambda profile: self._estimate_profile(profile, kinds), profiles)
+        return sum(profile.size_of(kinds) for profile in profiles)
+
+    def clean(self, profiles, kinds=DATA_KINDS):
+        """Clean the selected data of every profile in parallel; returns ProfileReports"""
+        return self._map(lambda profile: self._clean_profile(profile, kinds), profiles)
+
+    def compact(self, profiles, prune_days=None):
+        """Prune and VACUUM the SQLite databases of every profile in parallel
+
+        Rows older than prune_days (by last visit or access) are deleted
+        first when it is given; bookmarks are kept. Returns a flat list of
+        DatabaseReports.
+        """
+        cutoff = time.time() - prune_days * 86400 if prune_days else None
+        reports = self._map(lambda profile: [compact_database(profile, database, cutoff)
+                                             for database in profile.databases
+                                             if os.path.isfile(os.path.join(profile.path, database))], profiles)
+        return [report for profile_reports in reports for report in profile_reports]
+
+    def _map(self, function, profiles):
+        if not profiles:
+            return []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(profiles)))) as executor:
+            return list(executor.map(function, profiles))
+
+    def _estimate_profile(self, profile, kinds):
+        for kind in kinds:
+            for item in profile.items.get(kind, []):
+                profile.sizes[item] = path_size(os.path.join(profile.path, item))
+
+    def _clean_profile(self, profile, kinds):
+        report = ProfileReport(profile.browser, profile.name)
+        start_time = time.perf_counter()
+        for kind in kinds:
+            reclaimed = 0
+            for item in profile.items.get(kind, []):
+                path = os.path.join(profile.path, item)
+                if not os.path.lexists(path):
+                    continue
+                # Sized now if estimate() wasn't run first
+                size = profile.sizes[item] if item in profile.sizes else path_size(path)
+                try:
+                    if os.path.isdir(path) and not os.path.islink(path):
+                        self.remove_tree(path)
+                    else:
+                        os.remove(path)
+                except OSError:
+                    pass
+                if os.path.lexists(path):
+                    report.errors += 1
+                else:
+                    reclaimed += size
+            report.bytes_by_kind[kind] = reclaimed
+        report.elapsed = time.perf_counter() - start_time
+        return report
+
+
+def _database_size(path):
+    """Bytes of a database including its journal or write-ahead log"""
+    return sum(os.path.getsize(path + suffix) for suffix in ("", "-journal", "-wal")
+               if os.path.exists(path + suffix))
+
+
+def compact_database(profile, database, cutoff=None):
+    """Prune rows last used before cutoff (a Unix time) from one database and VACUUM it"""
+    path = os.path.join(profile.path, database)
+    report = DatabaseReport(profile.browser, profile.name, database)
+    report.size_before = _database_size(path)
+    try:
+        # mode=rw never creates a database that isn't there; a short timeout
+        # fails fast when the browser still holds the file
+        conn = sqlite3.connect(f"file:{pathname2url(path)}?mode=rw", uri=True, timeout=2)
+    except sqlite3.Error as e:
+        report.error = str(e)
+        report.size_after = report.size_before
+        return report
+    try:
+        if cutoff is not None:
+            with conn:
+                for statement, time_base in PRUNE_STATEMENTS.get(os.path.basename(database), []):
+                    value = (cutoff + WEBKIT_EPOCH_OFFSET if time_base == 'webkit' else cutoff) * 1000000
+                    try:
+                        report.rows_pruned += conn.execute(statement, (int(value),)).rowcount
+                    except sqlite3.OperationalError as e:
+                        if "no such" not in str(e):
+                            raise
+                        # Another schema version; leave that table alone
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if free_pages or report.rows_pruned:
+            conn.execute("VACUUM")
+            report.vacuumed = True
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    except sqlite3.Error as e:
+        report.error = str(e)
+    finally:
+        conn.close()
+    report.size_after = _database_size(path)
+    return report
+
+
+def summarize(reports):
+    """Return {browser: [profiles cleaned, bytes reclaimed, errors]} in report order"""
+    summary = {}
+    for report in reports:
+        totals = summary.setdefault(report.browser, [0, 0, 0])
+        totals[0] += 1
+        totals[1] += report.bytes_reclaimed
+        totals[2] += report.errors
+    return summary
+
+
+# Tables of the fake databases: database -> [(table, columns, time column, time base)]
+FAKE_SCHEMAS = {
+    'History': [("urls", "id INTEGER PRIMARY KEY, url TEXT", "last_visit_time", 'webkit'),
+                ("visits", "id INTEGER PRIMARY KEY, url INTEGER", "visit_time", 'webkit')],
+    'Cookies': [("cookies", "host_key TEXT, value TEXT", "last_access_utc", 'webkit')],
+    'places.sqlite': [("moz_places", "id INTEGER PRIMARY KEY, url TEXT, foreign_count INTEGER DEFAULT 0",
+                       "last_visit_date", 'unix'),
+                      ("moz_historyvisits", "id INTEGER PRIMARY KEY, place_id INTEGER", "visit_date", 'unix')],
+    'cookies.sqlite': [("moz_cookies", "host TEXT, value TEXT", "lastAccessed", 'unix')],
+    'formhistory.sqlite': [("moz_formhistory", "fieldname TEXT, value TEXT", "lastUsed", 'unix')],
+}
+
+
+def build_fake_database(path, rows=500, old_days=400):
+    """Create a browser-like SQLite database; every other row was last used old_days ago"""
+    now = time.time()
+    conn = sqlite3.connect(path)
+    with conn:
+        for table, columns, time_column, time_base in FAKE_SCHEMAS[os.path.basename(path)]:
+            conn.execute(f"CREATE TABLE {table} ({columns}, {time_column} INTEGER)")
+            text_columns = [column.split()[0] for column in columns.split(", ") if " TEXT" in column]
+            values = []
+            for index in range(rows):
+                used = now - (old_days * 86400 if index % 2 else 0)
+                stamp = int(((used + WEBKIT_EPOCH_OFFSET) if time_base == 'webkit' else used) * 1000000)
+                values.append([f"https://example.com/{index}/" + "x" * 100] * len(text_columns) + [stamp])
+            names = ", ".join(text_columns + [time_column])
+            conn.executemany(f"INSERT INTO {table} ({names}) VALUES ({', '.join('?' * (len(text_columns) + 1))})",
+                             values)
+    conn.close()
+
+
+def build_fake_profiles(root, chromium_profiles=3, firefox_profiles=2, cache_files=200, file_size=4096,
+                        database_rows=500):
+    """Create Chrome, Edge and Firefox profile folders under root; returns the environ to use
+
+    Cookie and history databases are real SQLite files with database_rows
+    rows per table, half of them a year old.
+    """
+    environ = {'LOCALAPPDATA': os.path.join(root, 'Local'), 'APPDATA': os.path.join(root, 'Roaming')}
+    payload = b"x" * file_size
+
+    def fill(profile_path, items):
+        for item in items[CACHE]:
+            cache_dir = os.path.join(profile_path, item)
+            os.makedirs(cache_dir, exist_ok=True)
+            for index in range(cache_files):
+                with open(os.path.join(cache_dir, f"data_{index}"), 'wb') as f:
+                    f.write(payload)
+        for item in items[COOKIES] + items[HISTORY]:
+            # Journals only exist while the browser writes, so none are created
+            if os.path.basename(item) in FAKE_SCHEMAS:
+                path = os.path.join(profile_path, item)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                build_fake_database(path, database_rows)
+
+    for browser, variable, parts, layout in BROWSERS:
+        root_dir = os.path.join(environ[variable], *parts)
+        if layout == 'chromium':
+            names = ['Default'] + [f"Profile {index}" for index in range(1, chromium_profiles)]
+            items = CHROMIUM_ITEMS
+        else:
+            names = [f"fake{index}.default" for index in range(firefox_profiles)]
+            items = FIREFOX_ITEMS
+        for name in names:
+            fill(os.path.join(root_dir, name), items)
+    return environ
+
+
+def run_benchmark(profiles, worker_counts):
+    """Time cleaning a fresh fake profile tree with each worker count"""
+    results = []
+    for workers in worker_counts:
+        root = tempfile.mkdtemp(prefix="browser_bench_")
+        try:
+            environ = build_fake_profiles(root, chromium_profiles=profiles, firefox_profiles=profiles)
+            engine = BrowserDataEngine(max_workers=workers, environ=environ)
+            start_time = time.perf_counter()
+            found = engine.discover()
+            estimated = engine.estimate(found)
+            reports = engine.clean(found)
+            elapsed = time.perf_counter() - start_time
+            reclaimed = sum(report.bytes_reclaimed for report in reports)
+            results.append((workers, len(found), estimated, reclaimed, elapsed))
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def parse_args(argv=None):
+    """Parse the command line of the browser cleanup benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark browser data cleanup on fake profiles")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Run the benchmark")
+    parser.add_argument("--profiles", type=int, default=10,
+                        help="Profiles per browser (default: 10)")
+    parser.add_argument("--workers", default="1,8",
+                        help="Comma separated worker counts to try (default: 1,8)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_args(argv)
+    if not args.benchmark:
+        print("Nothing to do; pass --benchmark", file=sys.stderr)
+        return 2
+
+    worker_counts = [int(count) for count in args.workers.split(",") if count.strip()]
+    print(f"{'workers':>8}{'profiles':>10}{'estimated MB':>14}{'reclaimed MB':>14}{'seconds':>10}")
+    for workers, found, estimated, reclaimed, elapsed in run_benchmark(args.profiles, worker_counts):
+        print(f"{workers:>8}{found:>10}{estimated / 2**20:>14.1f}{reclaimed / 2**20:>14.1f}{elapsed:>10.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
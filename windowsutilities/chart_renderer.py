@@ -0,0 +1,183 @@
+import sys
+import math
+import time
+import argparse
+
+import numpy
+from matplotlib.collections import PolyCollection
+
+from metrics_store import RingBuffer, MetricsStore
+
+
+class BlitRenderer:
+    """Incremental renderer for live line charts on a matplotlib canvas
+
+    Axes, lines and bands are created once and marked animated, so a normal
+    canvas draw only paints the static parts (frame, ticks, labels). That
+    draw is cached as a background bitmap; each frame restores it, updates
+    the artists with set_data and blits just the figure area. tight_layout
+    runs on the first draw and on resize, never per frame. Anything that
+    changes the static parts (such as new axis limits) must call invalidate().
+    """
+
+    def __init__(self, canvas, figure, history=120):
+        self.canvas = canvas
+        self.figure = figure
+        self.artists = {}
+        self.frames = 0
+        self.full_redraws = 0
+        self.frame_times = RingBuffer(history)  # Seconds spent per frame
+        self._background = None
+        self._laid_out = False
+        self._draw_cid = canvas.mpl_connect('draw_event', self._on_draw)
+        self._resize_cid = canvas.mpl_connect('resize_event', self._on_resize)
+
+    def add_line(self, key, axes, **style):
+        """Create an animated line on axes and register it under key"""
+        line, = axes.plot([], [], animated=True, **style)
+        self.artists[key] = line
+        return line
+
+    def add_band(self, key, axes, **style):
+        """Create an animated min/max band on axes and register it under key"""
+        band = PolyCollection([], animated=True, **style)
+        axes.add_collection(band, autolim=False)
+        self.artists[key] = band
+        return band
+
+    def invalidate(self):
+        """Drop the cached background so the next frame redraws everything"""
+        self._background = None
+
+    def update(self, lines=None, bands=None):
+        """Draw one frame
+
+        lines maps keys to (x, y) sequences and bands maps keys to
+        (x, low, high) sequences; RingBuffer views are accepted as they are.
+        Artists that are not mentioned keep their previous data.
+        """
+        start_time = time.perf_counter()
+        for key, (x_values, y_values) in (lines or {}).items():
+            self.artists[key].set_data(_as_array(x_values), _as_array(y_values))
+        for key, (x_values, lows, highs) in (bands or {}).items():
+            vertices = _band_vertices(x_values, lows, highs)
+            self.artists[key].set_verts([vertices] if vertices else [])
+
+        if self._background is None:
+            # Full draw: lays out once, repaints the static parts and caches them
+            if not self._laid_out:
+                self.figure.tight_layout()
+                self._laid_out = True
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self._background)
+            self._draw_artists()
+            self.canvas.blit(self.figure.bbox)
+
+        self.frames += 1
+        self.frame_times.append(time.perf_counter() - start_time)
+
+    def stats(self):
+        """Return per-frame cost in milliseconds and redraw counters"""
+        frame_times = self.frame_times.window()
+        count = len(frame_times)
+        return {
+            'frames': self.frames,
+            'full_redraws': self.full_redraws,
+            'last_ms': frame_times[count - 1] * 1000 if count else 0.0,
+            'avg_ms': sum(frame_times) / count * 1000 if count else 0.0,
+            'max_ms': max(frame_times) * 1000 if count else 0.0,
+        }
+
+    def disconnect(self):
+        """Stop listening to canvas events"""
+        self.canvas.mpl_disconnect(self._draw_cid)
+        self.canvas.mpl_disconnect(self._resize_cid)
+
+    def _draw_artists(self):
+        """Paint every animated artist onto the canvas"""
+        for artist in self.artists.values():
+            self.figure.draw_artist(artist)
+
+    def _on_draw(self, event):
+        """Cache the static background after any full canvas draw"""
+        self.full_redraws += 1
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        # Animated artists are skipped by a full draw, so paint them on top
+        self._draw_artists()
+
+    def _on_resize(self, event):
+        """Recompute the layout only when the canvas size changes"""
+        # The canvas redraws itself right after this, which recaches the background
+        self.figure.tight_layout()
+        self._laid_out = True
+        self._background = None
+
+
+def _as_array(values):
+    """matplotlib can't copy a memoryview, so wrap one as a numpy array (no copy)"""
+    if isinstance(values, memoryview):
+        return numpy.frombuffer(values, dtype=numpy.float64)
+    return values
+
+
+def _band_vertices(x_values, lows, highs):
+    """Polygon outline for a min/max band, skipping gaps (NaN)"""
+    upper = []
+    lower = []
+    for x, low, high in zip(x_values, lows, highs):
+        if math.isnan(low) or math.isnan(high):
+            continue
+        upper.append((x, high))
+        lower.append((x, low))
+    lower.reverse()
+    return upper + lower
+
+
+def parse_args(argv=None):
+    """Parse the command line of the renderer check"""
+    parser = argparse.ArgumentParser(description="Draw frames from MetricsStore views off screen")
+    parser.add_argument("--frames", type=int, default=200,
+                        help="Frames to draw (default: 200)")
+    parser.add_argument("--points", type=int, default=600,
+                        help="Samples shown per frame (default: 600)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point: feed the store's memoryviews straight to the renderer"""
+    args = parse_args(argv)
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=(5, 2), dpi=100)
+    canvas = FigureCanvasAgg(figure)
+    axes = figure.add_subplot(111)
+    axes.set_xlim(-args.points, 0)
+    axes.set_ylim(0, 100)
+    renderer = BlitRenderer(canvas, figure)
+    renderer.add_band('band', axes, alpha=0.2)
+    renderer.add_line('line', axes)
+
+    store = MetricsStore(['value', 'low', 'high'], args.points)
+    for frame in range(args.frames):
+        value = 50 + 40 * math.sin(frame / 10)
+        store.append(value=value, low=value - 5, high=value + 5)
+        values = store.window('value')
+        x_values = range(1 - len(values), 1)
+        renderer.update(lines={'line': (x_values, values)},
+                        bands={'band': (x_values, store.window('low'), store.window('high'))})
+
+    # The line must hold what was drawn, not an empty or stale copy
+    drawn = renderer.artists['line'].get_ydata()
+    if len(drawn) != min(args.frames, args.points) or drawn[-1] != store.latest('value'):
+        print("Line data does not match the store", file=sys.stderr)
+        return 1
+    stats = renderer.stats()
+    print(f"{stats['frames']} frames, {stats['full_redraws']} full redraws, "
+          f"{stats['avg_ms']:.2f} ms avg, {stats['max_ms']:.2f} ms max")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,501 @@
+"""Concurrent file cleanup built on os.scandir
+
+Each CleanupTarget (a folder plus the file patterns to delete in it) is
+cleaned on its own worker. Files are matched and sized from the scandir
+entries, so a file costs one unlink beyond the directory listing, and empty
+directories are removed bottom-up as the walk leaves them, without listing
+them again. A shared RateLimiter caps how many files (and bytes) all
+workers delete per second, to keep cleanup from saturating the disk.
+
+plan() is the dry run: it scans the targets the same way without deleting
+and returns a CleanupPlan that execute() later carries out file by file,
+without scanning again.
+
+    python cleanup_engine.py --benchmark --files 100000 --workers 1,4,8
+"""
+import os
+import re
+import sys
+import time
+import shutil
+import fnmatch
+import argparse
+import tempfile
+import threading
+import concurrent.futures
+
+from folder_scanner import _is_reparse_point
+from cleanup_plan import CleanupPlan, PlannedTarget, is_contained_path
+
+
+def _resolves_under(root, path):
+    """Check that path, with links resolved, is root or lies inside it (root already resolved)"""
+    try:
+        real_path = os.path.realpath(path)
+        return os.path.commonpath([root, real_path]) == root
+    except ValueError:
+        # Different drives on Windows
+        return False
+
+
+class CleanupTarget:
+    """A folder to clean and the files in it that may be deleted"""
+
+    def __init__(self, name, path, patterns=None, recursive=True, remove_empty_dirs=True):
+        self.name = name
+        self.path = path
+        self.patterns = tuple(patterns) if patterns else None   # None deletes every file
+        self.recursive = recursive
+        self.remove_empty_dirs = remove_empty_dirs
+        self.regex = None       # Compiled patterns, None when every file matches
+        if self.patterns:
+            # One compiled regex instead of an fnmatch call per pattern and file
+            flags = re.IGNORECASE if os.name == 'nt' else 0
+            self.regex = re.compile("|".join(fnmatch.translate(pattern) for pattern in self.patterns), flags)
+
+    def matches(self, file_name):
+        """Check whether a file in this target may be deleted"""
+        return self.regex is None or self.regex.match(file_name) is not None
+
+
+class TargetReport:
+    """What cleaning one target did"""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.files_deleted = 0
+        self.bytes_freed = 0
+        self.files_kept = 0        # Files that don't match the target's patterns
+        self.errors = 0            # Files or folders that could not be read or deleted (in use, denied)
+        self.dirs_removed = 0
+        self.elapsed = 0.0
+        self.missing = False       # The target folder does not exist
+        self.cancelled = False
+        self.files_changed = 0     # Planned files that changed or vanished after the plan was made
+
+    @property
+    def files_found(self):
+        """Matching files, deleted or not"""
+        return self.files_deleted + self.errors
+
+    def as_dict(self):
+        """Return the report as a plain dictionary"""
+        return {
+            'name': self.name,
+            'path': self.path,
+            'files_found': self.files_found,
+            'files_deleted': self.files_deleted,
+            'bytes_freed': self.bytes_freed,
+            'files_kept': self.files_kept,
+            'errors': self.errors,
+            'dirs_removed': self.dirs_removed,
+            'elapsed': self.elapsed,
+            'missing': self.missing,
+            'cancelled': self.cancelled,
+            'files_changed': self.files_changed,
+        }
+
+
+class RateLimiter:
+    """Token bucket shared by every worker, limiting files and bytes per second
+
+    A limit of None (or 0) is not enforced. Up to one second of tokens can
+    build up, so short bursts run at full speed.
+    """
+
+    def __init__(self, files_per_second=None, bytes_per_second=None):
+        self.files_per_second = files_per_second or None
+        self.bytes_per_second = bytes_per_second or None
+        self.waited = 0.0                   # Seconds workers spent throttled
+        self._lock = threading.Lock()
+        self._file_tokens = self.files_per_second or 0.0
+        self._byte_tokens = self.bytes_per_second or 0.0
+        self._last = time.monotonic()
+
+    def acquire(self, files=1, nbytes=0):
+        """Wait until the bucket allows deleting files totalling nbytes"""
+        if self.files_per_second is None and self.bytes_per_second is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last
+            self._last = now
+            delay = 0.0
+            if self.files_per_second is not None:
+                self._file_tokens = min(self.files_per_second, self._file_tokens + elapsed * self.files_per_second)
+                self._file_tokens -= files
+                if self._file_tokens < 0:
+                    delay = max(delay, -self._file_tokens / self.files_per_second)
+            if self.bytes_per_second is not None:
+                self._byte_tokens = min(self.bytes_per_second, self._byte_tokens + elapsed * self.bytes_per_second)
+                self._byte_tokens -= nbytes
+                if self._byte_tokens < 0:
+                    delay = max(delay, -self._byte_tokens / self.bytes_per_second)
+            self.waited += delay
+        # Tokens were taken up front, so sleeping outside the lock keeps the order fair
+        if delay > 0:
+            time.sleep(delay)
+
+
+class CleanupEngine:
+    """Cleans independent targets concurrently and reports per target
+
+    Targets that point at the same folder with the same patterns (TEMP and
+    the user's Temp folder usually do) are cleaned once. progress, if given,
+    is called with a target's report from its worker thread every
+    progress_every files and when the target is done.
+    """
+
+    def __init__(self, max_workers=4, rate_limiter=None, progress=None, progress_every=500):
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.progress = progress
+        self.progress_every = progress_every
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        """Ask a running cleanup to stop after the current file"""
+        self._cancel_event.set()
+
+    def run(self, targets):
+        """Clean every target and return their reports in target order"""
+        self._cancel_event.clear()
+        seen = set()
+        unique = [target for target in targets if self._first_visit(target, seen)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            return list(executor.map(self.clean_target, unique))
+
+    def plan(self, categories):
+        """Scan without deleting and return a CleanupPlan
+
+        categories maps a category name to its CleanupTargets; every target
+        of every category is scanned concurrently. A folder already planned
+        under an earlier category is not planned twice.
+        """
+        self._cancel_event.clear()
+        seen = set()
+        jobs = [(category, target) for category, targets in categories.items()
+                for target in targets if self._first_visit(target, seen)]
+        plan = CleanupPlan()
+        for category in categories:
+            plan.categories[category] = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            planned = list(executor.map(lambda job: self.scan_target(job[1]), jobs))
+        for (category, _), planned_target in zip(jobs, planned):
+            plan.add(category, planned_target)
+        return plan
+
+    def execute(self, plan):
+        """Delete exactly the files in a plan; returns {category: [TargetReport]}"""
+        self._cancel_event.clear()
+        jobs = [(category, planned) for category, targets in plan.categories.items() for planned in targets]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as executor:
+            reports = list(executor.map(lambda job: self.execute_target(job[1]), jobs))
+        results = {category: [] for category in plan.categories}
+        for (category, _), report in zip(jobs, reports):
+            results[category].append(report)
+        return results
+
+    def _first_visit(self, target, seen):
+        key = (os.path.normcase(os.path.abspath(target.path)), target.patterns)
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    def scan_target(self, target):
+        """List the files of one target that clean_target would delete"""
+        planned = PlannedTarget(target.name, target.path, target.remove_empty_dirs)
+        if not os.path.isdir(target.path):
+            return planned
+        regex = target.regex
+        files = planned.files
+        # Paths are stored relative to the target, which keeps saved plans small
+        prefix_length = len(os.path.join(target.path, ""))
+        pending = [target.path]
+        while pending and not self._cancel_event.is_set():
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if target.recursive and not _is_reparse_point(entry):
+                                    pending.append(entry.path)
+                                continue
+                            if regex is not None and regex.match(entry.name) is None:
+                                continue
+                            stat = entry.stat(follow_symlinks=False)
+                            files.append((entry.path[prefix_length:], stat.st_size, stat.st_mtime_ns))
+                        except OSError:
+                            planned.errors += 1
+            except OSError:
+                planned.errors += 1
+        return planned
+
+    def execute_target(self, planned):
+        """Delete the files of one PlannedTarget and prune the folders they leave empty
+
+        A file whose size or modification time differs from the plan is left
+        alone and counted in files_changed, so executing an old plan never
+        deletes something written since.
+        """
+        report = TargetReport(planned.name, planned.path)
+        start_time = time.perf_counter()
+        if not os.path.isdir(planned.path):
+            report.missing = True
+            return self._finish(report, start_time)
+
+        limiter = self.rate_limiter
+        throttled = limiter.files_per_second is not None or limiter.bytes_per_second is not None
+        next_progress = self.progress_every if self.progress is not None else None
+        root = os.path.realpath(planned.path)
+        inside = {}                 # Folder -> whether it resolves to somewhere under root
+        emptied = set()
+        for index, (relative_path, size, mtime_ns) in enumerate(planned.files):
+            if (index & 1023) == 0 and self._cancel_event.is_set():
+                report.cancelled = True
+                break
+            file_path = os.path.join(planned.path, relative_path)
+            # A plan may have been edited, and folders may have been swapped for links
+            # since it was made; never delete anything that resolves outside the target.
+            # The folder is what gets resolved: unlinking a link only removes the link.
+            directory = os.path.dirname(file_path)
+            if directory not in inside:
+                inside[directory] = _resolves_under(root, directory)
+            if not inside[directory] or not is_contained_path(relative_path):
+                report.errors += 1
+                continue
+            try:
+                stat = os.lstat(file_path)
+            except FileNotFoundError:
+                report.files_changed += 1
+                continue
+            except OSError:
+                report.errors += 1
+                continue
+            if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+                report.files_changed += 1
+                continue
+            try:
+                if throttled:
+                    limiter.acquire(1, size)
+                os.unlink(file_path)
+                report.files_deleted += 1
+                report.bytes_freed += size
+                emptied.add(os.path.dirname(relative_path))
+            except OSError:
+                report.errors += 1
+            if next_progress is not None and report.files_deleted >= next_progress:
+                next_progress += self.progress_every
+                self.progress(report)
+
+        if planned.remove_empty_dirs and not report.cancelled:
+            # Only folders that held deleted files (and their parents) can have become
+            # empty; deepest first, and rmdir itself refuses folders that aren't
+            folders = set()
+            for directory in emptied:
+                while directory and directory not in folders:
+                    folders.add(directory)
+                    directory = os.path.dirname(directory)
+            for directory in sorted(folders, key=lambda path: path.count(os.sep), reverse=True):
+                folder_path = os.path.join(planned.path, directory)
+                if not _resolves_under(root, folder_path):
+                    continue
+                try:
+                    os.rmdir(folder_path)
+                    report.dirs_removed += 1
+                except OSError:
+                    pass
+
+        return self._finish(report, start_time)
+
+    def clean_target(self, target):
+        """Delete the matching files of one target and prune its empty folders"""
+        report = TargetReport(target.name, target.path)
+        start_time = time.perf_counter()
+        if not os.path.isdir(target.path):
+            report.missing = True
+            return self._finish(report, start_time)
+
+        # Hot-loop locals: no regex means every file matches, no limits means no throttling
+        regex = target.regex
+        limiter = self.rate_limiter
+        throttled = limiter.files_per_second is not None or limiter.bytes_per_second is not None
+        cancel_event = self._cancel_event
+        next_progress = self.progress_every if self.progress is not None else None
+
+        # Iterative post-order walk; each frame is [path, entry iterator, entries left behind]
+        stack = [[target.path, None, 0]]
+        while stack:
+            if cancel_event.is_set():
+                report.cancelled = True
+                break
+
+            frame = stack[-1]
+            if frame[1] is None:
+                try:
+                    # Read the whole listing before unlinking anything in it; deleting
+                    # while the directory is still being read slows the listing down
+                    with os.scandir(frame[0]) as entries:
+                        frame[1] = iter(list(entries))
+                except OSError:
+                    report.errors += 1
+                    stack.pop()
+                    if stack:
+                        stack[-1][2] += 1
+                    continue
+
+            # Handle files until the next subfolder, which is walked before the rest
+            descended = False
+            for entry in frame[1]:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Never follow junctions out of the target
+                        if target.recursive and not _is_reparse_point(entry):
+                            stack.append([entry.path, None, 0])
+                            descended = True
+                            break
+                        frame[2] += 1
+                        continue
+                    if regex is not None and regex.match(entry.name) is None:
+                        report.files_kept += 1
+                        frame[2] += 1
+                        continue
+                    size = entry.stat(follow_symlinks=False).st_size
+                    if throttled:
+                        limiter.acquire(1, size)
+                    os.unlink(entry.path)
+                    report.files_deleted += 1
+                    report.bytes_freed += size
+                except OSError:
+                    # In use, access denied or already gone
+                    report.errors += 1
+                    frame[2] += 1
+
+                if next_progress is not None and report.files_deleted >= next_progress:
+                    next_progress += self.progress_every
+                    self.progress(report)
+                # Very large folders also check for cancellation
+                if (report.files_deleted & 1023) == 1023 and cancel_event.is_set():
+                    descended = True
+                    break
+            if descended:
+                continue
+
+            # Leaving the folder: everything below it has been handled
+            stack.pop()
+            if stack:
+                if frame[2] == 0 and target.remove_empty_dirs:
+                    try:
+                        os.rmdir(frame[0])
+                        report.dirs_removed += 1
+                    except OSError:
+                        stack[-1][2] += 1
+                else:
+                    stack[-1][2] += 1
+
+        return self._finish(report, start_time)
+
+    def _finish(self, report, start_time):
+        report.elapsed = time.perf_counter() - start_time
+        if self.progress is not None:
+            self.progress(report)
+        return report
+
+
+def _walk_and_delete(directory, pattern="*"):
+    """The cleanup loop this engine replaced: os.walk, fnmatch, getsize, remove, listdir"""
+    deleted = 0
+    for root, dirs, files in os.walk(directory, topdown=False):
+        for name in files:
+            file_path = os.path.join(root, name)
+            if fnmatch.fnmatch(name, pattern):
+                try:
+                    os.path.getsize(file_path)
+                    os.remove(file_path)
+                    deleted += 1
+                except OSError:
+                    pass
+        for name in dirs:
+            dir_path = os.path.join(root, name)
+            try:
+                if os.path.exists(dir_path) and not os.listdir(dir_path):
+                    os.rmdir(dir_path)
+            except OSError:
+                pass
+    return deleted
+
+
+def build_synthetic_tree(root, targets=6, files=100000, files_per_dir=200, file_size=512):
+    """Create targets folders holding files small files in nested subfolders"""
+    payload = b"x" * file_size
+    paths = []
+    per_target = files // targets
+    for target_index in range(targets):
+        target_path = os.path.join(root, f"target{target_index}")
+        paths.append(target_path)
+        for file_index in range(per_target):
+            dir_index = file_index // files_per_dir
+            directory = os.path.join(target_path, f"d{dir_index % 10}", f"d{dir_index}")
+            if file_index % files_per_dir == 0:
+                os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"f{file_index}.tmp"), 'wb') as f:
+                f.write(payload)
+    return paths
+
+
+def run_benchmark(files, worker_counts, files_per_second=None):
+    """Time the old sequential loop against the engine on fresh synthetic trees"""
+    results = []
+    runs = [("sequential walk", None)] + [(f"engine, {count} workers", count) for count in worker_counts]
+    for label, workers in runs:
+        root = tempfile.mkdtemp(prefix="cleanup_bench_")
+        try:
+            paths = build_synthetic_tree(root, files=files)
+            start_time = time.perf_counter()
+            if workers is None:
+                deleted = sum(_walk_and_delete(path) for path in paths)
+            else:
+                engine = CleanupEngine(max_workers=workers, rate_limiter=RateLimiter(files_per_second))
+                reports = engine.run([CleanupTarget(os.path.basename(path), path) for path in paths])
+                deleted = sum(report.files_deleted for report in reports)
+            elapsed = time.perf_counter() - start_time
+            results.append((label, deleted, elapsed))
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+    return results
+
+
+def parse_args(argv=None):
+    """Parse the command line of the cleanup benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark the cleanup engine on a synthetic tree")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Run the benchmark")
+    parser.add_argument("--files", type=int, default=100000,
+                        help="Files in the synthetic tree (default: 100000)")
+    parser.add_argument("--workers", default="1,4,8",
+                        help="Comma separated worker counts to try (default: 1,4,8)")
+    parser.add_argument("--files-per-second", type=float, default=0,
+                        help="Rate limit for the engine runs (default: unlimited)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_args(argv)
+    if not args.benchmark:
+        print("Nothing to do; pass --benchmark", file=sys.stderr)
+        return 2
+
+    worker_counts = [int(count) for count in args.workers.split(",") if count.strip()]
+    print(f"{args.files} files in 6 targets")
+    print(f"{'run':<20}{'deleted':>10}{'seconds':>10}{'files/s':>12}")
+    for label, deleted, elapsed in run_benchmark(args.files, worker_counts, args.files_per_second):
+        print(f"{label:<20}{deleted:>10}{elapsed:>10.2f}{deleted / elapsed:>12.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import os
+import json
+import time
+from collections import OrderedDict
+
+
+PLAN_VERSION = 1
+
+
+def is_contained_path(relative_path):
+    """Check that a planned relative path can't point outside its target (absolute, drive or "..")"""
+    if not relative_path or os.path.isabs(relative_path) or os.path.splitdrive(relative_path)[0]:
+        return False
+    # Both separators count, so a plan written on another system can't sneak ".." past us
+    parts = relative_path.replace("\\", "/").split("/")
+    return ".." not in parts and not relative_path.startswith(("/", "\\"))
+
+
+class PlannedTarget:
+    """Files found in one cleanup target, as (relative path, size, mtime_ns) tuples"""
+
+    def __init__(self, name, path, remove_empty_dirs=True, files=None, errors=0):
+        self.name = name
+        self.path = path
+        self.remove_empty_dirs = remove_empty_dirs
+        self.files = files if files is not None else []
+        self.errors = errors          # Folders that could not be listed while planning
+
+    @property
+    def file_count(self):
+        return len(self.files)
+
+    @property
+    def total_bytes(self):
+        return sum(size for _, size, _ in self.files)
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'path': self.path,
+            'remove_empty_dirs': self.remove_empty_dirs,
+            'errors': self.errors,
+            'files': [list(entry) for entry in self.files],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a target; raises ValueError for files that would lie outside its folder"""
+        files = [tuple(entry) for entry in data.get('files', [])]
+        for relative_path, _, _ in files:
+            if not is_contained_path(relative_path):
+                raise ValueError(f"Path outside the target in cleanup plan: {relative_path}")
+        return cls(data['name'], data['path'], data.get('remove_empty_dirs', True),
+                   files, data.get('errors', 0))
+
+
+class CleanupPlan:
+    """Serializable result of a dry run: what would be deleted, per category
+
+    A plan records every file with the size and mtime it had when it was
+    scanned, so it can be reviewed, saved, loaded later and executed as-is
+    (see CleanupEngine.execute) without scanning again.
+    """
+
+    def __init__(self, created=None):
+        self.created = created or time.time()
+        self.categories = OrderedDict()   # category name -> [PlannedTarget]
+
+    def add(self, category, planned_target):
+        """Add a scanned target under a category"""
+        self.categories.setdefault(category, []).append(planned_target)
+
+    @property
+    def file_count(self):
+        return sum(target.file_count for targets in self.categories.values() for target in targets)
+
+    @property
+    def total_bytes(self):
+        return sum(target.total_bytes for targets in self.categories.values() for target in targets)
+
+    def category_totals(self):
+        """Return (category, file count, bytes) per category in plan order"""
+        return [(category,
+                 sum(target.file_count for target in targets),
+                 sum(target.total_bytes for target in targets))
+                for category, targets in self.categories.items()]
+
+    def to_dict(self):
+        return {
+            'version': PLAN_VERSION,
+            'created': self.created,
+            'categories': [{'name': category, 'targets': [target.to_dict() for target in targets]}
+                           for category, targets in self.categories.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != PLAN_VERSION:
+            raise ValueError(f"Unsupported cleanup plan version: {data.get('version')}")
+        plan = cls(created=data.get('created'))
+        for category in data.get('categories', []):
+            for target in category.get('targets', []):
+                plan.add(category['name'], PlannedTarget.from_dict(target))
+        return plan
+
+    def save(self, file_path):
+        """Write the plan as JSON"""
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, file_path):
+        """Read a plan written by save(); raises ValueError for files that aren't plans"""
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
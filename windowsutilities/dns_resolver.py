@@ -0,0 +1,742 @@
+"""Parallel DNS lookups with a TTL-respecting cache
+
+DnsResolver looks up many names (A and AAAA) or addresses (PTR) at once
+on a thread pool and returns a LookupResult per query with its records,
+TTL and lookup time. Answers are cached for their TTL and NXDOMAIN/no-data
+answers for the SOA minimum (RFC 2308), so looking the same names up again
+in a session costs nothing. Queries go straight to the system's DNS
+servers over UDP (TCP when truncated), both record types in one round
+trip; when no server can be found the OS resolver is used with a fixed TTL.
+StubDnsServer answers from a dictionary on localhost for testing:
+
+    python dns_resolver.py --stub --names 500
+"""
+import os
+import re
+import sys
+import copy
+import time
+import random
+import socket
+import struct
+import argparse
+import ipaddress
+import threading
+import collections
+import concurrent.futures
+from threading import Thread
+
+import psutil
+
+
+FORWARD = 'forward'
+REVERSE = 'reverse'
+
+# Lookup outcomes
+OK = 'ok'
+NXDOMAIN = 'nxdomain'
+NODATA = 'nodata'
+ERROR = 'error'
+
+# Record types and response codes used here
+TYPE_A = 1
+TYPE_CNAME = 5
+TYPE_SOA = 6
+TYPE_PTR = 12
+TYPE_AAAA = 28
+TYPE_NAMES = {TYPE_A: 'A', TYPE_CNAME: 'CNAME', TYPE_SOA: 'SOA', TYPE_PTR: 'PTR', TYPE_AAAA: 'AAAA'}
+RCODE_NXDOMAIN = 3
+
+# Registry key whose {adapter GUID}\Connection subkeys hold the adapters' names
+NETWORK_CONNECTIONS_KEY = r"SYSTEM\CurrentControlSet\Control\Network\{4D36E972-E325-11CE-BFC1-08002BE10318}"
+
+# TTL of negative answers without an SOA record, and of OS resolver answers (seconds)
+NEGATIVE_TTL = 60
+SYSTEM_TTL = 300
+
+
+class DnsError(Exception):
+    """A DNS server did not answer or sent something unreadable"""
+
+
+class DnsRecord:
+    """One resource record of an answer"""
+
+    def __init__(self, name, rtype, ttl, value):
+        self.name = name
+        self.type = rtype
+        self.ttl = ttl
+        self.value = value
+
+    def as_dict(self):
+        return {'name': self.name, 'type': TYPE_NAMES.get(self.type, str(self.type)),
+                'ttl': self.ttl, 'value': self.value}
+
+
+class DnsResponse:
+    """The parts of a DNS response the resolver uses"""
+
+    def __init__(self, qid, rcode=0, truncated=False):
+        self.id = qid
+        self.rcode = rcode
+        self.truncated = truncated
+        self.answers = []
+        self.negative_ttl = None    # From the SOA record of a negative answer
+
+
+def build_query(qid, name, qtype):
+    """Return a recursive query packet for name"""
+    packet = struct.pack("!HHHHHH", qid, 0x0100, 1, 0, 0, 0)
+    for label in name.rstrip(".").split("."):
+        encoded = label.encode('idna')
+        if not 0 < len(encoded) < 64:
+            raise ValueError(f"Invalid name: {name}")
+        packet += bytes([len(encoded)]) + encoded
+    return packet + b"\0" + struct.pack("!HH", qtype, 1)
+
+
+def _read_name(data, offset):
+    """Read a (possibly compressed) name; returns (name, offset after it)"""
+    labels = []
+    end = None
+    for _ in range(128):
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            # Compression pointer: the rest of the name is elsewhere in the packet
+            if end is None:
+                end = offset + 2
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        offset += 1
+        if length == 0:
+            return ".".join(labels), end if end is not None else offset
+        labels.append(data[offset:offset + length].decode('ascii', errors='replace'))
+        offset += length
+    raise DnsError("Compression loop in response")
+
+
+def parse_response(data):
+    """Parse a response packet into a DnsResponse"""
+    try:
+        qid, flags, qdcount, ancount, nscount, _ = struct.unpack_from("!HHHHHH", data)
+        response = DnsResponse(qid, flags & 0xF, bool(flags & 0x0200))
+        offset = 12
+        for _ in range(qdcount):
+            offset = _read_name(data, offset)[1] + 4
+        for index in range(ancount + nscount):
+            name, offset = _read_name(data, offset)
+            rtype, _, ttl, length = struct.unpack_from("!HHIH", data, offset)
+            offset += 10
+            rdata = data[offset:offset + length]
+            if index >= ancount:
+                # Authority section: only the SOA of a negative answer matters
+                if rtype == TYPE_SOA:
+                    minimum = struct.unpack_from("!I", data, _read_name(data, _read_name(data, offset)[1])[1] + 16)[0]
+                    response.negative_ttl = min(ttl, minimum)
+            elif rtype == TYPE_A and length == 4:
+                response.answers.append(DnsRecord(name, rtype, ttl, socket.inet_ntop(socket.AF_INET, rdata)))
+            elif rtype == TYPE_AAAA and length == 16:
+                response.answers.append(DnsRecord(name, rtype, ttl, socket.inet_ntop(socket.AF_INET6, rdata)))
+            elif rtype in (TYPE_CNAME, TYPE_PTR):
+                response.answers.append(DnsRecord(name, rtype, ttl, _read_name(data, offset)[0]))
+            offset += length
+        return response
+    except (struct.error, IndexError) as e:
+        raise DnsError(f"Malformed response: {e}")
+
+
+def reverse_name(address):
+    """Return the in-addr.arpa / ip6.arpa name of an IP address"""
+    return ipaddress.ip_address(address).reverse_pointer
+
+
+def is_ip_address(text):
+    try:
+        ipaddress.ip_address(text)
+        return True
+    except ValueError:
+        return False
+
+
+def _up_adapter_guids(winreg):
+    """Return the (lower-case) GUIDs of the network adapters that are up, or None when unknown"""
+    try:
+        up_names = {name for name, stats in psutil.net_if_stats().items() if stats.isup}
+        connections = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, NETWORK_CONNECTIONS_KEY)
+    except (OSError, psutil.Error):
+        return None
+    guids = set()
+    index = 0
+    while True:
+        try:
+            guid = winreg.EnumKey(connections, index)
+        except OSError:
+            break
+        index += 1
+        try:
+            # psutil names adapters by this same friendly name
+            name = winreg.QueryValueEx(winreg.OpenKey(connections, guid + r"\Connection"), "Name")[0]
+        except OSError:
+            continue
+        if name in up_names:
+            guids.add(guid.lower())
+    return guids or None
+
+
+def system_nameservers():
+    """Return the DNS servers of the network adapters that are up
+
+    The registry keeps the DNS servers of every adapter it has seen,
+    including disconnected Wi-Fi, VPN and virtual adapters; asking one of
+    those costs a full timeout, so only adapters that are up count.
+    """
+    servers = []
+    if os.name == 'nt':
+        try:
+            import winreg
+        except ImportError:
+            return servers
+        up_guids = _up_adapter_guids(winreg)
+        for stack in ("Tcpip", "Tcpip6"):
+            path = rf"SYSTEM\CurrentControlSet\Services\{stack}\Parameters\Interfaces"
+            try:
+                interfaces = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, path)
+            except OSError:
+                continue
+            index = 0
+            while True:
+                try:
+                    guid = winreg.EnumKey(interfaces, index)
+                    interface = winreg.OpenKey(interfaces, guid)
+                except OSError:
+                    break
+                index += 1
+                if up_guids is not None and guid.lower() not in up_guids:
+                    continue
+                # A static NameServer overrides the one handed out by DHCP
+                for value_name in ("NameServer", "DhcpNameServer"):
+                    try:
+                        value = winreg.QueryValueEx(interface, value_name)[0]
+                    except OSError:
+                        continue
+                    if value.strip():
+                        servers += re.split(r"[\s,]+", value.strip())
+                        break
+    else:
+        try:
+            with open("/etc/resolv.conf", 'r') as f:
+                for line in f:
+                    fields = line.split()
+                    if len(fields) >= 2 and fields[0] == "nameserver":
+                        servers.append(fields[1])
+        except OSError:
+            pass
+    return list(dict.fromkeys(server for server in servers if server))
+
+
+def _server_address(server, port=53):
+    """Return (family, sockaddr) for "ip", "ip:port" or "[v6]:port" """
+    host = server
+    if server.startswith("["):
+        host, _, rest = server[1:].partition("]")
+        port = int(rest[1:]) if rest.startswith(":") else port
+    elif server.count(":") == 1:
+        host, port_text = server.split(":")
+        port = int(port_text)
+    info = socket.getaddrinfo(host, port, type=socket.SOCK_DGRAM, flags=socket.AI_NUMERICHOST)[0]
+    return info[0], info[4]
+
+
+class WireBackend:
+    """Sends queries to DNS servers directly, so answers come with their TTLs"""
+
+    def __init__(self, nameservers, timeout=2.0, retries=1):
+        self.servers = []
+        for server in nameservers:
+            try:
+                self.servers.append(_server_address(server))
+            except (OSError, ValueError):
+                pass
+        if not self.servers:
+            raise ValueError("No usable DNS server")
+        self.timeout = timeout
+        self.retries = retries
+        self.preferred = 0      # Index of the server that answered last
+
+    def query(self, name, qtypes):
+        """Query every type of qtypes for name at once; returns {qtype: DnsResponse}
+
+        Queries start at the server that answered last. A server that doesn't
+        answer in time is skipped for the next one; the server list is gone
+        through retries + 1 times.
+        """
+        pending = {}
+        for qtype in qtypes:
+            qid = random.getrandbits(16)
+            while qid in pending:
+                qid = random.getrandbits(16)
+            pending[qid] = (qtype, build_query(qid, name, qtype))
+
+        responses = {}
+        last_error = "timed out"
+        start = self.preferred
+        for attempt in range((self.retries + 1) * len(self.servers)):
+            server = (start + attempt) % len(self.servers)
+            family, address = self.servers[server]
+            answered = len(responses)
+            try:
+                self._exchange(family, address, pending, responses)
+            except OSError as e:
+                # Windows reports an ICMP port unreachable as a reset on the next recv
+                last_error = str(e)
+            if len(responses) > answered:
+                self.preferred = server
+            if not pending:
+                break
+        if not responses:
+            raise DnsError(f"No response from DNS server: {last_error}")
+        return responses
+
+    def _exchange(self, family, address, pending, responses):
+        """Send the pending queries to one server and collect answers until its timeout"""
+        with socket.socket(family, socket.SOCK_DGRAM) as sock:
+            for _, packet in pending.values():
+                sock.sendto(packet, address)
+            deadline = time.monotonic() + self.timeout
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                sock.settimeout(remaining)
+                try:
+                    data, source = sock.recvfrom(65535)
+                except socket.timeout:
+                    return
+                try:
+                    response = parse_response(data)
+                except DnsError:
+                    continue
+                # Ignore stray packets that don't answer one of our queries
+                entry = pending.pop(response.id, None) if source[:2] == address[:2] else None
+                if entry is None:
+                    continue
+                if response.truncated:
+                    response = self._query_tcp(family, address, entry[1])
+                responses[entry[0]] = response
+
+    def _query_tcp(self, family, address, packet):
+        """Repeat a query over TCP after a truncated UDP answer"""
+        with socket.create_connection(address[:2], self.timeout) as sock:
+            sock.sendall(struct.pack("!H", len(packet)) + packet)
+            length = struct.unpack("!H", self._receive(sock, 2))[0]
+            return parse_response(self._receive(sock, length))
+
+    @staticmethod
+    def _receive(sock, size):
+        data = b""
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise DnsError("Connection closed during TCP answer")
+            data += chunk
+        return data
+
+
+class SystemBackend:
+    """Falls back on the OS resolver, which doesn't say how long an answer is valid"""
+
+    def __init__(self, ttl=SYSTEM_TTL):
+        self.ttl = ttl
+
+    def query(self, name, qtypes):
+        responses = {}
+        for qtype in qtypes:
+            response = DnsResponse(0)
+            try:
+                if qtype == TYPE_PTR:
+                    host, aliases, _ = socket.gethostbyaddr(_address_from_reverse(name))
+                    for value in [host] + aliases:
+                        response.answers.append(DnsRecord(name, qtype, self.ttl, value))
+                else:
+                    family = socket.AF_INET if qtype == TYPE_A else socket.AF_INET6
+                    infos = socket.getaddrinfo(name, None, family, socket.SOCK_STREAM)
+                    for value in dict.fromkeys(info[4][0] for info in infos):
+                        response.answers.append(DnsRecord(name, qtype, self.ttl, value))
+            except socket.herror:
+                response.rcode = RCODE_NXDOMAIN
+            except socket.gaierror as e:
+                # No addresses of this family is a no-data answer, not an error
+                if e.errno not in (socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)):
+                    raise DnsError(str(e))
+                response.rcode = RCODE_NXDOMAIN if e.errno == socket.EAI_NONAME else 0
+            responses[qtype] = response
+        return responses
+
+
+def _address_from_reverse(name):
+    """Turn an in-addr.arpa / ip6.arpa name back into the address"""
+    labels = name.rstrip(".").split(".")
+    if name.endswith("in-addr.arpa"):
+        return ".".join(reversed(labels[:-2]))
+    nibbles = "".join(reversed(labels[:-2]))
+    return str(ipaddress.ip_address(int(nibbles, 16)))
+
+
+class LookupResult:
+    """Outcome of looking up one name or address"""
+
+    def __init__(self, query, kind):
+        self.query = query
+        self.kind = kind
+        self.status = OK
+        self.addresses = []     # A and AAAA answers
+        self.names = []         # PTR answers
+        self.aliases = []       # CNAMEs followed on the way
+        self.records = []
+        self.ttl = 0            # Seconds until the answer expires
+        self.cached = False
+        self.error = None
+        self.elapsed = 0.0
+
+    def as_dict(self):
+        """Return the result as a plain dictionary"""
+        return {
+            'query': self.query,
+            'kind': self.kind,
+            'status': self.status,
+            'addresses': list(self.addresses),
+            'names': list(self.names),
+            'aliases': list(self.aliases),
+            'records': [record.as_dict() for record in self.records],
+            'ttl': self.ttl,
+            'cached': self.cached,
+            'error': self.error,
+            'elapsed': self.elapsed,
+        }
+
+
+class DnsCache:
+    """Lookup results kept until their TTL runs out, least recently used dropped first"""
+
+    def __init__(self, max_entries=4096, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (result, seconds left) or None when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            result, expires = entry
+            remaining = expires - self.clock()
+            if remaining <= 0:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result, remaining
+
+    def put(self, key, result, ttl):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (result, self.clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class DnsResolver:
+    """Forward and reverse lookups in parallel, served from cache while answers are valid
+
+    nameservers defaults to the system's DNS servers; backend overrides how
+    queries are sent altogether.
+    """
+
+    def __init__(self, nameservers=None, max_workers=32, timeout=2.0, retries=1,
+                 cache=None, backend=None, negative_ttl=NEGATIVE_TTL):
+        if backend is None:
+            servers = system_nameservers() if nameservers is None else nameservers
+            backend = WireBackend(servers, timeout, retries) if servers else SystemBackend()
+        self.backend = backend
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else DnsCache()
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def resolve(self, name):
+        """Look up the A and AAAA records of name"""
+        return self._lookup(FORWARD, name)
+
+    def reverse(self, address):
+        """Look up the PTR records of an IP address"""
+        return self._lookup(REVERSE, address)
+
+    def lookup(self, query):
+        """reverse() for IP addresses, resolve() for anything else"""
+        return self.reverse(query) if is_ip_address(query) else self.resolve(query)
+
+    def resolve_many(self, names, on_result=None):
+        return self._map(self.resolve, names, on_result)
+
+    def reverse_many(self, addresses, on_result=None):
+        return self._map(self.reverse, addresses, on_result)
+
+    def lookup_many(self, queries, on_result=None):
+        """Look up every query in parallel; returns LookupResults in query order
+
+        on_result(result), if given, is called from a worker thread as each
+        lookup finishes. A query given twice is looked up once.
+        """
+        return self._map(self.lookup, queries, on_result)
+
+    def stats(self):
+        """Return cache counters"""
+        with self._stats_lock:
+            return {'hits': self.hits, 'misses': self.misses, 'cached': len(self.cache)}
+
+    def _map(self, function, queries, on_result):
+        unique = list(dict.fromkeys(queries))
+        if not unique:
+            return []
+
+        def run(query):
+            result = function(query)
+            if on_result is not None:
+                on_result(result)
+            return result
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(unique)))) as executor:
+            results = dict(zip(unique, executor.map(run, unique)))
+        return [results[query] for query in queries]
+
+    def _lookup(self, kind, query):
+        start_time = time.perf_counter()
+        key = (kind, query.lower().rstrip("."))
+        entry = self.cache.get(key)
+        if entry is not None:
+            with self._stats_lock:
+                self.hits += 1
+            result = copy.copy(entry[0])
+            result.query = query
+            result.cached = True
+            result.ttl = int(entry[1])
+            result.elapsed = time.perf_counter() - start_time
+            return result
+
+        with self._stats_lock:
+            self.misses += 1
+        result = LookupResult(query, kind)
+        try:
+            if kind == FORWARD:
+                responses = self.backend.query(query, (TYPE_A, TYPE_AAAA))
+            else:
+                responses = self.backend.query(reverse_name(query), (TYPE_PTR,))
+            self._fill(result, responses.values())
+        except (DnsError, OSError, ValueError, UnicodeError) as e:
+            result.status = ERROR
+            result.error = str(e)
+        result.elapsed = time.perf_counter() - start_time
+
+        # Failures aren't cached, so the next lookup tries again
+        if result.status != ERROR:
+            self.cache.put(key, result, result.ttl)
+        return result
+
+    def _fill(self, result, responses):
+        """Copy the answers of responses into result and work out its status and TTL"""
+        negative_ttls = []
+        for response in responses:
+            if response.rcode not in (0, RCODE_NXDOMAIN):
+                result.status = ERROR
+                result.error = f"Server failure (rcode {response.rcode})"
+                return
+            if response.rcode == RCODE_NXDOMAIN:
+                result.status = NXDOMAIN
+            if response.negative_ttl is not None:
+                negative_ttls.append(response.negative_ttl)
+            for record in response.answers:
+                result.records.append(record)
+                if record.type in (TYPE_A, TYPE_AAAA):
+                    result.addresses.append(record.value)
+                elif record.type == TYPE_PTR:
+                    result.names.append(record.value)
+                elif record.value not in result.aliases:
+                    result.aliases.append(record.value)
+
+        if result.addresses or result.names:
+            result.status = OK
+            result.ttl = min(record.ttl for record in result.records)
+        else:
+            if result.status != NXDOMAIN:
+                result.status = NODATA
+            result.ttl = min(negative_ttls) if negative_ttls else self.negative_ttl
+
+
+class StubDnsServer:
+    """Answers A, AAAA and PTR queries from a dictionary on localhost
+
+    records maps names to their addresses; PTR answers are derived from
+    it. Unknown names get NXDOMAIN with an SOA whose minimum is
+    negative_ttl. delay holds every answer back without blocking others.
+    """
+
+    def __init__(self, records=None, ttl=60, negative_ttl=30, delay=0.0):
+        self.records = {name.lower(): list(addresses) for name, addresses in (records or {}).items()}
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.delay = delay
+        self.queries = 0
+        self.pointers = {}
+        for name, addresses in self.records.items():
+            for address in addresses:
+                self.pointers.setdefault(reverse_name(address), []).append(name)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("127.0.0.1", 0))
+        self.address = f"127.0.0.1:{self.socket.getsockname()[1]}"
+        self._running = True
+        Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self._running = False
+        self.socket.close()
+
+    def _serve(self):
+        while self._running:
+            try:
+                data, client = self.socket.recvfrom(512)
+            except OSError:
+                return
+            self.queries += 1
+            try:
+                reply = self._answer(data)
+            except (DnsError, IndexError, struct.error):
+                continue
+            if self.delay:
+                threading.Timer(self.delay, self._send, (reply, client)).start()
+            else:
+                self._send(reply, client)
+
+    def _send(self, reply, client):
+        try:
+            self.socket.sendto(reply, client)
+        except OSError:
+            pass
+
+    def _answer(self, data):
+        qid = struct.unpack_from("!H", data)[0]
+        name, offset = _read_name(data, 12)
+        qtype = struct.unpack_from("!H", data, offset)[0]
+        question = data[12:offset + 4]
+        name = name.lower()
+
+        answers = []
+        if qtype == TYPE_PTR:
+            for target in self.pointers.get(name, []):
+                answers.append((TYPE_PTR, self._encode_name(target)))
+        elif qtype in (TYPE_A, TYPE_AAAA):
+            family = socket.AF_INET if qtype == TYPE_A else socket.AF_INET6
+            for address in self.records.get(name, []):
+                if (":" in address) == (family == socket.AF_INET6):
+                    answers.append((qtype, socket.inet_pton(family, address)))
+        known = name in self.records or name in self.pointers
+
+        flags = 0x8180 | (0 if known else RCODE_NXDOMAIN)
+        packet = struct.pack("!HHHHHH", qid, flags, 1, len(answers), 0 if answers else 1, 0) + question
+        for rtype, rdata in answers:
+            # 0xC00C points back at the name in the question
+            packet += struct.pack("!HHHIH", 0xC00C, rtype, 1, self.ttl, len(rdata)) + rdata
+        if not answers:
+            soa = self._encode_name("ns.stub") + self._encode_name("admin.stub")
+            soa += struct.pack("!IIIII", 1, 3600, 600, 86400, self.negative_ttl)
+            packet += struct.pack("!HHHIH", 0xC00C, TYPE_SOA, 1, 3600, len(soa)) + soa
+        return packet
+
+    @staticmethod
+    def _encode_name(name):
+        return b"".join(bytes([len(label)]) + label.encode('ascii') for label in name.split(".")) + b"\0"
+
+
+_default_resolver = None
+_default_resolver_lock = threading.Lock()
+
+
+def get_default_resolver():
+    """Return the resolver (and cache) shared by the whole application"""
+    global _default_resolver
+    with _default_resolver_lock:
+        if _default_resolver is None:
+            _default_resolver = DnsResolver()
+        return _default_resolver
+
+
+def format_results(results):
+    """Return lookup results as the lines of a fixed-width table"""
+    width = max([len("Query")] + [len(result.query) for result in results])
+    lines = [f"{'Query':<{width}}  {'Status':<8}  {'Time':>8}  {'TTL':>6}  Answer"]
+    for result in results:
+        elapsed = "cached" if result.cached else f"{result.elapsed * 1000:.1f}ms"
+        answer = result.error or ", ".join(result.addresses or result.names) or "-"
+        lines.append(f"{result.query:<{width}}  {result.status:<8}  {elapsed:>8}  {result.ttl:>6}  {answer}")
+    return lines
+
+
+def parse_args(argv=None):
+    """Parse the command line of the resolver"""
+    parser = argparse.ArgumentParser(description="Look up many names and addresses in parallel")
+    parser.add_argument("queries", nargs="*", help="Hostnames or IP addresses to look up")
+    parser.add_argument("--server", action="append", help="DNS server to ask (default: the system's)")
+    parser.add_argument("--workers", type=int, default=32,
+                        help="Lookups run at once (default: 32)")
+    parser.add_argument("--stub", action="store_true",
+                        help="Resolve generated names against a local stub server instead")
+    parser.add_argument("--names", type=int, default=200,
+                        help="With --stub, how many names to generate (default: 200)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_args(argv)
+    if not args.stub:
+        if not args.queries:
+            print("Nothing to look up; pass names or --stub", file=sys.stderr)
+            return 2
+        resolver = DnsResolver(args.server, max_workers=args.workers)
+        for line in format_results(resolver.lookup_many(args.queries)):
+            print(line)
+        return 0
+
+    # Every stub answer takes 20 ms, like a nearby server, so parallelism shows
+    records = {f"host{index}.example.test": [f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"]
+               for index in range(args.names)}
+    server = StubDnsServer(records, delay=0.02)
+    resolver = DnsResolver([server.address], max_workers=args.workers)
+    queries = list(records) + ["missing.example.test"]
+    for label in ("cold", "warm"):
+        start_time = time.perf_counter()
+        results = resolver.lookup_many(queries)
+        failed = sum(1 for result in results if result.status == ERROR)
+        print(f"{label}: {len(queries)} names in {time.perf_counter() - start_time:.3f}s, "
+              f"{failed} failed, {server.queries} queries sent")
+    start_time = time.perf_counter()
+    resolver.reverse_many([addresses[0] for addresses in records.values()])
+    print(f"reverse: {len(records)} addresses in {time.perf_counter() - start_time:.3f}s")
+    print(f"cache: {resolver.stats()}")
+    server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+import os
+import csv
+import sqlite3
+import threading
+
+
+def default_index_path():
+    """Return the default location of the folder size index"""
+    base_dir = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base_dir, "WindowsSystemUtilities", "folder_index.db")
+
+
+def _subtree_bounds(root_path):
+    """Return the (prefix, upper bound) pair that selects every path below root_path"""
+    prefix = root_path if root_path.endswith(os.sep) else root_path + os.sep
+    # Paths below the root sort between the prefix and the prefix with its
+    # last separator bumped by one character
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class FolderIndex:
+    """Persistent per-directory size index stored in SQLite
+
+    Each row holds the size of the files stored directly in a directory, the
+    directory's mtime at the time it was listed and the aggregate totals of
+    its subtree. A directory's mtime only changes when entries are added,
+    removed or renamed in it, so FolderScanner re-lists just the directories
+    whose mtime moved and takes the file totals of the others from here.
+    Files that are rewritten in place without changing the directory are
+    picked up on the next full rescan (see FolderIndex.clear).
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or default_index_path()
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # Scans run on worker threads and exports on the UI thread
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS folders (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT,
+                    mtime_ns INTEGER,
+                    files_size INTEGER NOT NULL,
+                    own_file_count INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    file_count INTEGER NOT NULL,
+                    dir_count INTEGER NOT NULL
+                )
+            """)
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
+
+    def load_subtree(self, root_path):
+        """Load cached rows below root_path as ({path: (mtime_ns, files_size, own_file_count)}, {parent: [paths]})"""
+        prefix, upper = _subtree_bounds(root_path)
+        entries = {}
+        children = {}
+        with self.lock:
+            cursor = self.conn.execute(
+                "SELECT path, parent, mtime_ns, files_size, own_file_count FROM folders "
+                "WHERE path = ? OR (path >= ? AND path < ?)",
+                (root_path, prefix, upper)
+            )
+            for path, parent, mtime_ns, files_size, own_file_count in cursor:
+                entries[path] = (mtime_ns, files_size, own_file_count)
+                if path != root_path:
+                    children.setdefault(parent, []).append(path)
+        return entries, children
+
+    def store(self, root_node):
+        """Replace the cached subtree of root_node with the freshly scanned one"""
+        rows = []
+        root_parent = os.path.dirname(root_node.path)
+        stack = [(root_node, root_parent if root_parent != root_node.path else None)]
+        while stack:
+            node, parent = stack.pop()
+            rows.append((node.path, parent, node.mtime_ns, node.files_size, node.own_file_count,
+                         node.size, node.file_count, node.dir_count))
+            stack.extend((child, node.path) for child in node.children)
+
+        prefix, upper = _subtree_bounds(root_node.path)
+        with self.lock, self.conn:
+            # Drop folders that disappeared since the last scan
+            self.conn.execute("DELETE FROM folders WHERE path = ? OR (path >= ? AND path < ?)",
+                              (root_node.path, prefix, upper))
+            self.conn.executemany("INSERT OR REPLACE INTO folders VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def has_scan(self, root_path):
+        """Check whether the index holds totals for root_path"""
+        with self.lock:
+            row = self.conn.execute("SELECT 1 FROM folders WHERE path = ?", (root_path,)).fetchone()
+        return row is not None
+
+    def export_csv(self, root_path, file_path, format_size=None):
+        """Export every indexed folder below root_path to a CSV file and return the row count"""
+        prefix, upper = _subtree_bounds(root_path)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT path, parent, size, file_count, dir_count FROM folders "
+                "WHERE path = ? OR (path >= ? AND path < ?) ORDER BY path",
+                (root_path, prefix, upper)
+            ).fetchall()
+
+        sizes = {path: size for path, _, size, _, _ in rows}
+        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(["Folder", "Size", "Size (bytes)", "% of Parent", "Files", "Folders"])
+            for path, parent, size, file_count, dir_count in rows:
+                parent_size = sizes.get(parent)
+                percent = f"{(size / parent_size) * 100:.1f}%" if parent_size else "100.0%"
+                display_size = format_size(size) if format_size else size
+                csv_writer.writerow([path, display_size, size, percent, file_count, dir_count])
+        return len(rows)
+
+    def clear(self, root_path=None):
+        """Forget the cached totals below root_path (or everything)"""
+        with self.lock, self.conn:
+            if root_path is None:
+                self.conn.execute("DELETE FROM folders")
+            else:
+                prefix, upper = _subtree_bounds(root_path)
+                self.conn.execute("DELETE FROM folders WHERE path = ? OR (path >= ? AND path < ?)",
+                                  (root_path, prefix, upper))
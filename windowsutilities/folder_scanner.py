@@ -0,0 +1,285 @@
+import os
+import stat
+import time
+import threading
+import concurrent.futures
+
+
+class FolderNode:
+    """Aggregate size information for a single directory"""
+    __slots__ = ('path', 'name', 'size', 'files_size', 'own_file_count', 'file_count', 'dir_count',
+                 'mtime_ns', 'scanned_size', 'children')
+
+    def __init__(self, path, name=None):
+        self.path = path
+        self.name = name if name is not None else (os.path.basename(path.rstrip("\\/")) or path)
+        self.size = 0          # Total size of the directory including all subfolders
+        self.files_size = 0    # Size of the files stored directly in this directory
+        self.own_file_count = 0  # Number of files stored directly in this directory
+        self.file_count = 0    # Number of files in the whole subtree
+        self.dir_count = 0     # Number of subdirectories in the whole subtree
+        self.mtime_ns = None   # Directory mtime when it was listed (index mode only)
+        self.scanned_size = 0  # Bytes found so far in this subtree while a worker scans it
+        self.children = []
+
+    def sorted_children(self):
+        """Return the subfolders ordered by size (largest first)"""
+        return sorted(self.children, key=lambda child: child.size, reverse=True)
+
+
+class ScanProgress:
+    """Snapshot of a running folder scan"""
+
+    def __init__(self, root_path, total_size, files_size, subfolders, dirs_scanned,
+                 done=False, cancelled=False, result=None):
+        self.root_path = root_path
+        self.total_size = total_size
+        self.files_size = files_size
+        self.subfolders = subfolders      # (path, name, size) tuples, largest first
+        self.dirs_scanned = dirs_scanned
+        self.done = done
+        self.cancelled = cancelled
+        self.result = result              # Final FolderNode once done
+
+
+class FolderScanner:
+    """Single-pass folder size scanner built on os.scandir
+
+    Every directory is listed exactly once. File sizes come from the
+    DirEntry stat results (free on Windows, cached per entry elsewhere) and
+    directory totals are aggregated bottom-up after the walk, so the sizes of
+    the root and of every subfolder come out of the same pass. The top levels
+    of the tree are split into independent subtrees that are scanned on a
+    worker pool.
+
+    With a FolderIndex attached, directories whose mtime has not changed
+    since the previous scan are not listed again: their file totals and
+    subfolder names come from the index and only the subfolders are stat'ed.
+    """
+
+    def __init__(self, max_workers=None, split_depth=2, index=None):
+        # Scanning is I/O bound, so use more workers than CPU cores
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) * 4)
+        # Directories shallower than this are listed by the coordinator and
+        # their subfolders become separate jobs for the pool
+        self.split_depth = split_depth
+        self.index = index
+        self.error_count = 0
+        self.dirs_listed = 0
+        self.dirs_reused = 0
+        self.elapsed = 0.0
+        self.cancelled = False
+        self._cancel_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._root_node = None
+        self._cached = {}
+        self._cached_children = {}
+
+    def cancel(self):
+        """Ask a running scan to stop; workers give up after their current directory"""
+        self._cancel_event.set()
+
+    def scan(self, root_path):
+        """Scan root_path and return its FolderNode with the whole tree attached"""
+        start_time = time.perf_counter()
+        self.error_count = 0
+        self.dirs_listed = 0
+        self.dirs_reused = 0
+        self.cancelled = False
+        self._cancel_event.clear()
+
+        if self.index is not None:
+            root_path = os.path.abspath(root_path)
+            self._cached, self._cached_children = self.index.load_subtree(root_path)
+
+        root_node = FolderNode(root_path)
+        self._root_node = root_node
+
+        # List the shallow levels here and collect the subtrees to hand out
+        level = [root_node]
+        for _ in range(self.split_depth):
+            next_level = []
+            for node in level:
+                if self._cancel_event.is_set():
+                    break
+                next_level.extend(self._list_directory(node))
+            level = next_level
+
+        # Scan the remaining subtrees in parallel
+        if level and not self._cancel_event.is_set():
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                list(executor.map(self._scan_subtree, level))
+
+        # Aggregate the shallow levels now that every subtree has its total
+        if self.split_depth > 0:
+            self._aggregate(root_node)
+
+        self.elapsed = time.perf_counter() - start_time
+        self.cancelled = self._cancel_event.is_set()
+
+        # A cancelled scan has incomplete totals, so never persist it
+        if self.index is not None and not self.cancelled:
+            self.index.store(root_node)
+            self._cached, self._cached_children = {}, {}
+        return root_node
+
+    def iter_scan(self, root_path, interval=0.25):
+        """Scan root_path on a background thread and yield ScanProgress snapshots
+
+        A snapshot is yielded every interval seconds while sizes converge and
+        a final one with done=True (and the finished tree) at the end.
+        """
+        outcome = {}
+
+        def run_scan():
+            try:
+                outcome['result'] = self.scan(root_path)
+            except Exception as e:
+                outcome['error'] = e
+
+        self._root_node = None
+        scan_thread = threading.Thread(target=run_scan, daemon=True)
+        scan_thread.start()
+
+        while True:
+            scan_thread.join(interval)
+            if not scan_thread.is_alive():
+                break
+            if self._root_node is not None:
+                yield self._snapshot(self._root_node)
+
+        if 'error' in outcome:
+            raise outcome['error']
+
+        result = outcome['result']
+        subfolders = [(child.path, child.name, child.size) for child in result.sorted_children()]
+        yield ScanProgress(result.path, result.size, result.files_size, subfolders,
+                           self.dirs_listed + self.dirs_reused, done=True,
+                           cancelled=self.cancelled, result=result)
+
+    def _snapshot(self, root_node):
+        """Build a progress snapshot from the partially scanned tree"""
+        subfolders = []
+        # Children of the root are only known once the coordinator listed it
+        if self.split_depth > 0:
+            for child in list(root_node.children):
+                subfolders.append((child.path, child.name, self._partial_size(child, 1)))
+            subfolders.sort(key=lambda item: item[2], reverse=True)
+        total_size = self._partial_size(root_node, 0)
+        return ScanProgress(root_node.path, total_size, root_node.files_size, subfolders,
+                            self.dirs_listed + self.dirs_reused)
+
+    def _partial_size(self, node, depth):
+        """Bytes found so far below node, which sits at the given depth"""
+        if depth >= self.split_depth:
+            # Subtree handed to a worker, which keeps a running total
+            return node.scanned_size
+        return node.files_size + sum(self._partial_size(child, depth + 1) for child in list(node.children))
+
+    def _list_directory(self, node):
+        """List a single directory, record its files and return its subfolder nodes"""
+        if self.index is not None:
+            try:
+                # Stat before listing so changes made during the listing are
+                # caught by the next scan
+                node.mtime_ns = os.stat(node.path).st_mtime_ns
+            except OSError:
+                self._count(errors=1)
+                return []
+            cached = self._cached.get(node.path)
+            if cached is not None and cached[0] == node.mtime_ns:
+                # Unchanged directory: reuse its file totals and subfolder names
+                node.files_size, node.own_file_count = cached[1], cached[2]
+                node.children = [FolderNode(path) for path in self._cached_children.get(node.path, ())]
+                self._count(reused=1)
+                return list(node.children)
+
+        subfolders = []
+        errors = 0
+        try:
+            with os.scandir(node.path) as entries:
+                for count, entry in enumerate(entries):
+                    # Very large directories also check for cancellation
+                    if count & 1023 == 1023 and self._cancel_event.is_set():
+                        break
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            # Skip junctions and other reparse points to avoid loops
+                            if _is_reparse_point(entry):
+                                continue
+                            child = FolderNode(entry.path, entry.name)
+                            node.children.append(child)
+                            subfolders.append(child)
+                        elif entry.is_file(follow_symlinks=False):
+                            node.files_size += entry.stat(follow_symlinks=False).st_size
+                            node.own_file_count += 1
+                    except OSError:
+                        errors += 1
+        except OSError:
+            # Access denied, vanished while scanning, etc.
+            errors += 1
+        self._count(listed=1, errors=errors)
+        return subfolders
+
+    def _count(self, listed=0, reused=0, errors=0):
+        """Update the scan statistics from any worker thread"""
+        with self._stats_lock:
+            self.dirs_listed += listed
+            self.dirs_reused += reused
+            self.error_count += errors
+
+    def _scan_subtree(self, subtree_root):
+        """Scan a whole subtree in one thread"""
+        # Walk iteratively to avoid hitting the recursion limit on deep trees
+        visit_order = []
+        stack = [subtree_root]
+        while stack:
+            # Stop between directories once the scan has been cancelled
+            if self._cancel_event.is_set():
+                break
+            node = stack.pop()
+            visit_order.append(node)
+            stack.extend(self._list_directory(node))
+            subtree_root.scanned_size += node.files_size
+
+        # Bottom-up pass: children are always visited after their parent
+        for node in reversed(visit_order):
+            _sum_children(node)
+
+    def _aggregate(self, node):
+        """Aggregate the shallow levels that were listed by the coordinator"""
+        stack = [(node, 0)]
+        order = []
+        while stack:
+            current, depth = stack.pop()
+            order.append(current)
+            if depth < self.split_depth - 1:
+                stack.extend((child, depth + 1) for child in current.children)
+        for current in reversed(order):
+            _sum_children(current)
+
+
+def _sum_children(node):
+    """Set the totals of a node from its own files and its (already summed) children"""
+    size = node.files_size
+    file_count = node.own_file_count
+    dir_count = len(node.children)
+    for child in node.children:
+        size += child.size
+        file_count += child.file_count
+        dir_count += child.dir_count
+    node.size = size
+    node.file_count = file_count
+    node.dir_count = dir_count
+
+
+def _is_reparse_point(entry):
+    """Check whether a directory entry is a junction or other reparse point"""
+    # Only Windows has reparse points, and there the stat result is free
+    if os.name != 'nt':
+        return False
+    try:
+        attributes = getattr(entry.stat(follow_symlinks=False), 'st_file_attributes', 0)
+    except OSError:
+        return False
+    return bool(attributes & stat.FILE_ATTRIBUTE_REPARSE_POINT)
@@ -0,0 +1,442 @@
+"""Continuous TCP connect and UDP echo latency measurement without ping
+
+LatencyProber probes a list of host:port targets every `interval` seconds
+from one asyncio loop on a background thread: a TCP target is timed from
+connect() to the established connection, a udp:// target by sending a
+datagram and waiting for the echo. No process is started per probe. Each
+target keeps a LatencyHistogram (log-linear buckets in the style of
+HdrHistogram, about 1.5% precision at any scale), so p50/p95/p99 cost the
+same however many samples there are, plus loss and RFC 3550 jitter.
+LocalEchoServer stands in for real targets:
+
+    python latency_prober.py --local --count 50
+"""
+import sys
+import time
+import socket
+import random
+import asyncio
+import argparse
+import threading
+from threading import Thread
+
+
+TCP = 'tcp'
+UDP = 'udp'
+
+# Values below 2 * SUB_BUCKETS us get a bucket each; above that every power of
+# two is split into SUB_BUCKETS buckets
+SUB_BUCKETS = 64
+SUB_BUCKET_BITS = SUB_BUCKETS.bit_length()     # Bits of v >> shift, which is in [64, 128)
+
+
+class LatencyHistogram:
+    """Log-linear histogram of latencies in microseconds"""
+
+    def __init__(self):
+        self.counts = []
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.sum = 0
+
+    def record(self, value_us):
+        """Add one latency sample (microseconds)"""
+        value = max(0, int(value_us))
+        index = self._index(value)
+        if index >= len(self.counts):
+            self.counts.extend([0] * (index + 1 - len(self.counts)))
+        self.counts[index] += 1
+        self.total += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percent):
+        """Latency (microseconds) below which percent of the samples fall, or None"""
+        if not self.total:
+            return None
+        rank = max(1, int(round(self.total * percent / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                # The bucket midpoint, kept within what was actually seen
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.sum / self.total if self.total else None
+
+    def reset(self):
+        """Forget every sample"""
+        self.__init__()
+
+    @staticmethod
+    def _index(value):
+        if value < 2 * SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS
+        return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+    @staticmethod
+    def _value(index):
+        if index < 2 * SUB_BUCKETS:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        low = (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+        return low + (1 << shift) // 2
+
+
+class TargetStats:
+    """Running statistics of one probe target"""
+
+    def __init__(self, target):
+        self.target = target
+        self.histogram = LatencyHistogram()
+        self.sent = 0
+        self.received = 0
+        self.jitter_us = 0.0
+        self.last_us = None
+        self.last_error = None
+        self._previous_us = None
+
+    def record(self, rtt_us):
+        self.sent += 1
+        self.received += 1
+        self.histogram.record(rtt_us)
+        # RFC 3550 interarrival jitter: smoothed difference between consecutive samples
+        if self._previous_us is not None:
+            self.jitter_us += (abs(rtt_us - self._previous_us) - self.jitter_us) / 16.0
+        self._previous_us = rtt_us
+        self.last_us = rtt_us
+        self.last_error = None
+
+    def record_loss(self, error):
+        self.sent += 1
+        self.last_error = error
+
+    def snapshot(self):
+        """Return the statistics in milliseconds as a plain dictionary"""
+        def ms(value):
+            return None if value is None else value / 1000.0
+
+        histogram = self.histogram
+        return {
+            'target': self.target.label,
+            'protocol': self.target.protocol,
+            'sent': self.sent,
+            'received': self.received,
+            'loss': 100.0 * (self.sent - self.received) / self.sent if self.sent else None,
+            'min': ms(histogram.min),
+            'mean': ms(histogram.mean),
+            'p50': ms(histogram.percentile(50)),
+            'p95': ms(histogram.percentile(95)),
+            'p99': ms(histogram.percentile(99)),
+            'max': ms(histogram.max),
+            'jitter': ms(self.jitter_us) if histogram.total > 1 else None,
+            'last': ms(self.last_us),
+            'error': self.last_error,
+        }
+
+
+class ProbeTarget:
+    """A host, port and protocol to probe"""
+
+    def __init__(self, host, port, protocol=TCP):
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.address = None     # Resolved once, so lookups don't count as latency
+        self.family = 0
+
+    @property
+    def label(self):
+        host = f"[{self.host}]" if ":" in self.host else self.host
+        prefix = "udp://" if self.protocol == UDP else ""
+        return f"{prefix}{host}:{self.port}"
+
+
+def parse_target(text, default_port=443):
+    """Parse "host", "host:port", "[v6]:port", "tcp://host:port" or "udp://host:port" """
+    text = text.strip()
+    protocol = TCP
+    if "://" in text:
+        scheme, text = text.split("://", 1)
+        protocol = scheme.lower()
+        if protocol not in (TCP, UDP):
+            raise ValueError(f"Unknown protocol: {scheme}")
+    port = default_port
+    if text.startswith("["):
+        host, _, rest = text[1:].partition("]")
+        if rest.startswith(":"):
+            port = int(rest[1:])
+    elif text.count(":") == 1:
+        host, port_text = text.split(":")
+        port = int(port_text)
+    else:
+        host = text
+    if not host:
+        raise ValueError("Missing host")
+    return ProbeTarget(host, port, protocol)
+
+
+class _EchoProtocol(asyncio.DatagramProtocol):
+    """Receives UDP echoes and completes the future waiting for each sequence number"""
+
+    def __init__(self):
+        self.waiting = {}
+
+    def datagram_received(self, data, addr):
+        future = self.waiting.pop(data[:8], None)
+        if future is not None and not future.done():
+            future.set_result(time.perf_counter())
+
+    def error_received(self, exc):
+        # An ICMP port unreachable ends every outstanding probe early
+        for future in self.waiting.values():
+            if not future.done():
+                future.set_exception(exc)
+        self.waiting.clear()
+
+
+class LatencyProber:
+    """Probes targets on a fixed interval from a background asyncio loop
+
+    stats() may be called from any thread. on_sample(target_label, rtt_ms
+    or None), if given, is called on the prober thread after every probe.
+    """
+
+    def __init__(self, targets, interval=1.0, timeout=1.0, on_sample=None):
+        self.targets = [target if isinstance(target, ProbeTarget) else parse_target(target) for target in targets]
+        self.interval = interval
+        self.timeout = timeout
+        self.on_sample = on_sample
+        self._stats = {target.label: TargetStats(target) for target in self.targets}
+        self._lock = threading.Lock()
+        self._loop = None
+        self._stop_event = None
+        self._stop_requested = False
+        self._thread = None
+
+    def start(self):
+        """Start probing on a daemon thread"""
+        if self._thread is None:
+            self._thread = Thread(target=lambda: asyncio.run(self.run()), daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop probing and wait for the thread"""
+        self._stop_requested = True
+        if self._loop is not None and self._stop_event is not None:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self):
+        """Return a snapshot of every target's statistics in target order"""
+        with self._lock:
+            return [self._stats[target.label].snapshot() for target in self.targets]
+
+    async def run(self, rounds=None):
+        """Probe every target each interval until stop() or for rounds rounds"""
+        self._loop = asyncio.get_running_loop()
+        self._stop_event = asyncio.Event()
+        if self._stop_requested:
+            # stop() came before the loop was up
+            self._stop_event.set()
+        await asyncio.gather(*(self._probe_loop(target, rounds) for target in self.targets))
+
+    def run_rounds(self, rounds):
+        """Probe every target rounds times in the calling thread; returns stats()"""
+        asyncio.run(self.run(rounds))
+        return self.stats()
+
+    async def _probe_loop(self, target, rounds):
+        # Spread the targets over the interval instead of probing them all at once
+        await self._sleep(random.random() * self.interval if rounds is None else 0)
+        next_time = time.monotonic()
+        done = 0
+        while not self._stop_event.is_set() and (rounds is None or done < rounds):
+            rtt, error = await self._probe(target)
+            with self._lock:
+                stats = self._stats[target.label]
+                if rtt is None:
+                    stats.record_loss(error)
+                else:
+                    stats.record(rtt * 1e6)
+            if self.on_sample is not None:
+                self.on_sample(target.label, None if rtt is None else rtt * 1000)
+            done += 1
+            next_time += self.interval
+            await self._sleep(max(0.0, next_time - time.monotonic()))
+
+    async def _sleep(self, seconds):
+        """Sleep, waking early when the prober is stopped"""
+        try:
+            await asyncio.wait_for(self._stop_event.wait(), seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _resolve(self, target):
+        if target.address is None:
+            kind = socket.SOCK_STREAM if target.protocol == TCP else socket.SOCK_DGRAM
+            infos = await self._loop.getaddrinfo(target.host, target.port, type=kind)
+            target.address = infos[0][4]
+            target.family = infos[0][0]
+        return target.address
+
+    async def _probe(self, target):
+        """One probe; returns (round trip seconds, None) or (None, error text)"""
+        try:
+            address = await asyncio.wait_for(self._resolve(target), self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            return None, f"resolve failed: {e or 'timed out'}"
+        try:
+            if target.protocol == TCP:
+                return await self._probe_tcp(target, address), None
+            return await self._probe_udp(target, address), None
+        except asyncio.TimeoutError:
+            return None, "timed out"
+        except OSError as e:
+            # The address may have changed; look it up again next time
+            target.address = None
+            return None, str(e)
+
+    async def _probe_tcp(self, target, address):
+        start = time.perf_counter()
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(address[0], address[1], family=target.family), self.timeout)
+        rtt = time.perf_counter() - start
+        writer.close()
+        return rtt
+
+    async def _probe_udp(self, target, address):
+        transport, protocol = await self._loop.create_datagram_endpoint(
+            _EchoProtocol, remote_addr=address[:2], family=target.family)
+        try:
+            sequence = random.getrandbits(64).to_bytes(8, 'big')
+            future = self._loop.create_future()
+            protocol.waiting[sequence] = future
+            start = time.perf_counter()
+            transport.sendto(sequence + b"latency-probe")
+            received = await asyncio.wait_for(future, self.timeout)
+            return received - start
+        finally:
+            transport.close()
+
+
+class LocalEchoServer:
+    """TCP listener and UDP echo server on localhost, standing in for probe targets
+
+    drop_rate drops that share of UDP datagrams and delay delays every
+    echo, to exercise loss and latency statistics.
+    """
+
+    def __init__(self, delay=0.0, drop_rate=0.0, seed=None):
+        self.delay = delay
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.tcp_socket.bind(("127.0.0.1", 0))
+        self.tcp_socket.listen(128)
+        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_socket.bind(("127.0.0.1", 0))
+        self.tcp_port = self.tcp_socket.getsockname()[1]
+        self.udp_port = self.udp_socket.getsockname()[1]
+        self._running = True
+        Thread(target=self._accept, daemon=True).start()
+        Thread(target=self._echo, daemon=True).start()
+
+    @property
+    def targets(self):
+        """Probe targets for both listeners"""
+        return [f"127.0.0.1:{self.tcp_port}", f"udp://127.0.0.1:{self.udp_port}"]
+
+    def close(self):
+        self._running = False
+        self.tcp_socket.close()
+        self.udp_socket.close()
+
+    def _accept(self):
+        while self._running:
+            try:
+                connection, _ = self.tcp_socket.accept()
+            except OSError:
+                return
+            connection.close()
+
+    def _echo(self):
+        while self._running:
+            try:
+                data, address = self.udp_socket.recvfrom(2048)
+            except OSError:
+                return
+            if self.random.random() < self.drop_rate:
+                continue
+            if self.delay:
+                time.sleep(self.delay)
+            try:
+                self.udp_socket.sendto(data, address)
+            except OSError:
+                return
+
+
+def format_row(entry):
+    """Return one target's stats as the cells (target, sent, loss, p50, p95, p99, jitter) of a table"""
+    def ms(value):
+        return "-" if value is None else f"{value:.2f}"
+
+    loss = "-" if entry['loss'] is None else f"{entry['loss']:.1f}%"
+    return (entry['target'], str(entry['sent']), loss, ms(entry['p50']), ms(entry['p95']),
+            ms(entry['p99']), ms(entry['jitter']))
+
+
+def format_stats(stats):
+    """Return prober stats as the lines of a fixed-width table"""
+    width = max([len("Target")] + [len(entry['target']) for entry in stats])
+    lines = [f"{'Target':<{width}}  {'Sent':>5}  {'Loss':>6}  {'p50':>7}  {'p95':>7}  {'p99':>7}  {'Jitter':>7}"]
+    for entry in stats:
+        target, sent, loss, p50, p95, p99, jitter = format_row(entry)
+        lines.append(f"{target:<{width}}  {sent:>5}  {loss:>6}  {p50:>7}  {p95:>7}  {p99:>7}  {jitter:>7}")
+    return lines
+
+
+def parse_args(argv=None):
+    """Parse the command line of the latency prober"""
+    parser = argparse.ArgumentParser(description="Measure TCP connect and UDP echo latency")
+    parser.add_argument("targets", nargs="*", help="host:port or udp://host:port targets")
+    parser.add_argument("--count", type=int, default=10,
+                        help="Probes per target (default: 10)")
+    parser.add_argument("--interval", type=float, default=0.2,
+                        help="Seconds between probes of a target (default: 0.2)")
+    parser.add_argument("--timeout", type=float, default=1.0,
+                        help="Seconds before a probe counts as lost (default: 1)")
+    parser.add_argument("--local", action="store_true",
+                        help="Also probe a local echo server dropping 10%% of UDP echoes")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_args(argv)
+    targets = list(args.targets)
+    server = None
+    if args.local:
+        server = LocalEchoServer(drop_rate=0.1)
+        targets += server.targets
+    if not targets:
+        print("Nothing to probe; pass targets or --local", file=sys.stderr)
+        return 2
+    prober = LatencyProber(targets, interval=args.interval, timeout=args.timeout)
+    for line in format_stats(prober.run_rounds(args.count)):
+        print(line)
+    if server is not None:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
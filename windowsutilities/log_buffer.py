@@ -0,0 +1,81 @@
+import time
+import threading
+from datetime import datetime
+from itertools import islice
+from collections import deque, namedtuple
+
+
+# One activity log entry; seq numbers are consecutive, so they double as
+# stable positions while old records fall off the front of the buffer
+LogRecord = namedtuple('LogRecord', [
+    'seq',
+    'timestamp',    # time.time() when the record was logged
+    'level',
+    'message',
+])
+
+
+class LogBuffer:
+    """Bounded, thread-safe ring buffer of structured log records
+
+    Any thread may append; the record is stored as data and only formatted
+    when a view actually shows it. Once full, the oldest record is dropped
+    for each new one, so memory stays flat however long the app runs.
+    """
+
+    def __init__(self, capacity=10000):
+        self.capacity = capacity
+        self.dropped = 0               # Records evicted to make room
+        self._records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._next_seq = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    @property
+    def first_seq(self):
+        """Seq of the oldest record held (the next seq when empty)"""
+        with self._lock:
+            return self._records[0].seq if self._records else self._next_seq
+
+    @property
+    def last_seq(self):
+        """Seq of the newest record ever appended, -1 before the first"""
+        return self._next_seq - 1
+
+    def append(self, message, level="info", timestamp=None):
+        """Store a record and return it"""
+        with self._lock:
+            record = LogRecord(self._next_seq, timestamp or time.time(), level, message)
+            self._next_seq += 1
+            if len(self._records) == self.capacity:
+                self.dropped += 1
+            self._records.append(record)
+        return record
+
+    def records(self, start=0, count=None):
+        """Return up to count records starting at index start (oldest is 0)"""
+        with self._lock:
+            size = len(self._records)
+            start = max(0, min(start, size))
+            end = size if count is None else min(size, start + count)
+            if end - start <= 0:
+                return []
+            # deque indexing is O(n) from the ends, so walk in from the nearer one
+            if start <= size - end:
+                return list(islice(self._records, start, end))
+            tail = list(islice(reversed(self._records), size - end, size - start))
+            tail.reverse()
+            return tail
+
+    def clear(self):
+        """Drop every record; seq numbers keep counting up"""
+        with self._lock:
+            self._records.clear()
+
+
+def format_record(record):
+    """Format a record as a single log line without a trailing newline"""
+    timestamp = datetime.fromtimestamp(record.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+    return f"[{timestamp}] [{record.level.upper()}] {record.message}"
@@ -0,0 +1,289 @@
+import os
+import re
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+
+from log_buffer import LogRecord
+
+
+LogSearchResult = namedtuple('LogSearchResult', [
+    'records',      # Matching LogRecords, oldest first
+    'truncated',    # True when more records matched than the limit
+    'elapsed_ms',
+    'partial',      # True when only the newest records were searched (see SHORT_TEXT_SCAN_LIMIT)
+])
+
+# A time range holding fewer records than this is scanned directly, which is
+# faster than intersecting it with a broad text match
+RANGE_SCAN_LIMIT = 20000
+
+# Text the trigram index can't narrow down (under three characters, or a
+# regex without a three character literal) is only looked for in this many
+# newest records, which keeps such searches fast on a full index. REGEXP
+# runs Python for every record, so regexes get a smaller window
+SHORT_TEXT_SCAN_LIMIT = 200000
+REGEX_SCAN_LIMIT = 30000
+
+# Characters with a special meaning in a regular expression
+_REGEX_SPECIAL = set(".^$*+?{}[]()|\\")
+
+
+def default_log_index_path():
+    """Return the default location of the log search index"""
+    base_dir = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base_dir, "WindowsSystemUtilities", "logs", "activity_index.db")
+
+
+class LogIndex:
+    """Searchable index of the persisted activity log stored in SQLite
+
+    Records are added in batches as the log sink writes them, so the index
+    is built incrementally. Level and time filters use ordinary indexes;
+    text search uses an FTS5 trigram index, which answers substring queries
+    without scanning every message. Regular expressions are checked with a
+    REGEXP function, prefiltered by the index on the longest literal part of
+    the pattern when there is one. Older SQLite builds without the trigram
+    tokenizer fall back to LIKE scans. The index keeps the newest
+    max_records records.
+    """
+
+    def __init__(self, db_path=None, max_records=2000000):
+        self.db_path = db_path or default_log_index_path()
+        self.max_records = max_records
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # Records are added on the log writer thread and searched on workers
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.create_function("REGEXP", 2, _regexp)
+        self._added = 0
+        with self.lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    id INTEGER PRIMARY KEY,
+                    timestamp REAL NOT NULL,
+                    seq INTEGER NOT NULL,
+                    level TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    UNIQUE (timestamp, seq)
+                )
+            """)
+            # Index entries end in the rowid, so a level index also walks newest first
+            self.conn.execute("CREATE INDEX IF NOT EXISTS records_level ON records (level)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS records_time ON records (timestamp)")
+            self.has_fts = self._create_fts()
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
+
+    def add(self, records):
+        """Index a batch of LogRecords in one transaction; duplicates are ignored"""
+        rows = [(record.timestamp, record.seq, record.level, record.message) for record in records]
+        if not rows:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO records (timestamp, seq, level, message) VALUES (?, ?, ?, ?)", rows)
+            self._added += len(rows)
+            # Trimming is a range delete, so only do it once in a while
+            if self._added >= 10000:
+                self._added = 0
+                self.conn.execute(
+                    "DELETE FROM records WHERE id <= (SELECT MAX(id) FROM records) - ?", (self.max_records,))
+
+    def last_timestamp(self):
+        """Timestamp of the newest indexed record, or None"""
+        with self.lock:
+            row = self.conn.execute("SELECT MAX(timestamp) FROM records").fetchone()
+        return row[0]
+
+    def catch_up(self, records, batch_size=5000):
+        """Index records the index missed (from read_records()); returns how many were read"""
+        count = 0
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                self.add(batch)
+                count += len(batch)
+                batch = []
+        self.add(batch)
+        return count + len(batch)
+
+    def count(self):
+        """Number of indexed records"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def search(self, text=None, regex=False, levels=None, start=None, end=None, limit=1000):
+        """Return the newest records matching every given filter
+
+        text is a case-insensitive substring, or a regular expression when
+        regex is set (raises re.error when invalid). levels limits the
+        levels, and start/end the timestamps (start <= timestamp < end).
+        Text the trigram index can't be used for is only searched for in the
+        newest records (SHORT_TEXT_SCAN_LIMIT, REGEX_SCAN_LIMIT for regexes)
+        unless the time range is narrow; the result is then marked partial.
+        """
+        start_time = time.perf_counter()
+        conditions = []
+        params = []
+        match = None
+        partial = False
+        small_range = self._small_range(start, end)
+        if levels:
+            # In a narrow time range the timestamp index is the better way in;
+            # a unary + keeps SQLite from picking the level index instead
+            column = "+r.level" if small_range else "r.level"
+            conditions.append(f"{column} IN ({', '.join('?' * len(levels))})")
+            params.extend(levels)
+        if start is not None:
+            conditions.append("r.timestamp >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("r.timestamp < ?")
+            params.append(end)
+        if text:
+            if regex:
+                re.compile(text)
+                literal = _required_literal(text)
+                conditions.append("r.message REGEXP ?")
+                params.append(text)
+            else:
+                literal = text
+            # The trigram index matches substrings of three characters or more
+            if self.has_fts and literal and len(literal) >= 3 and not small_range:
+                match = '"' + literal.replace('"', '""') + '"'
+            else:
+                if not regex:
+                    conditions.append("r.message LIKE ? ESCAPE '\\'")
+                    params.append("%" + _escape_like(text) + "%")
+                if not small_range:
+                    # Every record would have to be read, so only read the newest ones
+                    scan_limit = REGEX_SCAN_LIMIT if regex else SHORT_TEXT_SCAN_LIMIT
+                    conditions.append("r.id > (SELECT MAX(id) FROM records) - ?")
+                    params.append(scan_limit)
+                    with self.lock:
+                        partial = bool(self.conn.execute(
+                            "SELECT (SELECT MIN(id) FROM records) <= (SELECT MAX(id) FROM records) - ?", (scan_limit,)).fetchone()[0])
+
+        if match is not None:
+            where = " AND ".join(["records_fts MATCH ?"] + conditions)
+            params.insert(0, match)
+            # rowid order lets FTS5 stop after the newest matches
+            query = ("SELECT r.seq, r.timestamp, r.level, r.message FROM records_fts "
+                     "JOIN records r ON r.id = records_fts.rowid "
+                     f"WHERE {where} ORDER BY records_fts.rowid DESC LIMIT ?")
+        else:
+            where = " AND ".join(conditions) or "1"
+            query = ("SELECT r.seq, r.timestamp, r.level, r.message FROM records r "
+                     f"WHERE {where} ORDER BY r.id DESC LIMIT ?")
+        params.append(limit + 1)
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        truncated = len(rows) > limit
+        records = [LogRecord(*row) for row in rows[:limit]]
+        records.reverse()
+        return LogSearchResult(records, truncated, (time.perf_counter() - start_time) * 1000, partial)
+
+    def _small_range(self, start, end):
+        """Check whether a time range is narrow enough to scan without the text index"""
+        if start is None and end is None:
+            return False
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM (SELECT 1 FROM records WHERE timestamp >= ? AND timestamp < ? LIMIT ?)",
+                (start if start is not None else float('-inf'), end if end is not None else float('inf'),
+                 RANGE_SCAN_LIMIT)
+            ).fetchone()
+        return row[0] < RANGE_SCAN_LIMIT
+
+    def clear(self):
+        """Forget every indexed record"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM records")
+
+    def _create_fts(self):
+        """Create the trigram index and its triggers; returns False if SQLite lacks support"""
+        try:
+            self.conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5("
+                "message, content='records', content_rowid='id', tokenize='trigram')")
+        except sqlite3.OperationalError:
+            return False
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS records_insert AFTER INSERT ON records BEGIN
+                INSERT INTO records_fts (rowid, message) VALUES (new.id, new.message);
+            END
+        """)
+        self.conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS records_delete AFTER DELETE ON records BEGIN
+                INSERT INTO records_fts (records_fts, rowid, message) VALUES ('delete', old.id, old.message);
+            END
+        """)
+        return True
+
+
+def _regexp(pattern, value):
+    """REGEXP implementation for SQLite (compiled patterns are cached by re)"""
+    return value is not None and re.search(pattern, value) is not None
+
+
+def _escape_like(text):
+    """Escape LIKE wildcards so text matches literally"""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _required_literal(pattern):
+    """Longest plain run of characters every match of pattern must contain, or None
+
+    Only simple patterns are analysed: alternation gives None, groups and
+    character classes end a run, and a character followed by an optional
+    quantifier is left out.
+    """
+    if "|" in pattern:
+        return None
+    runs = []
+    current = []
+    depth = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            # Escaped punctuation is a literal; classes like \d end the run
+            following = pattern[index + 1:index + 2]
+            if depth == 0 and following and not following.isalnum():
+                current.append(following)
+            else:
+                runs.append("".join(current))
+                current = []
+            index += 2
+            continue
+        if char in _REGEX_SPECIAL:
+            if char in "*?{" and current:
+                # The previous character may be absent
+                current.pop()
+            runs.append("".join(current))
+            current = []
+            if char == "(":
+                depth += 1
+            elif char == ")":
+                depth = max(0, depth - 1)
+            elif char in "[{":
+                # Skip the character class or the repeat count
+                close = pattern.find("]" if char == "[" else "}", index + 2 if char == "[" else index + 1)
+                index = close if close != -1 else len(pattern)
+        elif depth == 0:
+            current.append(char)
+        index += 1
+    runs.append("".join(current))
+    return max(runs, key=len) or None
@@ -0,0 +1,237 @@
+import os
+import gzip
+import json
+import time
+import queue
+import shutil
+import threading
+from threading import Thread
+
+from log_buffer import LogRecord, format_record
+
+
+def default_log_path():
+    """Return the default location of the persisted activity log"""
+    base_dir = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base_dir, "WindowsSystemUtilities", "logs", "activity.jsonl")
+
+
+class AsyncLogSink:
+    """Appends log records to rotating JSON-lines files from a writer thread
+
+    write() only puts the record on a bounded queue, so callers never wait
+    on the disk; when the queue is full the record is counted as dropped
+    rather than blocking. The writer takes records in batches, writes each
+    batch with one call and fsyncs at most every fsync_interval seconds.
+    Once the file would exceed max_bytes it is rotated to path.1, path.2,
+    ... (gzip compressed as path.1.gz, ... when compress is set) and the
+    oldest beyond backup_count is dropped.
+    """
+
+    def __init__(self, path=None, max_bytes=5 * 1024 * 1024, backup_count=5, compress=False,
+                 batch_size=256, fsync_interval=5.0, max_queue=10000):
+        self.path = path or default_log_path()
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.rotations = 0
+        self.listeners = []
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._file = None
+        self._last_fsync = time.monotonic()
+        self._unsynced = False
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, record):
+        """Queue a LogRecord for writing; never blocks"""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def add_listener(self, callback):
+        """Call callback(batch) on the writer thread after each batch is written"""
+        self.listeners.append(callback)
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far is written and synced to disk"""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout=5.0):
+        """Write what is queued, then stop the writer thread"""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def stats(self):
+        """Return writer counters"""
+        return {
+            'written': self.written,
+            'dropped': self.dropped,
+            'batches': self.batches,
+            'fsyncs': self.fsyncs,
+            'rotations': self.rotations,
+            'pending': self._queue.qsize(),
+        }
+
+    def _run(self):
+        """Writer thread: batch records, write them and sync on a schedule"""
+        running = True
+        while running:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval)
+            except queue.Empty:
+                self._sync(force=False)
+                continue
+
+            batch = []
+            waiters = []
+            while True:
+                if item is None:
+                    running = False
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    batch.append(item)
+                if not running or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            try:
+                if batch:
+                    self._write_batch(batch)
+                self._sync(force=bool(waiters) or not running)
+            except OSError as e:
+                # Losing log lines must not take the writer down with it
+                print(f"Error writing log file: {e}")
+            if batch:
+                for callback in self.listeners:
+                    try:
+                        callback(batch)
+                    except Exception as e:
+                        print(f"Error in log listener: {e}")
+            for waiter in waiters:
+                waiter.set()
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_batch(self, batch):
+        """Serialize a batch and append it with a single write"""
+        data = "".join(json.dumps(record._asdict(), ensure_ascii=False) + "\n" for record in batch)
+        if self._file is None:
+            self._open()
+        if self.max_bytes and self._file.tell() > 0 and self._file.tell() + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._unsynced = True
+        self.written += len(batch)
+        self.batches += 1
+
+    def _sync(self, force):
+        """fsync the file if forced or fsync_interval has passed since the last one"""
+        if not self._unsynced or self._file is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+            self._unsynced = False
+            self.fsyncs += 1
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8', newline='')
+
+    def _rotate(self):
+        """Move the current file to the first backup slot and start a new one"""
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+        self._unsynced = False
+        suffix = ".gz" if self.compress else ""
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}{suffix}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}{suffix}")
+            if self.compress:
+                with open(self.path, 'rb') as source, gzip.open(f"{self.path}.1.gz", 'wb') as target:
+                    shutil.copyfileobj(source, target)
+                os.remove(self.path)
+            else:
+                os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+        self._open()
+
+
+def log_files(path=None):
+    """Return the persisted log files from oldest to newest"""
+    path = path or default_log_path()
+    directory = os.path.dirname(path) or "."
+    prefix = os.path.basename(path) + "."
+    backups = []
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if not name.startswith(prefix):
+                continue
+            index = name[len(prefix):]
+            if index.endswith(".gz"):
+                index = index[:-3]
+            if index.isdigit():
+                backups.append((int(index), os.path.join(directory, name)))
+    # Higher backup numbers are older
+    files = [file_path for _, file_path in sorted(backups, reverse=True)]
+    if os.path.exists(path):
+        files.append(path)
+    return files
+
+
+def read_records(path=None, start=None, end=None):
+    """Yield persisted LogRecords with start <= timestamp < end, oldest first"""
+    for file_path in log_files(path):
+        opener = gzip.open if file_path.endswith(".gz") else open
+        with opener(file_path, 'rt', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                try:
+                    record = LogRecord(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # A line cut short by a crash
+                if start is not None and record.timestamp < start:
+                    continue
+                if end is not None and record.timestamp >= end:
+                    continue
+                yield record
+
+
+def export_log(output_path, path=None, start=None, end=None):
+    """Write persisted records in a time range as plain log lines; returns the count"""
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for record in read_records(path, start, end):
+            f.write(format_record(record) + "\n")
+            count += 1
+    return count
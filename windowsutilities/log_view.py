@@ -0,0 +1,137 @@
+import time
+import tkinter as tk
+from tkinter import ttk
+from tkinter import font as tkfont
+from datetime import datetime
+
+from metrics_store import RingBuffer
+
+
+class VirtualLogView(ttk.Frame):
+    """Log viewer that renders only the visible records of a LogBuffer
+
+    The Text widget never holds more lines than fit on screen: scrolling
+    moves a window over the buffer and re-renders just that window in one
+    insert call, so render cost depends on the widget height, not on how
+    many records exist. One record is one line (embedded newlines are shown
+    as a marker). While scrolled to the bottom the view follows new records;
+    scrolling up pins it to the records being read.
+    """
+
+    def __init__(self, parent, buffer, font=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.buffer = buffer
+        self.follow = True             # Stick to the newest record
+        self.renders = 0
+        self.render_times = RingBuffer(120)  # Seconds spent per render
+        self._top_seq = 0              # Seq of the first visible record when not following
+        self._rendered = None          # Key of what is on screen, to skip no-op renders
+
+        self.text = tk.Text(self, wrap=tk.NONE, font=font, state=tk.DISABLED, height=1)
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        xscrollbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.configure(xscrollcommand=xscrollbar.set)
+        self.text.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        xscrollbar.grid(row=1, column=0, sticky='ew')
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self._line_height = max(1, tkfont.Font(font=self.text.cget('font')).metrics('linespace'))
+        self.text.bind('<Configure>', lambda event: self.refresh())
+        self.text.bind('<MouseWheel>', self._on_mousewheel)
+        self.text.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.text.bind('<Button-5>', lambda event: self.scroll(3))
+
+    def set_buffer(self, buffer):
+        """Show another LogBuffer (such as search results), starting at its newest records"""
+        self.buffer = buffer
+        self.follow = True
+        self._rendered = None
+        self.refresh()
+
+    def visible_rows(self):
+        """Number of records that fit in the widget"""
+        padding = 2 * sum(int(str(self.text.cget(option)))
+                          for option in ('borderwidth', 'highlightthickness', 'pady'))
+        return max(1, (self.text.winfo_height() - padding) // self._line_height)
+
+    def refresh(self):
+        """Render the visible window if it changed; call once per frame"""
+        start_time = time.perf_counter()
+        count = len(self.buffer)
+        rows = self.visible_rows()
+        max_start = max(0, count - rows)
+        if self.follow:
+            start = max_start
+        else:
+            start = min(max(0, self._top_seq - self.buffer.first_seq), max_start)
+        records = self.buffer.records(start, rows)
+        self._update_scrollbar(start, rows, count)
+
+        key = (records[0].seq, records[-1].seq, rows) if records else (None, None, rows)
+        if key == self._rendered:
+            return
+        self._rendered = key
+        if records:
+            self._top_seq = records[0].seq
+
+        # Build one insert call of alternating text and tags for the whole window
+        chunks = []
+        for record in records:
+            timestamp = datetime.fromtimestamp(record.timestamp).strftime("%Y-%m-%d %H:%M:%S")
+            message = record.message.replace("\n", " ⏎ ")
+            chunks.extend((
+                f"[{timestamp}] ", ("timestamp",),
+                f"[{record.level.upper()}] ", (record.level, "level"),
+                message + "\n", (record.level, "message"),
+            ))
+        self.text.configure(state=tk.NORMAL)
+        self.text.delete('1.0', tk.END)
+        if chunks:
+            self.text.insert(tk.END, *chunks)
+        self.text.configure(state=tk.DISABLED)
+
+        self.renders += 1
+        self.render_times.append(time.perf_counter() - start_time)
+
+    def scroll(self, delta):
+        """Scroll by delta records; reaching the bottom resumes following"""
+        count = len(self.buffer)
+        rows = self.visible_rows()
+        max_start = max(0, count - rows)
+        if self.follow:
+            start = max_start
+        else:
+            start = max(0, self._top_seq - self.buffer.first_seq)
+        self._move_to(start + delta, max_start)
+
+    def _move_to(self, start, max_start):
+        """Show records from index start on"""
+        start = max(0, min(int(start), max_start))
+        self.follow = start >= max_start
+        self._top_seq = self.buffer.first_seq + start
+        self.refresh()
+
+    def _update_scrollbar(self, start, rows, count):
+        """Size the scrollbar thumb to the visible share of the buffer"""
+        if count <= rows:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(start / count, (start + rows) / count)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        """Handle drags ('moveto') and arrow/trough clicks ('scroll') on the scrollbar"""
+        count = len(self.buffer)
+        rows = self.visible_rows()
+        max_start = max(0, count - rows)
+        if action == 'moveto':
+            self._move_to(float(amount) * count, max_start)
+        elif action == 'scroll':
+            step = int(amount) * (rows if unit == 'pages' else 1)
+            self.scroll(step)
+
+    def _on_mousewheel(self, event):
+        """Scroll three records per wheel notch"""
+        self.scroll(-3 * int(event.delta / 120) if event.delta else 0)
+        return "break"
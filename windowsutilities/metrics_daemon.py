@@ -0,0 +1,470 @@
+"""Headless system metrics collection
+
+The collectors in this module have no GUI dependencies. MetricsEngine runs
+each of them on its own schedule and hands every record to its listeners:
+the Tk dashboard is one listener and the command line entry point below,
+which streams JSON-lines or CSV to stdout or a rotating file, is another.
+
+    python metrics_daemon.py --interval 1 --format jsonl --output metrics.jsonl
+"""
+import os
+import io
+import sys
+import csv
+import json
+import time
+import argparse
+import platform
+import threading
+from threading import Thread
+
+import psutil
+
+from system_sampler import SystemSampler
+from network_throughput import ThroughputEngine
+from powershell_pool import PowerShellError, get_default_pool
+
+
+class Collector:
+    """Base class for a metrics source sampled every interval seconds"""
+    name = "collector"
+    fields = ()
+    interval = 1.0
+    initial_delay = 0.0
+
+    def available(self):
+        """Check whether the collector can run on this machine"""
+        return True
+
+    def collect(self):
+        """Return a dict with the current values of the collector's fields"""
+        raise NotImplementedError
+
+    def alerts(self, values):
+        """Return (category, message) pairs worth logging for a sample"""
+        return []
+
+
+class SystemCollector(Collector):
+    """CPU, memory, disk and network throughput from a shared SystemSampler"""
+    name = "system"
+    fields = ('cpu_percent', 'memory_percent', 'disk_read_bps', 'disk_write_bps',
+              'net_sent_bps', 'net_recv_bps', 'sample_calls', 'sample_ms')
+
+    CPU_ALERT_PERCENT = 85
+    MEMORY_ALERT_PERCENT = 90
+    ALERT_COOLDOWN = 30  # Seconds between repeated load alerts
+
+    def __init__(self, interval=1.0, sampler=None):
+        self.interval = interval
+        self.sampler = sampler or SystemSampler()
+        self._prev = None
+        self._last_alert = 0.0
+
+    def collect(self):
+        # One snapshot per tick; the GUI reads the same one through sampler.latest
+        snapshot = self.sampler.sample()
+        values = {
+            'cpu_percent': snapshot.cpu_percent,
+            'memory_percent': snapshot.memory.percent,
+            'disk_read_bps': 0.0,
+            'disk_write_bps': 0.0,
+            'net_sent_bps': 0.0,
+            'net_recv_bps': 0.0,
+            'sample_calls': snapshot.calls,
+            'sample_ms': round(snapshot.elapsed * 1000, 3),
+        }
+
+        # Rates need two snapshots, so the first sample reports zero
+        prev = self._prev
+        if prev is not None:
+            elapsed = max(snapshot.timestamp - prev.timestamp, 1e-6)
+            if snapshot.disk_io is not None and prev.disk_io is not None:
+                values['disk_read_bps'] = (snapshot.disk_io.read_bytes - prev.disk_io.read_bytes) / elapsed
+                values['disk_write_bps'] = (snapshot.disk_io.write_bytes - prev.disk_io.write_bytes) / elapsed
+            if snapshot.net_io is not None and prev.net_io is not None:
+                values['net_sent_bps'] = (snapshot.net_io.bytes_sent - prev.net_io.bytes_sent) / elapsed
+                values['net_recv_bps'] = (snapshot.net_io.bytes_recv - prev.net_io.bytes_recv) / elapsed
+        self._prev = snapshot
+        return values
+
+    def alerts(self, values):
+        # Only log when the system is under high load, and not every second
+        now = time.monotonic()
+        if now - self._last_alert < self.ALERT_COOLDOWN:
+            return []
+        messages = []
+        if values['cpu_percent'] > self.CPU_ALERT_PERCENT:
+            messages.append(("system", f"High CPU usage: {values['cpu_percent']}%"))
+        if values['memory_percent'] > self.MEMORY_ALERT_PERCENT:
+            messages.append(("system", f"High memory usage: {values['memory_percent']}%"))
+        if messages:
+            self._last_alert = now
+        return messages
+
+
+class NetworkActivityCollector(Collector):
+    """Average network throughput over a longer period"""
+    name = "network"
+    fields = ('sent_mbps', 'recv_mbps')
+
+    ALERT_MBPS = 1.0  # Only log transfers above 1 MB/s
+
+    def __init__(self, interval=10.0, sampler=None):
+        self.interval = interval
+        # With a sampler, reuse the counters of its latest snapshot
+        self.sampler = sampler
+        self._prev_time, self._prev_net = self._read_counters()
+
+    def _read_counters(self):
+        snapshot = self.sampler.latest if self.sampler is not None else None
+        if snapshot is not None and snapshot.net_io is not None:
+            return snapshot.timestamp, snapshot.net_io
+        return time.time(), psutil.net_io_counters()
+
+    def collect(self):
+        now, net_io = self._read_counters()
+        elapsed = max(now - self._prev_time, 1e-6)
+        sent_mb = (net_io.bytes_sent - self._prev_net.bytes_sent) / (1024 * 1024)
+        recv_mb = (net_io.bytes_recv - self._prev_net.bytes_recv) / (1024 * 1024)
+        self._prev_time = now
+        self._prev_net = net_io
+        return {'sent_mbps': sent_mb / elapsed, 'recv_mbps': recv_mb / elapsed}
+
+    def alerts(self, values):
+        if values['sent_mbps'] > self.ALERT_MBPS or values['recv_mbps'] > self.ALERT_MBPS:
+            return [("network", f"Network activity: {values['sent_mbps']:.2f} MB/s upload, "
+                                f"{values['recv_mbps']:.2f} MB/s download")]
+        return []
+
+
+class ThroughputCollector(Collector):
+    """Per-interface network rates, summed, from a ThroughputEngine
+
+    The engine keeps the per-interface and per-process detail (and its
+    history) for whoever wants to show it; records carry the totals.
+    """
+    name = "throughput"
+    fields = ('recv_bps', 'sent_bps', 'packets_recv_ps', 'packets_sent_ps',
+              'errors_ps', 'drops_ps', 'utilization', 'connections')
+
+    ALERT_COOLDOWN = 60  # Seconds between repeated packet error alerts
+
+    def __init__(self, interval=2.0, engine=None):
+        self.interval = interval
+        self.engine = engine or ThroughputEngine()
+        self._last_alert = 0.0
+
+    def collect(self):
+        sample = self.engine.sample()
+        return {field: getattr(sample, field) for field in self.fields}
+
+    def alerts(self, values):
+        now = time.monotonic()
+        if now - self._last_alert < self.ALERT_COOLDOWN or not (values['errors_ps'] or values['drops_ps']):
+            return []
+        self._last_alert = now
+        interfaces = [rates.name for rates in self.engine.latest.interfaces if rates.errors_ps or rates.drops_ps]
+        return [("network", f"Packet errors on {', '.join(interfaces)}: {values['errors_ps']:.1f} errors/s, "
+                            f"{values['drops_ps']:.1f} drops/s")]
+
+
+class HyperVCollector(Collector):
+    """Hyper-V service state and running VM count (Windows only)"""
+    name = "hyperv"
+    fields = ('service_status', 'running_vms')
+
+    def __init__(self, interval=300.0, initial_delay=20.0):
+        self.interval = interval
+        self.initial_delay = initial_delay  # Don't add load during startup
+
+    def available(self):
+        return platform.system() == 'Windows'
+
+    def collect(self):
+        status = _run_powershell("(Get-Service -Name 'vmms' -ErrorAction SilentlyContinue).Status")
+        running_vms = None
+        # Only check running VMs if the Hyper-V service is running
+        if status == "Running":
+            count = _run_powershell(
+                "Get-VM | Where-Object {$_.State -eq 'Running'} | Measure-Object | Select-Object -ExpandProperty Count"
+            )
+            if count and count.isdigit():
+                running_vms = int(count)
+        return {'service_status': status or "Unavailable", 'running_vms': running_vms}
+
+    def alerts(self, values):
+        if values['running_vms']:
+            return [("hyperv", f"Running VMs: {values['running_vms']}")]
+        return []
+
+
+def _run_powershell(command, timeout=10):
+    """Run a PowerShell command on the shared worker pool and return its text (None on failure)"""
+    try:
+        return get_default_pool().run_text(command, timeout)
+    except PowerShellError:
+        return None
+
+
+def default_collectors(sampler=None, throughput_engine=None):
+    """Collectors used by both the GUI and the command line"""
+    sampler = sampler or SystemSampler()
+    return [SystemCollector(sampler=sampler), NetworkActivityCollector(sampler=sampler),
+            ThroughputCollector(engine=throughput_engine), HyperVCollector()]
+
+
+class MetricsEngine:
+    """Runs collectors on their own schedules and fans records out to listeners
+
+    Each collector gets a daemon thread so a slow one (PowerShell for Hyper-V)
+    never delays the others. Records are dicts with 'timestamp' (epoch
+    seconds), 'source' (the collector name) and the collector's fields.
+    Listeners are called on the collector threads.
+    """
+
+    def __init__(self, collectors=None):
+        collectors = default_collectors() if collectors is None else collectors
+        self.collectors = [collector for collector in collectors if collector.available()]
+        self.listeners = []
+        self.alert_listeners = []
+        self.error_count = 0
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def add_listener(self, callback):
+        """Call callback(record) for every sample"""
+        self.listeners.append(callback)
+
+    def add_alert_listener(self, callback):
+        """Call callback(category, message) when a collector raises an alert"""
+        self.alert_listeners.append(callback)
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self):
+        """Start one sampling thread per collector"""
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._threads = []
+        for collector in self.collectors:
+            thread = Thread(target=self._run_collector, args=(collector,), name=f"metrics-{collector.name}")
+            thread.daemon = True
+            self._threads.append(thread)
+            thread.start()
+
+    def stop(self, timeout=2.0):
+        """Stop sampling and wait briefly for the threads to finish"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def sample(self, collector):
+        """Take one sample from a collector and deliver it"""
+        record = {'timestamp': time.time(), 'source': collector.name}
+        values = collector.collect()
+        record.update(values)
+        for callback in self.listeners:
+            callback(record)
+        for category, message in collector.alerts(values):
+            for callback in self.alert_listeners:
+                callback(category, message)
+        return record
+
+    def _run_collector(self, collector):
+        """Sample a collector at a fixed rate until stopped"""
+        if self._stop_event.wait(collector.initial_delay):
+            return
+        next_time = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self.sample(collector)
+            except Exception as e:
+                self.error_count += 1
+                print(f"Error in {collector.name} collector: {str(e)}", file=sys.stderr)
+
+            # Keep a steady rate without drifting; skip ticks we fell behind on
+            next_time += collector.interval
+            delay = next_time - time.monotonic()
+            if delay < 0:
+                next_time = time.monotonic()
+                delay = 0
+            self._stop_event.wait(delay)
+
+
+class JsonLinesFormat:
+    """One JSON object per line"""
+    header = None
+
+    def format(self, record):
+        return json.dumps(record, separators=(',', ':')) + "\n"
+
+
+class CsvFormat:
+    """One CSV row per record with a fixed set of columns"""
+
+    def __init__(self, collectors):
+        self.fields = ['timestamp', 'source']
+        for collector in collectors:
+            self.fields.extend(field for field in collector.fields if field not in self.fields)
+        self.header = self._row(self.fields)
+
+    def format(self, record):
+        return self._row([record.get(field, "") for field in self.fields])
+
+    def _row(self, values):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(values)
+        return buffer.getvalue()
+
+
+class StreamSink:
+    """Write formatted records to an open text stream"""
+
+    def __init__(self, stream, header=None):
+        self.stream = stream
+        self.lock = threading.Lock()
+        if header:
+            stream.write(header)
+
+    def write(self, line):
+        with self.lock:
+            self.stream.write(line)
+            self.stream.flush()
+
+    def close(self):
+        with self.lock:
+            self.stream.flush()
+
+
+class RotatingFileSink:
+    """Write formatted records to a file, rotating it once it reaches max_bytes
+
+    Rotated files are renamed to path.1, path.2, ... and the oldest beyond
+    backup_count is dropped. Every new file starts with the header (CSV).
+    """
+
+    def __init__(self, path, header=None, max_bytes=10 * 1024 * 1024, backup_count=5):
+        self.path = path
+        self.header = header
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.lock = threading.Lock()
+        self.file = None
+        self._open()
+
+    def write(self, line):
+        with self.lock:
+            if self.max_bytes and self.file.tell() + len(line) > self.max_bytes:
+                self._rotate()
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, 'a', encoding='utf-8', newline='')
+        if self.header and self.file.tell() == 0:
+            self.file.write(self.header)
+
+    def _rotate(self):
+        self.file.close()
+        if self.backup_count > 0:
+            for index in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._open()
+
+
+def parse_args(argv=None):
+    """Parse the command line of the metrics daemon"""
+    parser = argparse.ArgumentParser(description="Collect system metrics without the GUI")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Seconds between system samples (default: 1)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl",
+                        help="Output format (default: jsonl)")
+    parser.add_argument("--output", default="-",
+                        help="Output file, rotated when it grows too large (default: stdout)")
+    parser.add_argument("--max-bytes", type=int, default=10 * 1024 * 1024,
+                        help="Rotate the output file at this size (default: 10 MB, 0 disables)")
+    parser.add_argument("--backups", type=int, default=5,
+                        help="Number of rotated files to keep (default: 5)")
+    parser.add_argument("--count", type=int, default=0,
+                        help="Stop after this many system samples (default: run until interrupted)")
+    parser.add_argument("--collectors", default="system,network,throughput,hyperv",
+                        help="Comma separated collectors to run (default: system,network,throughput,hyperv)")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Don't print alerts to stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_args(argv)
+
+    sampler = SystemSampler()
+    available = {
+        'system': lambda: SystemCollector(interval=args.interval, sampler=sampler),
+        'network': lambda: NetworkActivityCollector(sampler=sampler),
+        'throughput': ThroughputCollector,
+        'hyperv': HyperVCollector,
+    }
+    collectors = []
+    for name in args.collectors.split(","):
+        name = name.strip()
+        if name not in available:
+            print(f"Unknown collector: {name}", file=sys.stderr)
+            return 2
+        collectors.append(available[name]())
+
+    engine = MetricsEngine(collectors)
+    output_format = CsvFormat(engine.collectors) if args.format == "csv" else JsonLinesFormat()
+    if args.output == "-":
+        sink = StreamSink(sys.stdout, output_format.header)
+    else:
+        sink = RotatingFileSink(args.output, output_format.header, args.max_bytes, args.backups)
+
+    finished = threading.Event()
+    system_samples = [0]
+
+    def write_record(record):
+        sink.write(output_format.format(record))
+        if record['source'] == 'system':
+            system_samples[0] += 1
+            if args.count and system_samples[0] >= args.count:
+                finished.set()
+
+    engine.add_listener(write_record)
+    if not args.quiet:
+        engine.add_alert_listener(lambda category, message: print(f"[{category}] {message}", file=sys.stderr))
+
+    engine.start()
+    try:
+        # Wake up regularly so Ctrl+C is handled promptly on Windows
+        while not finished.wait(0.5):
+            if not engine.running:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.stop()
+        sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
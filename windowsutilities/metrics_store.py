@@ -0,0 +1,262 @@
+import time
+import threading
+from array import array
+
+
+class RingBuffer:
+    """Fixed-capacity ring buffer of floats backed by array('d')
+
+    Every value is written twice, at its slot and at slot + capacity. That
+    keeps the most recent samples contiguous in memory, so window() can hand
+    out a zero-copy memoryview of any trailing range without unwrapping.
+    Appends are O(1) and memory use never grows after construction.
+    """
+
+    def __init__(self, capacity):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._data = array('d', bytes(16 * capacity))  # 2 * capacity doubles
+        self._view = memoryview(self._data)
+        self._head = 0   # Slot of the next write
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        """Add a value, overwriting the oldest one when full"""
+        head = self._head
+        self._data[head] = value
+        self._data[head + self.capacity] = value
+        self._head = head + 1 if head + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+
+    def last(self, default=0.0):
+        """Return the most recent value"""
+        if not self._count:
+            return default
+        return self._data[self._head + self.capacity - 1]
+
+    def window(self, count=None):
+        """Return a zero-copy view of the last count values (oldest first)
+
+        The view is live: it reads the buffer directly, so copy it (list() or
+        numpy.array()) if it has to stay stable while new samples arrive.
+        """
+        if count is None or count > self._count:
+            count = self._count
+        end = self._head + self.capacity
+        return self._view[end - count:end]
+
+    def clear(self):
+        """Drop all values"""
+        self._head = 0
+        self._count = 0
+
+
+class MetricsStore:
+    """Named ring buffers that share one timestamp per sample"""
+
+    def __init__(self, series, capacity):
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.times = RingBuffer(capacity)
+        self.series = {name: RingBuffer(capacity) for name in series}
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, name):
+        return self.series[name]
+
+    def append(self, timestamp=None, **values):
+        """Record one sample; series missing from values get NaN so charts show a gap"""
+        with self.lock:
+            self.times.append(time.time() if timestamp is None else timestamp)
+            for name, buffer in self.series.items():
+                buffer.append(values.get(name, float('nan')))
+
+    def window(self, name, count=None):
+        """Return a zero-copy view of the last count values of a series"""
+        return self.series[name].window(count)
+
+    def latest(self, name, default=0.0):
+        """Return the most recent value of a series"""
+        return self.series[name].last(default)
+
+    def clear(self):
+        """Drop all samples"""
+        with self.lock:
+            self.times.clear()
+            for buffer in self.series.values():
+                buffer.clear()
+
+
+class RollupTier:
+    """Min/avg/max rollups of every series at one fixed resolution"""
+
+    def __init__(self, series, resolution, retention):
+        self.resolution = resolution
+        self.retention = retention
+        self.capacity = max(1, int(retention // resolution))
+        self.times = RingBuffer(self.capacity)
+        self.mins = {name: RingBuffer(self.capacity) for name in series}
+        self.avgs = {name: RingBuffer(self.capacity) for name in series}
+        self.maxs = {name: RingBuffer(self.capacity) for name in series}
+
+        # Accumulators of the bucket that is still filling up
+        self.bucket_start = None
+        self.counts = dict.fromkeys(series, 0)
+        self.sums = dict.fromkeys(series, 0.0)
+        self.lows = dict.fromkeys(series, float('inf'))
+        self.highs = dict.fromkeys(series, float('-inf'))
+
+    def __len__(self):
+        return len(self.times)
+
+    def add(self, timestamp, values):
+        """Fold one raw sample into the current bucket, closing it when the bucket changes"""
+        bucket_start = timestamp - (timestamp % self.resolution)
+        if self.bucket_start is not None and bucket_start != self.bucket_start:
+            self.flush()
+        self.bucket_start = bucket_start
+
+        for name, value in values.items():
+            if name not in self.counts or value != value:  # Skip unknown series and NaN
+                continue
+            self.counts[name] += 1
+            self.sums[name] += value
+            if value < self.lows[name]:
+                self.lows[name] = value
+            if value > self.highs[name]:
+                self.highs[name] = value
+
+    def flush(self):
+        """Append the current bucket to the rollup buffers"""
+        if self.bucket_start is None:
+            return
+        nan = float('nan')
+        self.times.append(self.bucket_start)
+        for name, count in self.counts.items():
+            if count:
+                self.mins[name].append(self.lows[name])
+                self.avgs[name].append(self.sums[name] / count)
+                self.maxs[name].append(self.highs[name])
+            else:
+                self.mins[name].append(nan)
+                self.avgs[name].append(nan)
+                self.maxs[name].append(nan)
+            self.counts[name] = 0
+            self.sums[name] = 0.0
+            self.lows[name] = float('inf')
+            self.highs[name] = float('-inf')
+        self.bucket_start = None
+
+    def memory_bytes(self):
+        """Bytes used by the buffers of this tier"""
+        buffers = 1 + 3 * len(self.avgs)
+        return buffers * 16 * self.capacity
+
+
+class TieredMetricsStore:
+    """Raw samples for a short period plus min/avg/max rollups for longer ones
+
+    The default tiers keep raw one-second samples for 10 minutes, 10 second
+    rollups for 24 hours and one minute rollups for 30 days. Rollups are
+    updated as each sample arrives, and every tier is a set of preallocated
+    ring buffers, so memory use is fixed when the store is created (see
+    memory_bytes()).
+    """
+
+    DEFAULT_TIERS = (
+        (1, 10 * 60),             # Raw samples for 10 minutes
+        (10, 24 * 60 * 60),       # 10 second rollups for 24 hours
+        (60, 30 * 24 * 60 * 60),  # 1 minute rollups for 30 days
+    )
+
+    def __init__(self, series, tiers=DEFAULT_TIERS):
+        raw_resolution, raw_retention = tiers[0]
+        self.raw_resolution = raw_resolution
+        self.raw_retention = raw_retention
+        self.raw = MetricsStore(series, max(1, int(raw_retention // raw_resolution)))
+        self.lock = self.raw.lock
+        self.rollups = [RollupTier(series, resolution, retention) for resolution, retention in tiers[1:]]
+
+    def __len__(self):
+        return len(self.raw)
+
+    def __getitem__(self, name):
+        return self.raw[name]
+
+    @property
+    def times(self):
+        return self.raw.times
+
+    def append(self, timestamp=None, **values):
+        """Record one raw sample and fold it into every rollup tier"""
+        if timestamp is None:
+            timestamp = time.time()
+        self.raw.append(timestamp, **values)
+        with self.lock:
+            for tier in self.rollups:
+                tier.add(timestamp, values)
+
+    def window(self, name, count=None):
+        """Return a zero-copy view of the last count raw values of a series"""
+        return self.raw.window(name, count)
+
+    def latest(self, name, default=0.0):
+        """Return the most recent raw value of a series"""
+        return self.raw.latest(name, default)
+
+    def tier_for(self, window_seconds):
+        """Return the resolution (in seconds) of the finest tier that covers the window"""
+        if window_seconds <= self.raw_retention:
+            return self.raw_resolution
+        for tier in self.rollups:
+            if window_seconds <= tier.retention:
+                return tier.resolution
+        return self.rollups[-1].resolution if self.rollups else self.raw_resolution
+
+    def query(self, name, window_seconds):
+        """Return (times, mins, avgs, maxs) arrays covering the last window_seconds
+
+        The finest tier that still covers the window is used. For the raw tier
+        min, avg and max are the same array. The arrays are copies (array('d')),
+        so they stay stable while samples arrive and can go straight to
+        matplotlib, which can't take the buffers' memoryviews.
+        """
+        resolution = self.tier_for(window_seconds)
+        count = int(-(-window_seconds // resolution))  # Round up
+        # Copy under the lock so times and values line up
+        with self.lock:
+            if resolution == self.raw_resolution:
+                values = array('d', self.raw.window(name, count))
+                return array('d', self.raw.times.window(count)), values, values, values
+            for tier in self.rollups:
+                if tier.resolution == resolution:
+                    return (array('d', tier.times.window(count)), array('d', tier.mins[name].window(count)),
+                            array('d', tier.avgs[name].window(count)), array('d', tier.maxs[name].window(count)))
+
+    def memory_bytes(self):
+        """Total bytes held by all tiers (fixed for the life of the store)"""
+        raw_buffers = 1 + len(self.raw.series)
+        total = raw_buffers * 16 * self.raw.capacity
+        for tier in self.rollups:
+            total += tier.memory_bytes()
+        return total
+
+    def clear(self):
+        """Drop all samples and rollups"""
+        with self.lock:
+            self.raw.times.clear()
+            for buffer in self.raw.series.values():
+                buffer.clear()
+            for tier in self.rollups:
+                tier.bucket_start = None
+                tier.times.clear()
+                for buffers in (tier.mins, tier.avgs, tier.maxs):
+                    for buffer in buffers.values():
+                        buffer.clear()
@@ -0,0 +1,348 @@
+"""Ping, traceroute and DNS lookups across many hosts at once
+
+ProbeEngine runs one command per host (ping, tracert/traceroute or
+nslookup) with at most `concurrency` running together on an asyncio event
+loop. Every output line is handed to on_line as soon as the command prints
+it and parsed as it arrives, so a summary row (min/avg/max/loss) is ready
+the moment a host finishes. Commands go through a runner: SubprocessRunner
+starts the real tools, FakeCommandRunner replays canned output so the
+engine runs anywhere:
+
+    python network_probe.py --fake --hosts 50 example.com
+"""
+import re
+import sys
+import time
+import random
+import asyncio
+import argparse
+import subprocess
+
+
+PING = 'ping'
+TRACEROUTE = 'traceroute'
+DNS = 'dns'
+TOOLS = (PING, TRACEROUTE, DNS)
+
+# A round trip time in ping and traceroute output: "time=14ms", "time<1ms", "14.2 ms"
+_PING_TIME = re.compile(r"time[=<]\s*([\d.]+)\s*ms", re.IGNORECASE)
+_HOP_TIME = re.compile(r"<?([\d.]+)\s*ms")
+_HOP_LINE = re.compile(r"^\s*(\d+)\s+(.*)$")
+_PING_SENT = re.compile(r"Sent = (\d+)|(\d+) packets transmitted")
+_IP_ADDRESS = re.compile(r"^[0-9a-fA-F:.]+$")
+
+
+def build_command(tool, host, count=4):
+    """Return the command line that probes host with tool on this platform"""
+    windows = sys.platform == "win32"
+    if tool == PING:
+        return ["ping", "-n" if windows else "-c", str(count), host]
+    if tool == TRACEROUTE:
+        # -d skips the reverse lookup of every hop, which is most of tracert's time
+        return ["tracert", "-d", host] if windows else ["traceroute", "-n", host]
+    if tool == DNS:
+        return ["nslookup", host]
+    raise ValueError(f"Unknown probe tool: {tool}")
+
+
+class ProbeResult:
+    """Output and parsed summary of probing one host"""
+
+    def __init__(self, host, tool, count=4):
+        self.host = host
+        self.tool = tool
+        self.lines = []
+        self.sent = count if tool == PING else 0
+        self.times = []         # Round trip times in ms (ping replies, final traceroute hop)
+        self.hops = 0
+        self.addresses = []     # DNS answers
+        self.returncode = None
+        self.error = None
+        self.elapsed = 0.0
+        self._in_answer = False
+
+    @property
+    def received(self):
+        return len(self.times)
+
+    @property
+    def loss(self):
+        """Lost share of the probes in percent, or None when nothing was sent"""
+        if self.tool == DNS:
+            return 0.0 if self.addresses else 100.0
+        if not self.sent:
+            return None
+        return max(0.0, 100.0 * (self.sent - self.received) / self.sent)
+
+    @property
+    def min(self):
+        return min(self.times) if self.times else None
+
+    @property
+    def max(self):
+        return max(self.times) if self.times else None
+
+    @property
+    def avg(self):
+        return sum(self.times) / len(self.times) if self.times else None
+
+    def feed(self, line):
+        """Parse one output line"""
+        self.lines.append(line)
+        if self.tool == PING:
+            self._feed_ping(line)
+        elif self.tool == TRACEROUTE:
+            self._feed_traceroute(line)
+        else:
+            self._feed_dns(line)
+
+    def _feed_ping(self, line):
+        if "ttl=" in line.lower():
+            match = _PING_TIME.search(line)
+            if match:
+                self.times.append(float(match.group(1)))
+            return
+        match = _PING_SENT.search(line)
+        if match:
+            self.sent = int(match.group(1) or match.group(2))
+
+    def _feed_traceroute(self, line):
+        match = _HOP_LINE.match(line)
+        if not match:
+            return
+        # Only the last hop reached counts for the round trip and loss
+        rest = match.group(2)
+        self.hops = int(match.group(1))
+        self.times = [float(value) for value in _HOP_TIME.findall(rest)]
+        self.sent = len(self.times) + rest.count("*")
+
+    def _feed_dns(self, line):
+        stripped = line.strip()
+        if stripped.startswith("Name:"):
+            self._in_answer = True
+        elif self._in_answer and (stripped.startswith("Address:") or stripped.startswith("Addresses:")):
+            value = stripped.split(":", 1)[1].strip()
+            if value:
+                self.addresses.append(value)
+        elif self._in_answer and _IP_ADDRESS.match(stripped) and line[:1].isspace():
+            # Further addresses are listed on indented lines of their own
+            self.addresses.append(stripped)
+        elif not stripped or stripped.startswith("Aliases:"):
+            self._in_answer = self._in_answer and bool(stripped)
+
+    def as_dict(self):
+        """Return the summary as a plain dictionary"""
+        return {
+            'host': self.host,
+            'tool': self.tool,
+            'sent': self.sent,
+            'received': self.received,
+            'loss': self.loss,
+            'min': self.min,
+            'avg': self.avg,
+            'max': self.max,
+            'hops': self.hops,
+            'addresses': list(self.addresses),
+            'returncode': self.returncode,
+            'error': self.error,
+            'elapsed': self.elapsed,
+        }
+
+
+class SubprocessRunner:
+    """Runs the real network tools, yielding their output line by line"""
+
+    async def run(self, command, on_line):
+        """Run command, call on_line(line) for each output line and return the exit code"""
+        kwargs = {}
+        if sys.platform == "win32":
+            kwargs['creationflags'] = subprocess.CREATE_NO_WINDOW
+        process = await asyncio.create_subprocess_exec(
+            *command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, **kwargs)
+        try:
+            while True:
+                line = await process.stdout.readline()
+                if not line:
+                    break
+                on_line(line.decode(errors='replace').rstrip("\r\n"))
+            return await process.wait()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+
+
+class FakeCommandRunner:
+    """Stands in for the network tools with generated Windows-style output
+
+    outputs can map a host to the exact lines to print; other hosts get
+    plausible output. Lines are printed line_delay seconds apart, like a
+    real ping. Hosts in unreachable time out.
+    """
+
+    def __init__(self, outputs=None, line_delay=0.01, unreachable=(), seed=None):
+        self.outputs = outputs or {}
+        self.line_delay = line_delay
+        self.unreachable = set(unreachable)
+        self.random = random.Random(seed)
+        self.commands = []
+
+    async def run(self, command, on_line):
+        self.commands.append(command)
+        host = command[-1]
+        lines = self.outputs.get(host) or self._generate(command, host)
+        for line in lines:
+            await asyncio.sleep(self.line_delay)
+            on_line(line)
+        return 1 if host in self.unreachable else 0
+
+    def _generate(self, command, host):
+        address = f"192.0.2.{sum(map(ord, host)) % 254 + 1}"
+        down = host in self.unreachable
+        if command[0] == "ping":
+            count = int(command[2])
+            lines = [f"Pinging {host} [{address}] with 32 bytes of data:"]
+            for _ in range(count):
+                lines.append("Request timed out." if down else
+                             f"Reply from {address}: bytes=32 time={self.random.randint(5, 80)}ms TTL=117")
+            lines += ["", f"Ping statistics for {address}:",
+                      f"    Packets: Sent = {count}, Received = {0 if down else count}, "
+                      f"Lost = {count if down else 0} ({100 if down else 0}% loss),"]
+            return lines
+        if command[0] in ("tracert", "traceroute"):
+            lines = [f"Tracing route to {host} [{address}]", "over a maximum of 30 hops:", ""]
+            hops = 3 + len(host) % 5
+            for hop in range(1, hops + 1):
+                if down and hop == hops:
+                    lines.append(f"{hop:>3}     *        *        *     Request timed out.")
+                else:
+                    times = "  ".join(f"{self.random.randint(1, 40):>4} ms" for _ in range(3))
+                    lines.append(f"{hop:>3}  {times}  10.0.{hop}.1")
+            lines += ["", "Trace complete."]
+            return lines
+        lines = ["Server:  fake.dns", "Address:  192.0.2.53", ""]
+        if down:
+            return lines + [f"*** fake.dns can't find {host}: Non-existent domain"]
+        return lines + ["Non-authoritative answer:", f"Name:    {host}", f"Address:  {address}"]
+
+
+class ProbeEngine:
+    """Probes many hosts concurrently and streams their output
+
+    on_line(host, line) and on_result(result) are called on the thread
+    running the engine, as lines arrive and as each host finishes.
+    """
+
+    def __init__(self, runner=None, concurrency=8, on_line=None, on_result=None, timeout=120.0):
+        self.runner = runner or SubprocessRunner()
+        self.concurrency = concurrency
+        self.on_line = on_line
+        self.on_result = on_result
+        self.timeout = timeout
+
+    def run(self, hosts, tool=PING, count=4):
+        """Probe every host and return their ProbeResults in host order (blocks)"""
+        return asyncio.run(self.probe_all(hosts, tool, count))
+
+    async def probe_all(self, hosts, tool=PING, count=4):
+        """Coroutine behind run()"""
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+        return await asyncio.gather(*(self._probe(host, tool, count, semaphore) for host in hosts))
+
+    async def _probe(self, host, tool, count, semaphore):
+        result = ProbeResult(host, tool, count)
+
+        def handle_line(line):
+            result.feed(line)
+            if self.on_line is not None:
+                self.on_line(host, line)
+
+        async with semaphore:
+            start_time = time.perf_counter()
+            try:
+                result.returncode = await asyncio.wait_for(
+                    self.runner.run(build_command(tool, host, count), handle_line), self.timeout)
+            except asyncio.TimeoutError:
+                result.error = "timed out"
+            except OSError as e:
+                result.error = str(e)
+            result.elapsed = time.perf_counter() - start_time
+
+        if tool == DNS and result.addresses:
+            # The lookup time is the only round trip a DNS query has
+            result.times = [result.elapsed * 1000]
+            result.sent = 1
+        if self.on_result is not None:
+            self.on_result(result)
+        return result
+
+
+def split_hosts(text):
+    """Split user input on commas, semicolons and whitespace, dropping duplicates"""
+    hosts = []
+    for host in re.split(r"[\s,;]+", text):
+        if host and host not in hosts:
+            hosts.append(host)
+    return hosts
+
+
+def format_summary(results):
+    """Return the results as the lines of a fixed-width summary table"""
+    def ms(value):
+        return "-" if value is None else f"{value:.0f}"
+
+    width = max([len("Host")] + [len(result.host) for result in results])
+    lines = [f"{'Host':<{width}}  {'Sent':>4}  {'Recv':>4}  {'Loss':>5}  {'Min':>5}  {'Avg':>5}  {'Max':>5}  Notes"]
+    for result in results:
+        loss = "-" if result.loss is None else f"{result.loss:.0f}%"
+        if result.error:
+            notes = result.error
+        elif result.tool == TRACEROUTE:
+            notes = f"{result.hops} hops"
+        elif result.tool == DNS:
+            notes = ", ".join(result.addresses) or "not found"
+        else:
+            notes = ""
+        lines.append(f"{result.host:<{width}}  {result.sent:>4}  {result.received:>4}  {loss:>5}  "
+                     f"{ms(result.min):>5}  {ms(result.avg):>5}  {ms(result.max):>5}  {notes}")
+    return lines
+
+
+def parse_args(argv=None):
+    """Parse the command line of the probe engine"""
+    parser = argparse.ArgumentParser(description="Ping, trace or look up many hosts concurrently")
+    parser.add_argument("hosts", nargs="+", help="Hosts to probe")
+    parser.add_argument("--tool", choices=TOOLS, default=PING,
+                        help="Probe to run (default: ping)")
+    parser.add_argument("--count", type=int, default=4,
+                        help="Pings per host (default: 4)")
+    parser.add_argument("--concurrency", type=int, default=8,
+                        help="Hosts probed at once (default: 8)")
+    parser.add_argument("--fake", action="store_true",
+                        help="Use generated output instead of the real tools")
+    parser.add_argument("--hosts", dest="copies", type=int, default=1,
+                        help="With --fake, probe this many numbered copies of each host")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_args(argv)
+    hosts = args.hosts
+    runner = None
+    if args.fake:
+        runner = FakeCommandRunner()
+        if args.copies > 1:
+            hosts = [f"{index}.{host}" for host in hosts for index in range(args.copies)]
+    engine = ProbeEngine(runner, concurrency=args.concurrency,
+                         on_line=lambda host, line: print(f"[{host}] {line}") if not args.fake else None)
+    start_time = time.perf_counter()
+    results = engine.run(hosts, args.tool, args.count)
+    for line in format_summary(results):
+        print(line)
+    print(f"{len(hosts)} hosts in {time.perf_counter() - start_time:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
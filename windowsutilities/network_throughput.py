@@ -0,0 +1,503 @@
+"""Per-interface and per-process network throughput
+
+ThroughputEngine turns the cumulative counters of
+psutil.net_io_counters(pernic=True) into bytes/s, packets/s, errors/s and
+drops/s for every interface, plus link utilization where the link speed
+is known, and keeps a bounded history of each interface's rate for
+sparklines. Every process_interval it also estimates per-process usage:
+processes that own established connections share the measured traffic in
+proportion to their own I/O counters over the same window (Windows has no
+per-process network counters, so this is an estimate, not a measurement).
+InterfaceTable and NetworkProcessTable are sortable views of the results
+in the style of ProcessTable. FakeNetworkSource stands in for psutil:
+
+    python network_throughput.py --fake --count 5
+"""
+import sys
+import time
+import socket
+import random
+import argparse
+from collections import deque, namedtuple
+
+import psutil
+
+from process_table import ProcessTableDiff, _format_size
+
+
+# Rates of one interface over the last sampling interval
+InterfaceRates = namedtuple('InterfaceRates', [
+    'name',
+    'address',         # First IPv4 address, or None
+    'recv_bps',
+    'sent_bps',
+    'packets_recv_ps',
+    'packets_sent_ps',
+    'errors_ps',       # Receive and send errors per second
+    'drops_ps',        # Dropped packets per second
+    'errors_total',    # Cumulative counts kept by the adapter
+    'drops_total',
+    'speed_mbps',      # Link speed, 0 when unknown
+    'utilization',     # Percent of the link in the busier direction, None when speed is unknown
+])
+
+# Estimated network usage of one process
+ProcessNetRates = namedtuple('ProcessNetRates', [
+    'pid',
+    'name',
+    'recv_bps',
+    'sent_bps',
+    'connections',     # Established connections owned by the process
+])
+
+# Everything the engine measured in one sample
+ThroughputSample = namedtuple('ThroughputSample', [
+    'timestamp',
+    'interfaces',      # Tuple of InterfaceRates
+    'processes',       # Tuple of ProcessNetRates (refreshed every process_interval) or None
+    'recv_bps',        # Totals over the interfaces
+    'sent_bps',
+    'packets_recv_ps',
+    'packets_sent_ps',
+    'errors_ps',
+    'drops_ps',
+    'utilization',     # Percent of the combined link capacity, None when no speed is known
+    'connections',     # Established connections, None until the first process pass
+])
+
+# Key of the summed history
+TOTAL = '__total__'
+
+SPARK_BLOCKS = "▁▂▃▄▅▆▇█"
+
+
+def _is_loopback(name):
+    return name == "lo" or name.lower().startswith("loopback")
+
+
+class PsutilSource:
+    """Reads interface counters, link details, connections and process I/O from psutil"""
+
+    def nic_counters(self):
+        return psutil.net_io_counters(pernic=True)
+
+    def link_info(self):
+        """Return {interface: (speed_mbps, ipv4 address or None)} for interfaces that are up"""
+        addresses = {}
+        for name, entries in psutil.net_if_addrs().items():
+            for entry in entries:
+                if entry.family == socket.AF_INET:
+                    addresses[name] = entry.address
+                    break
+        return {name: (stats.speed, addresses.get(name))
+                for name, stats in psutil.net_if_stats().items() if stats.isup}
+
+    def connection_owners(self):
+        """Return {pid: established connection count}"""
+        owners = {}
+        for connection in psutil.net_connections(kind='inet'):
+            if connection.status == psutil.CONN_ESTABLISHED and connection.pid:
+                owners[connection.pid] = owners.get(connection.pid, 0) + 1
+        return owners
+
+    def process_io(self, pids):
+        """Return {pid: (name, read_bytes, write_bytes, other_bytes)} for the pids that can be read"""
+        io = {}
+        for pid in pids:
+            try:
+                proc = psutil.Process(pid)
+                with proc.oneshot():
+                    counters = proc.io_counters()
+                    # other_bytes (Windows only) holds I/O that is neither file read nor write
+                    io[pid] = (proc.name(), counters.read_bytes, counters.write_bytes,
+                               getattr(counters, 'other_bytes', 0))
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess, AttributeError):
+                continue
+        return io
+
+
+class FakeNetworkSource:
+    """Generates plausible counters for a few interfaces and processes
+
+    Each call advances the counters by the time passed since the previous
+    one, so rates come out near the configured averages.
+    """
+
+    NicCounters = namedtuple('NicCounters', ['bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv',
+                                             'errin', 'errout', 'dropin', 'dropout'])
+
+    def __init__(self, interfaces=None, processes=None, seed=None):
+        # Interface -> (recv bytes/s, sent bytes/s, link Mbps, address)
+        self.interfaces = interfaces or {
+            'Ethernet': (2500000, 400000, 1000, "192.168.1.20"),
+            'Wi-Fi': (300000, 80000, 300, "192.168.1.21"),
+            'Loopback Pseudo-Interface 1': (50000, 50000, 0, "127.0.0.1"),
+        }
+        # Pid -> (name, connections, share of the traffic)
+        self.processes = processes or {
+            1200: ("chrome.exe", 14, 0.6),
+            2400: ("OneDrive.exe", 3, 0.3),
+            3600: ("svchost.exe", 6, 0.1),
+        }
+        self.random = random.Random(seed)
+        self._time = time.monotonic()
+        self._counters = {name: [0] * 8 for name in self.interfaces}
+        self._io = {pid: [0, 0, 0] for pid in self.processes}
+
+    def _advance(self):
+        now = time.monotonic()
+        elapsed = now - self._time
+        self._time = now
+        for name, (recv, sent, _, _) in self.interfaces.items():
+            counters = self._counters[name]
+            recv_bytes = int(recv * elapsed * self.random.uniform(0.5, 1.5))
+            sent_bytes = int(sent * elapsed * self.random.uniform(0.5, 1.5))
+            counters[0] += sent_bytes
+            counters[1] += recv_bytes
+            counters[2] += sent_bytes // 1200 + 1
+            counters[3] += recv_bytes // 1400 + 1
+            # An occasional bad packet keeps the error columns honest
+            counters[4] += self.random.random() < 0.1
+            counters[6] += self.random.random() < 0.2
+        total_recv = sum(recv for recv, _, _, _ in self.interfaces.values())
+        total_sent = sum(sent for _, sent, _, _ in self.interfaces.values())
+        for pid, (_, _, share) in self.processes.items():
+            io = self._io[pid]
+            io[0] += int(total_recv * share * elapsed)
+            io[1] += int(total_sent * share * elapsed)
+
+    def nic_counters(self):
+        self._advance()
+        return {name: self.NicCounters(*counters) for name, counters in self._counters.items()}
+
+    def link_info(self):
+        return {name: (speed, address) for name, (_, _, speed, address) in self.interfaces.items()}
+
+    def connection_owners(self):
+        return {pid: connections for pid, (_, connections, _) in self.processes.items()}
+
+    def process_io(self, pids):
+        return {pid: (self.processes[pid][0],) + tuple(self._io[pid]) for pid in pids if pid in self.processes}
+
+
+class ThroughputEngine:
+    """Samples network counters into rates, with a bounded history per interface
+
+    sample() is meant to run on a collector thread; latest and history()
+    are safe to read from the UI thread (each sample is published with a
+    single reference swap and deques are appended atomically).
+    """
+
+    def __init__(self, history=60, process_interval=5.0, link_interval=30.0,
+                 include_processes=True, include_loopback=False, source=None):
+        self.history_length = history
+        self.process_interval = process_interval
+        self.link_interval = link_interval
+        self.include_processes = include_processes
+        self.include_loopback = include_loopback
+        self.source = source or PsutilSource()
+        self.latest = None
+        self._history = {}              # Interface (or TOTAL) -> deque of recv + sent bytes/s
+        self._prev = None               # (time, counters) of the previous sample
+        self._links = {}
+        self._last_link_time = None
+        self._processes = None
+        self._connections = None
+        self._last_process_time = None
+        self._process_prev = None       # (time, total recv bytes, total sent bytes, {pid: io})
+
+    def sample(self):
+        """Read the counters once and return (and publish) a ThroughputSample"""
+        now = time.monotonic()
+        counters = {name: value for name, value in self.source.nic_counters().items()
+                    if self.include_loopback or not _is_loopback(name)}
+        if self._last_link_time is None or now - self._last_link_time >= self.link_interval:
+            # Link speed and addresses barely change, so they are read far less often
+            self._links = self.source.link_info()
+            self._last_link_time = now
+
+        interfaces = []
+        if self._prev is not None:
+            elapsed = max(now - self._prev[0], 1e-6)
+            previous = self._prev[1]
+            for name in sorted(counters):
+                if name in previous:
+                    interfaces.append(self._rates(name, counters[name], previous[name], elapsed))
+        self._prev = (now, counters)
+
+        if self.include_processes and (self._last_process_time is None
+                                       or now - self._last_process_time >= self.process_interval):
+            self._sample_processes(now, counters)
+            self._last_process_time = now
+
+        sample = self._totals(time.time(), tuple(interfaces))
+        for rates in interfaces:
+            self._remember(rates.name, rates.recv_bps + rates.sent_bps)
+        if interfaces:
+            self._remember(TOTAL, sample.recv_bps + sample.sent_bps)
+        self.latest = sample
+        return sample
+
+    def history(self, name=TOTAL):
+        """Return the recent recv + sent bytes/s of an interface (or the total), oldest first"""
+        return list(self._history.get(name, ()))
+
+    def _remember(self, name, value):
+        values = self._history.get(name)
+        if values is None:
+            values = self._history[name] = deque(maxlen=self.history_length)
+        values.append(value)
+
+    def _rates(self, name, current, previous, elapsed):
+        def rate(field):
+            # Counters restart when an adapter is reset; count that interval as idle
+            return max(0, getattr(current, field) - getattr(previous, field)) / elapsed
+
+        recv_bps = rate('bytes_recv')
+        sent_bps = rate('bytes_sent')
+        speed, address = self._links.get(name, (0, None))
+        utilization = None
+        if speed:
+            # Links are full duplex, so the busier direction is what fills it
+            utilization = min(100.0, max(recv_bps, sent_bps) * 8 / (speed * 1e6) * 100)
+        return InterfaceRates(
+            name, address, recv_bps, sent_bps,
+            rate('packets_recv'), rate('packets_sent'),
+            rate('errin') + rate('errout'), rate('dropin') + rate('dropout'),
+            current.errin + current.errout, current.dropin + current.dropout,
+            speed, utilization)
+
+    def _totals(self, timestamp, interfaces):
+        recv_bps = sum(rates.recv_bps for rates in interfaces)
+        sent_bps = sum(rates.sent_bps for rates in interfaces)
+        measured = [rates for rates in interfaces if rates.speed_mbps]
+        utilization = None
+        if measured:
+            capacity = sum(rates.speed_mbps for rates in measured) * 1e6
+            busiest = max(sum(rates.recv_bps for rates in measured), sum(rates.sent_bps for rates in measured))
+            utilization = min(100.0, busiest * 8 / capacity * 100)
+        return ThroughputSample(
+            timestamp, interfaces, self._processes, recv_bps, sent_bps,
+            sum(rates.packets_recv_ps for rates in interfaces),
+            sum(rates.packets_sent_ps for rates in interfaces),
+            sum(rates.errors_ps for rates in interfaces),
+            sum(rates.drops_ps for rates in interfaces),
+            utilization, self._connections)
+
+    def _sample_processes(self, now, counters):
+        """Share the traffic since the previous pass among the processes owning connections"""
+        owners = self.source.connection_owners()
+        io = self.source.process_io(owners)
+        total_recv = sum(value.bytes_recv for value in counters.values())
+        total_sent = sum(value.bytes_sent for value in counters.values())
+        self._connections = sum(owners.values())
+
+        previous = self._process_prev
+        self._process_prev = (now, total_recv, total_sent, io)
+        if previous is None:
+            return
+        elapsed = max(now - previous[0], 1e-6)
+        recv_bps = max(0, total_recv - previous[1]) / elapsed
+        sent_bps = max(0, total_sent - previous[2]) / elapsed
+
+        # Reads (plus half of the other I/O) weigh towards received traffic, writes towards sent
+        recv_weights = {}
+        sent_weights = {}
+        for pid, (name, read_bytes, write_bytes, other_bytes) in io.items():
+            before = previous[3].get(pid)
+            if before is None or before[0] != name:
+                continue
+            other = max(0, other_bytes - before[3]) / 2
+            recv_weights[pid] = max(0, read_bytes - before[1]) + other
+            sent_weights[pid] = max(0, write_bytes - before[2]) + other
+
+        recv_shares = self._shares(recv_weights, owners)
+        sent_shares = self._shares(sent_weights, owners)
+        processes = []
+        for pid in recv_weights:
+            processes.append(ProcessNetRates(pid, io[pid][0], recv_bps * recv_shares.get(pid, 0.0),
+                                             sent_bps * sent_shares.get(pid, 0.0), owners.get(pid, 0)))
+        self._processes = tuple(processes)
+
+    @staticmethod
+    def _shares(weights, owners):
+        """Normalize weights; without any I/O to go on, split by connection count"""
+        total = sum(weights.values())
+        if not total:
+            weights = {pid: owners.get(pid, 0) for pid in weights}
+            total = sum(weights.values())
+        return {pid: weight / total for pid, weight in weights.items()} if total else {}
+
+
+def sparkline(values, width=None):
+    """Draw values as a row of block characters scaled to their maximum"""
+    values = list(values)[-width:] if width else list(values)
+    if not values:
+        return ""
+    peak = max(values)
+    if peak <= 0:
+        return SPARK_BLOCKS[0] * len(values)
+    top = len(SPARK_BLOCKS) - 1
+    return "".join(SPARK_BLOCKS[min(top, int(value / peak * top + 0.5))] for value in values)
+
+
+def format_rate(value, format_size=_format_size):
+    return f"{format_size(value)}/s"
+
+
+class _RateTable:
+    """Sortable table of rate rows that reports only what changed, like ProcessTable
+
+    key maps an item to its row key and row_values to its displayed values,
+    in COLUMNS order.
+    """
+
+    COLUMNS = ()
+    SORT_KEYS = {}
+
+    def __init__(self, key, row_values, limit=None, sort_by=None, format_size=None):
+        self.key = key
+        self.row_values = row_values
+        self.limit = limit
+        self.sort_by = sort_by or self.COLUMNS[0]
+        self.format_size = format_size or _format_size
+        self.rows = {}
+        self.order = []
+        self._items = ()
+
+    def update(self, items):
+        """Take new items and return the view diff"""
+        self._items = tuple(items or ())
+        return self.refresh()
+
+    def refresh(self):
+        """Re-apply sorting and the row limit to the current items"""
+        key_func, descending = self.SORT_KEYS[self.sort_by]
+        selected = sorted(self._items, key=key_func, reverse=descending)
+        if self.limit is not None:
+            selected = selected[:self.limit]
+
+        new_rows = {}
+        order = []
+        for item in selected:
+            key = self.key(item)
+            new_rows[key] = self.row_values(item)
+            order.append(key)
+
+        removed = [key for key in self.rows if key not in new_rows]
+        inserted = {}
+        changed = {}
+        for key, values in new_rows.items():
+            old_values = self.rows.get(key)
+            if old_values is None:
+                inserted[key] = values
+            elif old_values != values:
+                changed[key] = {column: value
+                                for column, value, old_value in zip(self.COLUMNS, values, old_values)
+                                if value != old_value}
+        self.rows = new_rows
+        self.order = order
+        return ProcessTableDiff(removed, inserted, changed, order)
+
+
+class InterfaceTable(_RateTable):
+    """Per-interface rates with a sparkline of recent throughput"""
+
+    COLUMNS = ('interface', 'recv', 'sent', 'packets', 'errors', 'drops', 'trend')
+
+    SORT_KEYS = {
+        'interface': (lambda rates: rates.name.lower(), False),
+        'recv': (lambda rates: rates.recv_bps, True),
+        'sent': (lambda rates: rates.sent_bps, True),
+        'packets': (lambda rates: rates.packets_recv_ps + rates.packets_sent_ps, True),
+        'errors': (lambda rates: (rates.errors_ps, rates.errors_total), True),
+        'drops': (lambda rates: (rates.drops_ps, rates.drops_total), True),
+        'trend': (lambda rates: rates.recv_bps + rates.sent_bps, True),
+    }
+
+    def __init__(self, engine, limit=None, sort_by='recv', format_size=None, trend_width=20):
+        super().__init__(lambda rates: rates.name, self._format_row, limit, sort_by, format_size)
+        self.engine = engine
+        self.trend_width = trend_width
+
+    def _format_row(self, rates):
+        return (
+            rates.name,
+            format_rate(rates.recv_bps, self.format_size),
+            format_rate(rates.sent_bps, self.format_size),
+            f"{rates.packets_recv_ps:.0f}/{rates.packets_sent_ps:.0f}",
+            f"{rates.errors_total}" + (f" (+{rates.errors_ps:.1f}/s)" if rates.errors_ps else ""),
+            f"{rates.drops_total}" + (f" (+{rates.drops_ps:.1f}/s)" if rates.drops_ps else ""),
+            sparkline(self.engine.history(rates.name), self.trend_width),
+        )
+
+
+class NetworkProcessTable(_RateTable):
+    """Estimated per-process network usage"""
+
+    COLUMNS = ('name', 'pid', 'recv', 'sent', 'connections')
+
+    SORT_KEYS = {
+        'name': (lambda proc: proc.name.lower(), False),
+        'pid': (lambda proc: proc.pid, False),
+        'recv': (lambda proc: proc.recv_bps, True),
+        'sent': (lambda proc: proc.sent_bps, True),
+        'connections': (lambda proc: proc.connections, True),
+    }
+
+    def __init__(self, limit=10, sort_by='recv', format_size=None):
+        super().__init__(lambda proc: proc.pid, self._format_row, limit, sort_by, format_size)
+
+    def _format_row(self, proc):
+        return (
+            proc.name,
+            str(proc.pid),
+            format_rate(proc.recv_bps, self.format_size),
+            format_rate(proc.sent_bps, self.format_size),
+            str(proc.connections),
+        )
+
+
+def format_sample(engine, sample):
+    """Return a sample as text lines: totals, interfaces and top processes"""
+    lines = [f"Total: {format_rate(sample.recv_bps)} down, {format_rate(sample.sent_bps)} up  "
+             f"{sparkline(engine.history(), 30)}"]
+    for rates in sample.interfaces:
+        utilization = "" if rates.utilization is None else f", {rates.utilization:.1f}% of {rates.speed_mbps} Mbps"
+        lines.append(f"  {rates.name}: {format_rate(rates.recv_bps)} down, {format_rate(rates.sent_bps)} up, "
+                     f"{rates.packets_recv_ps:.0f}/{rates.packets_sent_ps:.0f} pkt/s, "
+                     f"{rates.errors_total} errors, {rates.drops_total} drops{utilization}")
+    for proc in sorted(sample.processes or (), key=lambda proc: proc.recv_bps + proc.sent_bps, reverse=True):
+        lines.append(f"  [{proc.pid}] {proc.name}: ~{format_rate(proc.recv_bps)} down, "
+                     f"~{format_rate(proc.sent_bps)} up, {proc.connections} connections")
+    return lines
+
+
+def parse_args(argv=None):
+    """Parse the command line of the throughput engine"""
+    parser = argparse.ArgumentParser(description="Show per-interface and per-process network throughput")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="Seconds between samples (default: 1)")
+    parser.add_argument("--count", type=int, default=10,
+                        help="Samples to take (default: 10)")
+    parser.add_argument("--fake", action="store_true",
+                        help="Use generated counters instead of psutil")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_args(argv)
+    engine = ThroughputEngine(process_interval=args.interval * 2,
+                              source=FakeNetworkSource() if args.fake else None)
+    engine.sample()
+    for _ in range(args.count):
+        time.sleep(args.interval)
+        for line in format_sample(engine, engine.sample()):
+            print(line)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+import sys
+import json
+import queue
+import base64
+import threading
+import subprocess
+from threading import Thread
+
+
+# Prefix of protocol lines, so anything a script writes straight to the
+# console (Write-Host and friends) can be told apart from responses
+RESPONSE_MARKER = "\x1ePSPOOL "
+
+# Host loop run by every worker: one JSON request per stdin line, one JSON
+# response per stdout line. Scripts are base64 encoded so they can span lines.
+HOST_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+$ProgressPreference = 'SilentlyContinue'
+# UTF8Encoding without a byte order mark; [Text.Encoding]::UTF8 would write one
+[Console]::OutputEncoding = New-Object Text.UTF8Encoding $false
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($line -eq $null) { break }
+    if (-not $line.Trim()) { continue }
+    $request = $line | ConvertFrom-Json
+    $response = @{ id = $request.id; ok = $true; output = @(); error = $null }
+    try {
+        $script = [Text.Encoding]::UTF8.GetString([Convert]::FromBase64String($request.script))
+        $response.output = @(& ([ScriptBlock]::Create($script)))
+    } catch {
+        $response.ok = $false
+        $response.error = $_.Exception.Message
+    }
+    [Console]::Out.WriteLine([char]0x1e + "PSPOOL " + ($response | ConvertTo-Json -Compress -Depth 4))
+    [Console]::Out.Flush()
+}
+"""
+
+
+class PowerShellError(Exception):
+    """A PowerShell request failed or the worker running it died"""
+
+
+class PowerShellTimeout(PowerShellError):
+    """A PowerShell request did not answer in time (its worker was restarted)"""
+
+
+def powershell_command():
+    """Command line that starts a PowerShell worker running the host loop"""
+    # -EncodedCommand avoids quoting the multi-line script on the command line
+    encoded = base64.b64encode(HOST_SCRIPT.encode('utf-16-le')).decode('ascii')
+    return ["powershell", "-NoLogo", "-NoProfile", "-NonInteractive",
+            "-ExecutionPolicy", "Bypass", "-EncodedCommand", encoded]
+
+
+def fake_shell_command():
+    """Command line of a Python stand-in that speaks the worker protocol
+
+    The stand-in echoes each script back as its output, which is enough to
+    exercise the pool on any platform. A few scripts act differently:
+    'sleep N' hangs for N seconds, 'throw MESSAGE' fails the request and
+    'exit' kills the worker.
+    """
+    return [sys.executable, "-u", __file__, "--fake-shell"]
+
+
+class PowerShellWorker:
+    """One long-lived PowerShell process"""
+
+    def __init__(self, command):
+        self.command = command
+        self._next_id = 0
+        self._responses = queue.Queue()
+        self._exited = False  # Set as soon as stdout closes or the worker is killed
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            bufsize=1,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        )
+        self._reader = Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+
+    @property
+    def alive(self):
+        # The process may linger briefly after closing stdout, so check both
+        return not self._exited and self.process.poll() is None
+
+    def request(self, script, timeout):
+        """Run a script and return its output list; raises PowerShellError"""
+        self._next_id += 1
+        request_id = self._next_id
+        line = json.dumps({'id': request_id,
+                           'script': base64.b64encode(script.encode('utf-8')).decode('ascii')})
+        try:
+            self.process.stdin.write(line + "\n")
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise PowerShellError(f"PowerShell worker is not running: {e}")
+
+        while True:
+            try:
+                response = self._responses.get(timeout=timeout)
+            except queue.Empty:
+                # A hung worker can't be trusted with the next request
+                self.kill()
+                raise PowerShellTimeout(f"PowerShell did not answer within {timeout} seconds")
+            if response is None:
+                raise PowerShellError("PowerShell worker exited unexpectedly")
+            # Skip late answers to requests that already timed out
+            if response.get('id') == request_id:
+                break
+
+        if not response.get('ok'):
+            raise PowerShellError(response.get('error') or "PowerShell command failed")
+        output = response.get('output')
+        if output is None:
+            return []
+        return output if isinstance(output, list) else [output]
+
+    def kill(self):
+        """Stop the worker process"""
+        self._exited = True
+        try:
+            self.process.kill()
+        except OSError:
+            pass
+
+    def close(self):
+        """Ask the worker to exit by closing its stdin, then make sure it does"""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+    def _read_responses(self):
+        """Collect responses from stdout until the worker exits"""
+        try:
+            for line in self.process.stdout:
+                # A stray byte order mark must not hide the first response
+                line = line.lstrip("\ufeff")
+                if not line.startswith(RESPONSE_MARKER):
+                    continue  # Console output of a script
+                try:
+                    self._responses.put(json.loads(line[len(RESPONSE_MARKER):]))
+                except ValueError:
+                    continue
+        except (OSError, ValueError):
+            pass
+        finally:
+            self._exited = True
+            self._responses.put(None)
+
+
+class PowerShellPool:
+    """Pool of long-lived PowerShell workers
+
+    Starting powershell.exe costs 0.5-2 seconds, so workers are started once
+    and fed scripts over stdin. Each request has its own timeout; a worker
+    that times out or dies is killed and replaced on its next use. Results
+    come back as parsed JSON (ConvertTo-Json on the PowerShell side).
+    """
+
+    def __init__(self, size=2, command=None):
+        self.size = size
+        self.command = command or powershell_command()
+        self.restarts = 0
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = []
+        self._closed = False
+        # Workers are started lazily, one slot per pool entry
+        for _ in range(size):
+            self._idle.put(None)
+
+    def run(self, script, timeout=10):
+        """Run a script on a free worker and return its output objects as a list"""
+        if self._closed:
+            raise PowerShellError("PowerShell pool is closed")
+        worker = self._idle.get()
+        try:
+            if worker is None or not worker.alive:
+                worker = self._start_worker(replacing=worker)
+            return worker.request(script, timeout)
+        finally:
+            # A dead worker keeps its slot and is replaced on the slot's next use
+            self._idle.put(worker)
+
+    def run_text(self, script, timeout=10):
+        """Run a script and return its output formatted as text, like powershell -Command"""
+        output = self.run("& {\n" + script + "\n} | Out-String -Width 1000", timeout)
+        return "".join(str(item) for item in output).strip()
+
+    def close(self):
+        """Stop every worker"""
+        self._closed = True
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.close()
+
+    def _start_worker(self, replacing=None):
+        """Start a worker, replacing a dead one if given"""
+        worker = PowerShellWorker(self.command)
+        with self._lock:
+            if replacing is not None:
+                self.restarts += 1
+                if replacing in self._workers:
+                    self._workers.remove(replacing)
+            self._workers.append(worker)
+        return worker
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_default_pool():
+    """Return the pool shared by the whole application"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = PowerShellPool()
+        return _default_pool
+
+
+def _fake_shell_main():
+    """Protocol stand-in used by fake_shell_command()"""
+    import time
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        script = base64.b64decode(request['script']).decode('utf-8')
+        response = {'id': request['id'], 'ok': True, 'output': [script], 'error': None}
+        command = script.strip()
+        # run_text wraps the script; look at the innermost command
+        if command.startswith("& {"):
+            command = command.split("\n")[1].strip()
+            response['output'] = [command + "\n"]
+        if command == "exit":
+            sys.exit(1)
+        elif command.startswith("sleep "):
+            time.sleep(float(command.split()[1]))
+        elif command.startswith("throw "):
+            response.update(ok=False, output=None, error=command[6:])
+        # Console output that is not a response, like Write-Host in a real script
+        print("noise written by the script")
+        print(RESPONSE_MARKER + json.dumps(response), flush=True)
+
+
+if __name__ == "__main__" and "--fake-shell" in sys.argv:
+    _fake_shell_main()
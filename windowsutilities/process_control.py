@@ -0,0 +1,137 @@
+"""Closing programs before their files are cleaned
+
+close_programs(["chrome.exe"]) finds every matching process and all of
+its descendants in a single psutil.process_iter() pass, asks them all to
+terminate at once, waits for them with psutil.wait_procs() and kills the
+ones still running after the timeout. Unlike "taskkill /F /IM" through
+os.system, it returns only once the processes are gone (so their files
+are no longer locked) and says which PIDs were freed.
+"""
+import os
+import time
+
+import psutil
+
+
+class TerminationResult:
+    """What closing a set of processes did, by PID"""
+
+    def __init__(self):
+        self.terminated = []    # Exited after terminate()
+        self.killed = []        # Needed kill()
+        self.survivors = []     # Still running after kill()
+        self.denied = []        # Not allowed to signal them
+        self.elapsed = 0.0
+
+    @property
+    def freed_pids(self):
+        """PIDs that are gone now"""
+        return self.terminated + self.killed
+
+    def as_dict(self):
+        """Return the result as a plain dictionary"""
+        return {
+            'terminated': list(self.terminated),
+            'killed': list(self.killed),
+            'survivors': list(self.survivors),
+            'denied': list(self.denied),
+            'elapsed': self.elapsed,
+        }
+
+
+def _image_name(name):
+    """Compare process names the same way on Windows (chrome.exe) and Linux (chrome)"""
+    name = name.lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+def find_process_trees(names=None, pids=None, include_children=True):
+    """Return the processes named in names or with a PID in pids, plus all their descendants
+
+    Parents and children are matched from one process_iter() pass instead
+    of a children() call per process. The calling process is never included.
+    With include_children=False only the matching processes themselves are
+    returned (Explorer is the parent of everything started from the shell).
+    """
+    wanted = {_image_name(name) for name in names or []}
+    root_pids = set(pids or [])
+    processes = {}
+    children = {}
+    create_times = {}
+    for proc in psutil.process_iter(['name', 'ppid', 'create_time']):
+        info = proc.info
+        processes[proc.pid] = proc
+        create_times[proc.pid] = info['create_time']
+        children.setdefault(info['ppid'], []).append(proc.pid)
+        if info['name'] and _image_name(info['name']) in wanted:
+            root_pids.add(proc.pid)
+
+    own_pid = os.getpid()
+    found = []
+    seen = set()
+    stack = list(root_pids)
+    while stack:
+        pid = stack.pop()
+        if pid in seen or pid == own_pid:
+            continue
+        seen.add(pid)
+        if pid in processes:
+            found.append(processes[pid])
+            if include_children:
+                stack.extend(_real_children(pid, children, create_times))
+    return found
+
+
+def _real_children(pid, children, create_times):
+    """Children of pid that started after it
+
+    Windows never clears the parent PID of an orphan and reuses PIDs, so a
+    process whose ppid matches but which is older than the parent belonged
+    to an earlier process with that PID (psutil's children() checks the same).
+    """
+    parent_time = create_times.get(pid)
+    return [child for child in children.get(pid, [])
+            if parent_time is None or create_times.get(child) is None or create_times[child] >= parent_time]
+
+
+def terminate_processes(processes, timeout=3.0, kill_timeout=2.0):
+    """Terminate processes together, wait up to timeout, then kill what is left"""
+    result = TerminationResult()
+    start_time = time.perf_counter()
+
+    # Signal everything first so the processes shut down concurrently
+    signalled = _signal(processes, 'terminate', result, result.terminated)
+    gone, alive = psutil.wait_procs(signalled, timeout=timeout)
+    result.terminated.extend(proc.pid for proc in gone)
+
+    if alive:
+        signalled = _signal(alive, 'kill', result, result.killed)
+        gone, alive = psutil.wait_procs(signalled, timeout=kill_timeout)
+        result.killed.extend(proc.pid for proc in gone)
+        result.survivors.extend(proc.pid for proc in alive)
+
+    result.elapsed = time.perf_counter() - start_time
+    return result
+
+
+def _signal(processes, method, result, already_gone):
+    """Call terminate() or kill() on each process; returns those that were signalled"""
+    signalled = []
+    for proc in processes:
+        try:
+            getattr(proc, method)()
+            signalled.append(proc)
+        except psutil.NoSuchProcess:
+            already_gone.append(proc.pid)
+        except psutil.AccessDenied:
+            result.denied.append(proc.pid)
+    return signalled
+
+
+def close_programs(names, timeout=3.0, kill_timeout=2.0, include_children=True):
+    """Close every process tree of the given programs and wait until they are gone
+
+    include_children=False closes only the named processes, leaving the
+    programs they started running.
+    """
+    return terminate_processes(find_process_trees(names, include_children=include_children), timeout, kill_timeout)
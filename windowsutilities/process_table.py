@@ -0,0 +1,152 @@
+import heapq
+from collections import namedtuple
+
+
+# Row changes needed to bring a view in line with the table
+ProcessTableDiff = namedtuple('ProcessTableDiff', [
+    'removed',    # pids whose rows should be deleted
+    'inserted',   # {pid: values} for new rows
+    'changed',    # {pid: {column: value}} for cells that differ
+    'order',      # pids in display order
+])
+
+
+class ProcessTable:
+    """Top-N process table built from SystemSampler snapshots
+
+    The table never calls psutil: it works on the process list the sampler
+    already gathered off the UI thread. The top rows are picked with a heap
+    (no full sort for a top-N view), rows are keyed by pid, and update()
+    returns only the rows and cells that changed since the previous call,
+    so a view can keep its rows (and the user's selection) in place.
+    """
+
+    COLUMNS = ('name', 'pid', 'cpu', 'memory', 'io')
+
+    # Sort keys and whether larger values come first
+    SORT_KEYS = {
+        'name': (lambda proc, io: proc.name.lower(), False),
+        'pid': (lambda proc, io: proc.pid, False),
+        'cpu': (lambda proc, io: proc.cpu_percent, True),
+        'memory': (lambda proc, io: proc.memory_rss, True),
+        'io': (lambda proc, io: io, True),
+    }
+
+    def __init__(self, limit=10, sort_by='cpu', format_size=None):
+        self.limit = limit            # None shows every process
+        self.sort_by = sort_by
+        self.filter_text = ""
+        self.format_size = format_size or _format_size
+        self.rows = {}                # pid -> displayed values
+        self.order = []               # pids in display order
+        self.io_rates = {}            # pid -> bytes per second
+        self._prev_io = {}            # pid -> (timestamp, io_bytes)
+        self._processes = ()
+
+    def update(self, snapshot):
+        """Take the process list of a snapshot and return the view diff"""
+        processes = snapshot.processes
+        # The sampler refreshes processes less often than it ticks
+        if processes is not None and processes is not self._processes:
+            self._update_io_rates(snapshot.timestamp, processes)
+            self._processes = processes
+        return self.refresh()
+
+    def refresh(self):
+        """Re-apply sorting, filtering and the row limit to the current processes"""
+        processes = self._processes
+        if self.filter_text:
+            needle = self.filter_text.lower()
+            processes = [proc for proc in processes
+                         if needle in proc.name.lower() or str(proc.pid).startswith(needle)]
+
+        key_func, descending = self.SORT_KEYS[self.sort_by]
+        io_rates = self.io_rates
+
+        def sort_key(proc):
+            return key_func(proc, io_rates.get(proc.pid, 0.0))
+
+        if self.limit is None:
+            selected = sorted(processes, key=sort_key, reverse=descending)
+        elif descending:
+            selected = heapq.nlargest(self.limit, processes, key=sort_key)
+        else:
+            selected = heapq.nsmallest(self.limit, processes, key=sort_key)
+
+        new_rows = {}
+        order = []
+        for proc in selected:
+            new_rows[proc.pid] = self._row_values(proc)
+            order.append(proc.pid)
+
+        removed = [pid for pid in self.rows if pid not in new_rows]
+        inserted = {}
+        changed = {}
+        for pid, values in new_rows.items():
+            old_values = self.rows.get(pid)
+            if old_values is None:
+                inserted[pid] = values
+            elif old_values != values:
+                changed[pid] = {column: value
+                                for column, value, old_value in zip(self.COLUMNS, values, old_values)
+                                if value != old_value}
+
+        self.rows = new_rows
+        self.order = order
+        return ProcessTableDiff(removed, inserted, changed, order)
+
+    def _update_io_rates(self, timestamp, processes):
+        """Turn cumulative per-process I/O counters into rates"""
+        prev_io = self._prev_io
+        io_rates = {}
+        current = {}
+        for proc in processes:
+            if proc.io_bytes is None:
+                continue
+            current[proc.pid] = (timestamp, proc.io_bytes)
+            previous = prev_io.get(proc.pid)
+            if previous is not None and timestamp > previous[0] and proc.io_bytes >= previous[1]:
+                io_rates[proc.pid] = (proc.io_bytes - previous[1]) / (timestamp - previous[0])
+        # Only live pids are kept, so exited processes drop out here
+        self._prev_io = current
+        self.io_rates = io_rates
+
+    def _row_values(self, proc):
+        """Displayed values of a process row"""
+        io_rate = self.io_rates.get(proc.pid)
+        return (
+            proc.name,
+            str(proc.pid),
+            f"{proc.cpu_percent:.1f}",
+            self.format_size(proc.memory_rss),
+            f"{self.format_size(io_rate)}/s" if io_rate is not None else "-",
+        )
+
+
+def apply_to_treeview(tree, diff):
+    """Apply a ProcessTableDiff to a ttk.Treeview whose row iids are pids"""
+    for pid in diff.removed:
+        tree.delete(str(pid))
+    for pid, values in diff.inserted.items():
+        tree.insert('', 'end', iid=str(pid), values=values)
+    for pid, cells in diff.changed.items():
+        for column, value in cells.items():
+            tree.set(str(pid), column, value)
+
+    # Move only the rows that are out of place
+    current = list(tree.get_children(''))
+    for index, pid in enumerate(diff.order):
+        iid = str(pid)
+        if current[index] != iid:
+            tree.move(iid, '', index)
+            # Mirror the move locally instead of asking Tk again
+            current.remove(iid)
+            current.insert(index, iid)
+
+
+def _format_size(size):
+    """Format a byte count for the table"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{int(size)} B"
+        size /= 1024
@@ -0,0 +1,148 @@
+import os
+import time
+import threading
+from collections import namedtuple
+
+import psutil
+
+
+# Immutable per-tick view of the system; every widget and logger reads from
+# the same snapshot instead of querying psutil on its own
+SystemSnapshot = namedtuple('SystemSnapshot', [
+    'timestamp',       # time.time() when the tick started
+    'cpu_percent',
+    'memory',          # psutil.virtual_memory() result
+    'disk_io',         # psutil.disk_io_counters() result or None
+    'net_io',          # psutil.net_io_counters() result or None
+    'disk_usage',      # psutil.disk_usage() of the system drive (refreshed every disk_interval)
+    'boot_time',
+    'processes',       # Tuple of ProcessInfo (refreshed every process_interval) or None
+    'calls',           # psutil calls made during this tick
+    'elapsed',         # Seconds spent taking this snapshot
+])
+
+ProcessInfo = namedtuple('ProcessInfo', [
+    'pid',
+    'name',
+    'cpu_percent',
+    'memory_rss',
+    'io_bytes',        # Cumulative bytes read and written, None when not permitted
+])
+
+
+class SystemSampler:
+    """Takes one SystemSnapshot per tick and shares it with every consumer
+
+    System-wide counters are read once per tick. Slow-moving values (disk
+    usage, the process list) are re-read on their own longer intervals and
+    carried over in between. Per-process fields are read inside
+    Process.oneshot(), so each process costs one batch of reads instead of
+    one per attribute. The number of psutil calls and the time spent are
+    recorded per tick; calls are counted per psutil API call and per
+    process oneshot block, each of which is one or a few syscalls.
+    """
+
+    def __init__(self, include_processes=False, process_interval=2.0, disk_interval=10.0, disk_path=None):
+        self.include_processes = include_processes
+        self.process_interval = process_interval
+        self.disk_interval = disk_interval
+        self.disk_path = disk_path or _system_drive()
+        self.latest = None       # Most recent SystemSnapshot
+        self.ticks = 0
+        self.total_calls = 0
+        self.total_elapsed = 0.0
+        self._lock = threading.Lock()
+        self._last_disk_time = 0.0
+        self._last_process_time = 0.0
+        self._disk_usage = None
+        self._processes = None
+        self._boot_time = None
+        # The first cpu_percent call only primes the counters
+        psutil.cpu_percent()
+
+    def sample(self):
+        """Take a snapshot, publish it as latest and return it"""
+        with self._lock:
+            start_time = time.perf_counter()
+            now = time.time()
+            calls = 4
+
+            cpu_percent = psutil.cpu_percent()
+            memory = psutil.virtual_memory()
+            try:
+                disk_io = psutil.disk_io_counters()
+            except Exception:
+                disk_io = None
+            try:
+                net_io = psutil.net_io_counters()
+            except Exception:
+                net_io = None
+
+            if self._boot_time is None:
+                self._boot_time = psutil.boot_time()
+                calls += 1
+
+            if now - self._last_disk_time >= self.disk_interval:
+                calls += 1
+                try:
+                    self._disk_usage = psutil.disk_usage(self.disk_path)
+                except Exception:
+                    self._disk_usage = None
+                self._last_disk_time = now
+
+            if self.include_processes and now - self._last_process_time >= self.process_interval:
+                self._processes, process_calls = self._sample_processes()
+                calls += process_calls
+                self._last_process_time = now
+
+            elapsed = time.perf_counter() - start_time
+            snapshot = SystemSnapshot(now, cpu_percent, memory, disk_io, net_io, self._disk_usage,
+                                      self._boot_time, self._processes, calls, elapsed)
+            self.ticks += 1
+            self.total_calls += calls
+            self.total_elapsed += elapsed
+            # Publishing is a single reference swap, so readers never see a partial snapshot
+            self.latest = snapshot
+            return snapshot
+
+    def stats(self):
+        """Return the average cost of a tick"""
+        ticks = self.ticks or 1
+        return {
+            'ticks': self.ticks,
+            'avg_calls': self.total_calls / ticks,
+            'avg_ms': self.total_elapsed / ticks * 1000,
+        }
+
+    def _sample_processes(self):
+        """Read name, CPU, memory and I/O of every process in one pass"""
+        processes = []
+        calls = 1
+        # process_iter caches Process objects, which keeps cpu_percent deltas per process
+        for proc in psutil.process_iter():
+            calls += 1
+            try:
+                with proc.oneshot():
+                    try:
+                        io = proc.io_counters()
+                        io_bytes = io.read_bytes + io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):
+                        # Protected processes (and some platforms) don't expose I/O
+                        io_bytes = None
+                    processes.append(ProcessInfo(
+                        proc.pid,
+                        proc.name(),
+                        proc.cpu_percent(),
+                        proc.memory_info().rss,
+                        io_bytes
+                    ))
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+        return tuple(processes), calls
+
+
+def _system_drive():
+    """Return the path whose disk usage the dashboard shows"""
+    if os.name == 'nt':
+        return os.environ.get('SystemDrive', 'C:') + '\\'
+    return '/'
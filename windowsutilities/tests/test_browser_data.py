@@ -0,0 +1,92 @@
+import os
+import sqlite3
+
+import pytest
+
+from browser_data import BrowserDataEngine, build_fake_profiles, summarize, CACHE, COOKIES
+
+
+@pytest.fixture
+def engine(tmp_path):
+    environ = build_fake_profiles(str(tmp_path), chromium_profiles=2, firefox_profiles=1, cache_files=10)
+    return BrowserDataEngine(max_workers=4, environ=environ)
+
+
+def test_discovers_every_profile(engine):
+    profiles = engine.discover()
+    assert sorted((profile.browser, profile.name) for profile in profiles) == [
+        ('Chrome', 'Default'), ('Chrome', 'Profile 1'),
+        ('Edge', 'Default'), ('Edge', 'Profile 1'),
+        ('Firefox', 'fake0.default'),
+    ]
+
+
+def test_clean_reclaims_the_estimated_bytes(engine):
+    profiles = engine.discover()
+    estimated = engine.estimate(profiles)
+    reports = engine.clean(profiles)
+    assert sum(report.bytes_reclaimed for report in reports) == estimated > 0
+    assert all(report.errors == 0 for report in reports)
+    assert summarize(reports)['Chrome'][0] == 2
+
+
+def test_clean_only_touches_the_selected_kinds(engine):
+    profiles = engine.discover(['Chrome'])
+    engine.clean(profiles, [CACHE])
+    for profile in profiles:
+        assert not os.path.exists(os.path.join(profile.path, 'Cache'))
+        assert os.path.exists(os.path.join(profile.path, 'History'))
+
+
+def test_clean_cookies_includes_the_network_folder(engine):
+    # Chrome and Edge 96+ keep cookies in Network/Cookies
+    profile = engine.discover(['Edge'])[0]
+    cookies = os.path.join(profile.path, 'Network', 'Cookies')
+    assert os.path.exists(cookies)
+    report = engine.clean([profile], [COOKIES])[0]
+    assert not os.path.exists(cookies)
+    assert report.bytes_by_kind[COOKIES] > 0
+
+
+def test_compact_prunes_old_rows_and_shrinks_the_databases(engine):
+    profiles = engine.discover()
+    history = os.path.join(profiles[0].path, 'History')
+    rows_before = _count(history, 'visits')
+
+    reports = engine.compact(profiles, prune_days=30)
+    assert reports and all(report.error is None for report in reports)
+    pruned = [report for report in reports if report.rows_pruned]
+    assert pruned and all(report.vacuumed for report in pruned)
+    assert all(report.size_after < report.size_before for report in pruned)
+    # Half of the fake rows are a year old
+    assert _count(history, 'visits') == rows_before // 2
+
+
+def test_compact_without_a_day_limit_keeps_every_row(engine):
+    profiles = engine.discover(['Firefox'])
+    places = os.path.join(profiles[0].path, 'places.sqlite')
+    rows_before = _count(places, 'moz_places')
+    reports = engine.compact(profiles)
+    assert all(report.rows_pruned == 0 for report in reports)
+    assert _count(places, 'moz_places') == rows_before
+
+
+def test_compact_reports_a_locked_database(engine):
+    profile = engine.discover(['Chrome'])[0]
+    conn = sqlite3.connect(os.path.join(profile.path, 'Cookies'))
+    try:
+        # An exclusive lock, like a running browser holds
+        conn.execute("BEGIN EXCLUSIVE")
+        reports = engine.compact([profile], prune_days=30)
+    finally:
+        conn.close()
+    locked = [report for report in reports if report.database == 'Cookies']
+    assert locked[0].error is not None
+
+
+def _count(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,98 @@
+import socket
+
+import pytest
+
+from dns_resolver import DnsCache, DnsResolver, StubDnsServer, OK, NXDOMAIN
+
+
+class FakeClock:
+    """Monotonic clock the tests move forward by hand"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def server():
+    server = StubDnsServer({'host.test': ['192.0.2.10', '2001:db8::10']}, ttl=60, negative_ttl=30)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_resolver(server, clock, **kwargs):
+    return DnsResolver([server.address], timeout=1.0, cache=DnsCache(clock=clock), **kwargs)
+
+
+def test_forward_and_reverse_lookup(server, clock):
+    resolver = make_resolver(server, clock)
+    result = resolver.resolve("host.test")
+    assert result.status == OK
+    assert sorted(result.addresses) == ['192.0.2.10', '2001:db8::10']
+    assert result.ttl == 60
+
+    reverse = resolver.reverse("192.0.2.10")
+    assert reverse.status == OK
+    assert reverse.names == ['host.test']
+
+
+def test_positive_answer_cached_until_ttl(server, clock):
+    resolver = make_resolver(server, clock)
+    resolver.resolve("host.test")
+    queries = server.queries
+
+    clock.now += 59
+    result = resolver.resolve("HOST.test.")
+    assert result.cached
+    assert result.ttl == 1
+    assert server.queries == queries
+    assert resolver.stats()['hits'] == 1
+
+    clock.now += 1
+    result = resolver.resolve("host.test")
+    assert not result.cached
+    assert server.queries > queries
+
+
+def test_negative_answer_cached_for_soa_minimum(server, clock):
+    resolver = make_resolver(server, clock, negative_ttl=300)
+    result = resolver.resolve("missing.test")
+    assert result.status == NXDOMAIN
+    assert result.ttl == 30
+    queries = server.queries
+
+    clock.now += 29
+    assert resolver.resolve("missing.test").cached
+    assert server.queries == queries
+
+    clock.now += 1
+    result = resolver.resolve("missing.test")
+    assert not result.cached
+    assert result.status == NXDOMAIN
+
+
+def test_lookup_many_queries_each_name_once(server, clock):
+    resolver = make_resolver(server, clock)
+    results = resolver.lookup_many(["host.test", "missing.test", "host.test", "192.0.2.10"])
+    assert [result.status for result in results] == [OK, NXDOMAIN, OK, OK]
+    assert resolver.stats()['misses'] == 3
+
+
+def test_starts_at_the_server_that_answered_last(server, clock):
+    # A bound socket that never answers stands in for a dead server
+    silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    silent.bind(("127.0.0.1", 0))
+    try:
+        resolver = DnsResolver([f"127.0.0.1:{silent.getsockname()[1]}", server.address], timeout=0.3,
+                               cache=DnsCache(clock=clock))
+        assert resolver.resolve("host.test").elapsed >= 0.3
+        assert resolver.resolve("other.test").elapsed < 0.3
+    finally:
+        silent.close()
@@ -0,0 +1,76 @@
+import random
+import socket
+
+import pytest
+
+from latency_prober import LatencyHistogram, LatencyProber, LocalEchoServer, parse_target, format_stats, TCP, UDP
+
+
+@pytest.fixture
+def server():
+    server = LocalEchoServer(drop_rate=0.3, seed=7)
+    yield server
+    server.close()
+
+
+def test_histogram_percentiles_within_precision():
+    histogram = LatencyHistogram()
+    values = list(range(1, 100001))
+    random.Random(1).shuffle(values)
+    for value in values:
+        histogram.record(value)
+    for percent in (50, 95, 99):
+        expected = percent * 1000
+        assert abs(histogram.percentile(percent) - expected) <= expected * 0.015
+    assert (histogram.min, histogram.max) == (1, 100000)
+    assert abs(histogram.percentile(100) - 100000) <= 1500
+
+
+def test_histogram_small_values_are_exact():
+    histogram = LatencyHistogram()
+    for value in (3, 3, 5, 90):
+        histogram.record(value)
+    assert histogram.percentile(50) == 3
+    assert histogram.percentile(75) == 5
+    assert histogram.percentile(99) == 90
+    assert LatencyHistogram().percentile(50) is None
+
+
+def test_udp_loss_matches_the_dropped_echoes(server):
+    rounds = 40
+    # The server draws one number per datagram it receives
+    draws = random.Random(7)
+    dropped = sum(draws.random() < 0.3 for _ in range(rounds))
+
+    prober = LatencyProber([server.targets[1]], interval=0.001, timeout=0.2)
+    stats = prober.run_rounds(rounds)[0]
+    assert stats['protocol'] == UDP
+    assert stats['sent'] == rounds
+    assert stats['received'] == rounds - dropped
+    assert stats['loss'] == pytest.approx(100.0 * dropped / rounds)
+    assert stats['p50'] <= stats['p95'] <= stats['p99'] <= stats['max']
+
+
+def test_tcp_probe_and_refused_port(server):
+    closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    closed.bind(("127.0.0.1", 0))
+    port = closed.getsockname()[1]
+    closed.close()
+
+    prober = LatencyProber([server.targets[0], f"127.0.0.1:{port}"], interval=0.001, timeout=0.5)
+    reachable, refused = prober.run_rounds(5)
+    assert reachable['loss'] == 0.0
+    assert reachable['p50'] is not None
+    assert refused['loss'] == 100.0
+    assert refused['error']
+    assert len(format_stats([reachable, refused])) == 3
+
+
+def test_parse_target():
+    target = parse_target("udp://[::1]:7")
+    assert (target.host, target.port, target.protocol) == ("::1", 7, UDP)
+    assert target.label == "udp://[::1]:7"
+    target = parse_target("example.com")
+    assert (target.port, target.protocol) == (443, TCP)
+    with pytest.raises(ValueError):
+        parse_target("icmp://example.com")
@@ -0,0 +1,113 @@
+from network_probe import (ProbeEngine, ProbeResult, FakeCommandRunner, format_summary, split_hosts,
+                           PING, TRACEROUTE, DNS)
+
+
+WINDOWS_PING = """\
+Pinging example.com [93.184.216.34] with 32 bytes of data:
+Reply from 93.184.216.34: bytes=32 time=12ms TTL=56
+Request timed out.
+Reply from 93.184.216.34: bytes=32 time<1ms TTL=56
+Reply from 93.184.216.34: bytes=32 time=30ms TTL=56
+
+Ping statistics for 93.184.216.34:
+    Packets: Sent = 4, Received = 3, Lost = 1 (25% loss),
+"""
+
+LINUX_PING = """\
+PING example.com (93.184.216.34) 56(84) bytes of data.
+64 bytes from 93.184.216.34: icmp_seq=1 ttl=56 time=11.5 ms
+64 bytes from 93.184.216.34: icmp_seq=2 ttl=56 time=13.5 ms
+
+--- example.com ping statistics ---
+3 packets transmitted, 2 received, 33.3333% packet loss, time 2003ms
+"""
+
+TRACERT = """\
+Tracing route to example.com [93.184.216.34]
+over a maximum of 30 hops:
+
+  1    <1 ms    <1 ms    <1 ms  192.168.1.1
+  2     8 ms     *       10 ms  10.0.0.1
+  3    20 ms    22 ms    24 ms  93.184.216.34
+
+Trace complete.
+"""
+
+NSLOOKUP = """\
+Server:  router.local
+Address:  192.168.1.1
+
+Non-authoritative answer:
+Name:    example.com
+Addresses:  2606:2800:220:1:248:1893:25c8:1946
+          93.184.216.34
+Aliases:  www.example.com
+"""
+
+
+def feed(tool, text, count=4):
+    result = ProbeResult("example.com", tool, count)
+    for line in text.splitlines():
+        result.feed(line)
+    return result
+
+
+def test_parse_windows_ping():
+    result = feed(PING, WINDOWS_PING)
+    assert result.times == [12.0, 1.0, 30.0]
+    assert result.sent == 4
+    assert result.loss == 25.0
+    assert (result.min, result.max) == (1.0, 30.0)
+
+
+def test_parse_linux_ping():
+    result = feed(PING, LINUX_PING)
+    assert result.times == [11.5, 13.5]
+    assert result.sent == 3
+    assert round(result.avg, 1) == 12.5
+
+
+def test_parse_tracert_uses_the_last_hop():
+    result = feed(TRACEROUTE, TRACERT)
+    assert result.hops == 3
+    assert result.times == [20.0, 22.0, 24.0]
+    assert result.loss == 0.0
+
+
+def test_parse_tracert_counts_timeouts_as_loss():
+    result = feed(TRACEROUTE, TRACERT.replace("  3    20 ms    22 ms    24 ms  93.184.216.34",
+                                              "  3     *        *       24 ms  93.184.216.34"))
+    assert result.times == [24.0]
+    assert result.sent == 3
+
+
+def test_parse_nslookup_addresses():
+    result = feed(DNS, NSLOOKUP)
+    # The server's own address comes before the answer and is not one of them
+    assert result.addresses == ["2606:2800:220:1:248:1893:25c8:1946", "93.184.216.34"]
+    assert result.loss == 0.0
+
+
+def test_parse_nslookup_not_found():
+    result = feed(DNS, "Server:  router.local\nAddress:  192.168.1.1\n\n"
+                       "*** router.local can't find nowhere.test: Non-existent domain\n")
+    assert result.addresses == []
+    assert result.loss == 100.0
+
+
+def test_engine_streams_lines_and_keeps_host_order():
+    lines = []
+    runner = FakeCommandRunner(outputs={"a.test": WINDOWS_PING.splitlines()}, line_delay=0,
+                               unreachable={"down.test"}, seed=1)
+    engine = ProbeEngine(runner, concurrency=2, on_line=lambda host, line: lines.append(host))
+    results = engine.run(["a.test", "down.test", "b.test"], PING)
+    assert [result.host for result in results] == ["a.test", "down.test", "b.test"]
+    assert results[0].received == 3
+    assert results[1].loss == 100.0
+    assert results[2].loss == 0.0
+    assert set(lines) == {"a.test", "down.test", "b.test"}
+    assert len(format_summary(results)) == 4
+
+
+def test_split_hosts():
+    assert split_hosts("a.com, b.com;a.com  c.com\n") == ["a.com", "b.com", "c.com"]
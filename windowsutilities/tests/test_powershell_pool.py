@@ -0,0 +1,55 @@
+import sys
+
+import pytest
+
+import powershell_pool
+from powershell_pool import PowerShellPool, PowerShellError, PowerShellTimeout, fake_shell_command
+
+
+@pytest.fixture
+def pool():
+    pool = PowerShellPool(size=1, command=fake_shell_command())
+    yield pool
+    pool.close()
+
+
+def test_run_returns_output_and_reuses_the_worker(pool):
+    assert pool.run("Get-Date") == ["Get-Date"]
+    assert pool.run_text("Get-Service") == "Get-Service"
+    assert len(pool._workers) == 1
+    assert pool.restarts == 0
+
+
+def test_script_error_keeps_the_worker(pool):
+    with pytest.raises(PowerShellError, match="access denied"):
+        pool.run("throw access denied")
+    assert pool.run("still here") == ["still here"]
+    assert pool.restarts == 0
+
+
+def test_timeout_restarts_the_worker(pool):
+    with pytest.raises(PowerShellTimeout):
+        pool.run("sleep 5", timeout=0.5)
+    # The hung worker was killed; the next request gets a fresh one
+    assert pool.run("after timeout", timeout=5) == ["after timeout"]
+    assert pool.restarts == 1
+
+
+def test_dead_worker_is_replaced(pool):
+    with pytest.raises(PowerShellError):
+        pool.run("exit", timeout=5)
+    assert pool.run("after exit", timeout=5) == ["after exit"]
+    assert pool.restarts == 1
+
+
+def test_byte_order_mark_does_not_hide_the_first_response():
+    # Windows PowerShell may start its output with a UTF-8 byte order mark
+    command = [sys.executable, "-c",
+               "import sys, runpy; sys.stdout.write('\\ufeff'); sys.argv = ['pool', '--fake-shell']; "
+               f"runpy.run_path({powershell_pool.__file__!r}, run_name='__main__')"]
+    pool = PowerShellPool(size=1, command=command)
+    try:
+        assert pool.run("first", timeout=5) == ["first"]
+        assert pool.restarts == 0
+    finally:
+        pool.close()
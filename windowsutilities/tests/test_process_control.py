@@ -0,0 +1,81 @@
+import sys
+import subprocess
+
+import psutil
+import pytest
+
+from process_control import find_process_trees, terminate_processes, close_programs, _real_children
+
+
+# Prints its PID (and that of a child it starts, with --child) and waits to be stopped
+SLEEPER = """
+import os, sys, time, signal, subprocess
+if '--ignore-term' in sys.argv:
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+child = None
+if '--child' in sys.argv:
+    child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+print(os.getpid(), child.pid if child else '', flush=True)
+time.sleep(60)
+"""
+
+
+def start_sleeper(*args):
+    process = subprocess.Popen([sys.executable, "-c", SLEEPER] + list(args), stdout=subprocess.PIPE, text=True)
+    pids = [int(pid) for pid in process.stdout.readline().split()]
+    return process, pids
+
+
+@pytest.fixture
+def processes():
+    started = []
+    yield started
+    for process in started:
+        process.kill()
+        process.wait()
+
+
+def test_terminate_waits_for_the_processes(processes):
+    process, (pid,) = start_sleeper()
+    processes.append(process)
+    result = terminate_processes([psutil.Process(pid)], timeout=5)
+    assert result.terminated == [pid]
+    assert result.killed == [] and result.survivors == []
+    assert process.poll() is not None
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="terminate() already kills on Windows")
+def test_processes_ignoring_terminate_are_killed(processes):
+    stubborn, (stubborn_pid,) = start_sleeper("--ignore-term")
+    polite, (polite_pid,) = start_sleeper()
+    processes.extend([stubborn, polite])
+    result = terminate_processes([psutil.Process(stubborn_pid), psutil.Process(polite_pid)],
+                                 timeout=0.5, kill_timeout=5)
+    assert result.terminated == [polite_pid]
+    assert result.killed == [stubborn_pid]
+    assert sorted(result.freed_pids) == sorted([stubborn_pid, polite_pid])
+    assert stubborn.poll() is not None
+
+
+def test_process_tree_includes_children(processes):
+    process, (pid, child_pid) = start_sleeper("--child")
+    processes.append(process)
+    assert {proc.pid for proc in find_process_trees(pids=[pid])} == {pid, child_pid}
+    assert {proc.pid for proc in find_process_trees(pids=[pid], include_children=False)} == {pid}
+
+    result = terminate_processes(find_process_trees(pids=[pid]), timeout=5)
+    assert sorted(result.freed_pids) == sorted([pid, child_pid])
+
+
+def test_close_programs_never_closes_the_caller():
+    own_name = psutil.Process().name()
+    assert all(proc.pid != psutil.Process().pid for proc in find_process_trees([own_name]))
+    assert close_programs(["no-such-program.exe"]).freed_pids == []
+
+
+def test_children_older_than_their_parent_are_skipped():
+    # PID 10 was reused: 11 is its real child, 12 belonged to the earlier process with that PID
+    children = {10: [11, 12]}
+    create_times = {10: 100.0, 11: 150.0, 12: 50.0}
+    assert _real_children(10, children, create_times) == [11]
+    assert _real_children(10, children, {10: None, 11: 150.0, 12: 50.0}) == [11, 12]
@@ -0,0 +1,297 @@
+"""Instant removal of large folders: rename now, delete in the background
+
+remove() renames a folder (or file) into a tombstone area on the same
+volume, which is a single atomic rename however many files it holds, and
+returns straight away. A low-priority reaper thread then deletes the
+tombstones one by one with the cleanup engine. Tombstone areas are
+recorded in a small registry file, so tombstones left by a previous run
+(the app was closed or files were still in use) are picked up again when
+the reaper starts.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import queue
+import shutil
+import stat
+import threading
+from threading import Thread
+
+from cleanup_engine import CleanupEngine, CleanupTarget, RateLimiter, _resolves_under
+
+
+# Name of the tombstone folder created at the root of other volumes
+VOLUME_AREA_NAME = ".wsu_tombstones"
+
+# Windows thread priority that also lowers the thread's I/O priority
+THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+
+
+def default_tombstone_dir():
+    """Return the tombstone area in the application data folder"""
+    base_dir = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base_dir, "WindowsSystemUtilities", "tombstones")
+
+
+def _volume_root(path):
+    """Return the mount point (drive root) of the volume holding path"""
+    path = os.path.abspath(path)
+    device = os.stat(path).st_dev
+    while True:
+        parent = os.path.dirname(path)
+        if parent == path:
+            return path
+        try:
+            if os.stat(parent).st_dev != device:
+                return path
+        except OSError:
+            return path
+        path = parent
+
+
+def _clear_readonly(function, path, error):
+    """rmtree error handler: read-only files can't be deleted on Windows until made writable"""
+    try:
+        os.chmod(path, stat.S_IWRITE)
+        function(path)
+    except OSError:
+        pass
+
+
+def _rmtree(path):
+    """shutil.rmtree that retries read-only files (onerror is deprecated since Python 3.12)"""
+    if sys.version_info >= (3, 12):
+        shutil.rmtree(path, onexc=_clear_readonly)
+    else:
+        shutil.rmtree(path, onerror=_clear_readonly)
+
+
+class TombstoneReaper:
+    """Removes folders by renaming them away and deleting them on a background thread
+
+    on_change, if given, is called with stats() from the reaper thread
+    whenever the backlog grows or shrinks.
+    """
+
+    def __init__(self, area=None, rate_limiter=None, on_change=None):
+        self.area = area or default_tombstone_dir()
+        self.registry_path = os.path.join(self.area, "areas.json")
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.on_change = on_change
+        self.reaped = 0
+        self.failed = 0
+        self.files_deleted = 0
+        self.bytes_freed = 0
+        self.current = None
+        self._areas = None
+        self._pending = []              # Tombstones not yet deleted, oldest first
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self._engine = CleanupEngine(max_workers=1, rate_limiter=self.rate_limiter)
+        self._thread = None
+
+    def start(self):
+        """Queue the tombstones left by earlier runs and start the reaper thread"""
+        if self._thread is not None:
+            return
+        queued = set(self.backlog())
+        for area in self._known_areas():
+            try:
+                names = sorted(os.listdir(area))
+            except OSError:
+                continue
+            for name in names:
+                path = os.path.join(area, name)
+                if path != self.registry_path and path not in queued:
+                    self._enqueue(path)
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop after the current tombstone; whatever is left resumes on the next start"""
+        self._stop_event.set()
+        self._engine.cancel()
+        self._queue.put(None)
+
+    def remove(self, path):
+        """Rename path into a tombstone and queue it for deletion
+
+        Returns the tombstone path, or None when the rename isn't possible
+        (usually a file in the folder is open); the caller then falls back
+        to deleting in place.
+        """
+        if not os.path.lexists(path):
+            return None
+        try:
+            area = self._area_for(path)
+            tombstone = os.path.join(
+                area, f"{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}-{os.path.basename(os.path.normpath(path))}")
+            os.rename(path, tombstone)
+        except OSError:
+            return None
+        self._enqueue(tombstone)
+        return tombstone
+
+    def backlog(self):
+        """Return the tombstones still waiting to be deleted"""
+        with self._lock:
+            return list(self._pending)
+
+    def stats(self):
+        """Return reaper counters"""
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            'pending': pending,
+            'current': self.current,
+            'reaped': self.reaped,
+            'failed': self.failed,
+            'files_deleted': self.files_deleted,
+            'bytes_freed': self.bytes_freed,
+        }
+
+    def wait(self, timeout=None):
+        """Wait until the backlog is empty; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.backlog():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def _enqueue(self, path):
+        with self._lock:
+            self._pending.append(path)
+        self._queue.put(path)
+        self._notify()
+
+    def _notify(self):
+        if self.on_change is not None:
+            try:
+                self.on_change(self.stats())
+            except Exception as e:
+                print(f"Error in tombstone listener: {e}")
+
+    def _known_areas(self):
+        """The application area plus the volume areas recorded in the registry"""
+        if self._areas is None:
+            self._areas = [self.area]
+            try:
+                with open(self.registry_path, 'r', encoding='utf-8') as f:
+                    self._areas += [area for area in json.load(f) if area != self.area]
+            except (OSError, ValueError):
+                pass
+        return self._areas
+
+    def _area_for(self, path):
+        """Return a tombstone area on the same volume as path, creating it if needed"""
+        device = os.lstat(path).st_dev
+        os.makedirs(self.area, exist_ok=True)
+        # Folders from outside the user profile (C:\Windows\SoftwareDistribution and the
+        # like) are kept out of a per-user area: a later run without admin rights couldn't
+        # delete them there, and they would be retried as failed tombstones on every start
+        profile = os.path.realpath(os.path.expanduser("~"))
+        if os.stat(self.area).st_dev == device and (
+                _resolves_under(profile, path) or not _resolves_under(profile, self.area)):
+            return self.area
+
+        # A rename can't cross volumes, so each volume gets its own area at its root;
+        # on the system drive that area needs admin rights, like the folders going into it
+        area = os.path.join(_volume_root(os.path.dirname(os.path.abspath(path))), VOLUME_AREA_NAME)
+        if not os.path.isdir(area):
+            os.makedirs(area, exist_ok=True)
+            if os.name == 'nt':
+                try:
+                    import ctypes
+                    ctypes.windll.kernel32.SetFileAttributesW(area, 0x2)  # FILE_ATTRIBUTE_HIDDEN
+                except (ImportError, AttributeError, OSError):
+                    pass
+        with self._lock:
+            areas = self._known_areas()
+            if area not in areas:
+                areas.append(area)
+                with open(self.registry_path, 'w', encoding='utf-8') as f:
+                    json.dump(areas[1:], f)
+        return area
+
+    def _run(self):
+        """Reaper thread: delete queued tombstones one at a time at low priority"""
+        _lower_thread_priority()
+        while not self._stop_event.is_set():
+            path = self._queue.get()
+            if path is None:
+                break
+            self.current = path
+            removed = self._delete(path)
+            self.current = None
+            if self._stop_event.is_set() and not removed:
+                break
+            with self._lock:
+                if path in self._pending:
+                    self._pending.remove(path)
+                if removed:
+                    self.reaped += 1
+                else:
+                    # Still in use; it stays in its area and is retried on the next start
+                    self.failed += 1
+            self._notify()
+
+    def _delete(self, path):
+        """Delete one tombstone; returns True once it is gone"""
+        if os.path.isdir(path) and not os.path.islink(path):
+            report = self._engine.clean_target(CleanupTarget(os.path.basename(path), path))
+            self.files_deleted += report.files_deleted
+            self.bytes_freed += report.bytes_freed
+            if report.cancelled:
+                return False
+            if report.errors:
+                # Read-only files and the like; rmtree gets a second go at them
+                _rmtree(path)
+            try:
+                os.rmdir(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                return False
+            return True
+        try:
+            size = os.lstat(path).st_size
+            os.unlink(path)
+            self.files_deleted += 1
+            self.bytes_freed += size
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False
+        return True
+
+
+def _lower_thread_priority():
+    """Run the calling thread at background (CPU and I/O) priority where supported"""
+    try:
+        if os.name == 'nt':
+            import ctypes
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        elif sys.platform.startswith("linux"):
+            # On Linux a thread's nice value is set through its thread id
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (ImportError, AttributeError, OSError):
+        pass
+
+
+_default_reaper = None
+_default_reaper_lock = threading.Lock()
+
+
+def get_default_reaper():
+    """Return the reaper shared by the whole application, started on first use"""
+    global _default_reaper
+    with _default_reaper_lock:
+        if _default_reaper is None:
+            _default_reaper = TombstoneReaper()
+            _default_reaper.start()
+        return _default_reaper
@@ -0,0 +1,392 @@
+"""Non-blocking hand-off of UI work from background threads
+
+Tk widgets may only be touched from the main thread. Background threads
+post callables to a UIDispatcher and carry on; the main thread runs them on
+its next tick. Updates posted under a key replace any pending update with
+the same key, so a widget that is refreshed faster than the UI can draw is
+rendered once with the latest value. submit() returns a Future for the rare
+caller that needs a result.
+
+Calls wait in priority lanes (dialogs, status, widget updates, logs) and
+each tick runs them highest lane first until a time budget is spent, so a
+burst of log lines can't hold back an error dialog or the status bar.
+
+    python ui_dispatcher.py --benchmark --workers 4 --seconds 3 --busy-ms 50
+"""
+import sys
+import time
+import queue
+import argparse
+import threading
+import itertools
+import traceback
+import concurrent.futures
+from collections import OrderedDict
+from threading import Thread
+
+from metrics_store import RingBuffer
+
+
+# Priority lanes, highest first
+LANE_DIALOG = 0
+LANE_STATUS = 1
+LANE_WIDGET = 2
+LANE_LOG = 3
+LANE_NAMES = ('dialog', 'status', 'widget', 'log')
+
+
+class LaneQueue:
+    """Priority lanes of keyed items with depth and latency accounting
+
+    Each lane is an OrderedDict, so an item put under a key that is already
+    pending replaces it in place. The replaced item keeps the enqueue time
+    of the first one, which makes latency show how stale a widget got rather
+    than how recently it was last touched.
+    """
+
+    def __init__(self, history=256):
+        self._lock = threading.Lock()
+        self._lanes = [OrderedDict() for _ in LANE_NAMES]
+        self._sequence = itertools.count()
+        self.put_count = [0] * len(LANE_NAMES)
+        self.coalesced = [0] * len(LANE_NAMES)
+        self.handled = [0] * len(LANE_NAMES)
+        self.max_depth = [0] * len(LANE_NAMES)
+        self.latencies = [RingBuffer(history) for _ in LANE_NAMES]  # Seconds from put to handled
+        self.ticks = 0
+        self.behind_ticks = 0      # Drains that ran out of budget with items left
+        self.last_drain_ms = 0.0
+
+    def put(self, item, lane=LANE_WIDGET, key=None):
+        """Queue an item, replacing a pending item with the same key in the lane"""
+        if key is None:
+            key = ('item', next(self._sequence))
+        pending = self._lanes[lane]
+        with self._lock:
+            self.put_count[lane] += 1
+            entry = pending.get(key)
+            if entry is not None:
+                self.coalesced[lane] += 1
+                # Assigning an existing key keeps its position in the OrderedDict
+                pending[key] = (entry[0], item)
+            else:
+                pending[key] = (time.perf_counter(), item)
+                if len(pending) > self.max_depth[lane]:
+                    self.max_depth[lane] = len(pending)
+
+    def depth(self, lane=None):
+        """Number of pending items in one lane or in all of them"""
+        with self._lock:
+            if lane is not None:
+                return len(self._lanes[lane])
+            return sum(len(pending) for pending in self._lanes)
+
+    def drain(self, handler, budget_ms=None):
+        """Hand pending items to handler, highest lane first
+
+        Stops once budget_ms have passed; at least one item is handled per
+        call, so the UI always makes progress. Without a budget, only the
+        items pending when the drain started are handled, so a busy producer
+        can't keep the caller in here forever. Returns the number handled.
+        """
+        start_time = time.perf_counter()
+        deadline = start_time + budget_ms / 1000.0 if budget_ms is not None else None
+        limit = self.depth() if deadline is None else None
+        handled = 0
+        while limit is None or handled < limit:
+            entry = self._pop()
+            if entry is None:
+                break
+            lane, enqueued, item = entry
+            try:
+                handler(item)
+            finally:
+                now = time.perf_counter()
+                self.handled[lane] += 1
+                self.latencies[lane].append(now - enqueued)
+                handled += 1
+            if deadline is not None and now >= deadline:
+                if self.depth():
+                    self.behind_ticks += 1
+                break
+        self.ticks += 1
+        self.last_drain_ms = (time.perf_counter() - start_time) * 1000
+        return handled
+
+    def clear(self):
+        """Drop every pending item"""
+        with self._lock:
+            for pending in self._lanes:
+                pending.clear()
+
+    def stats(self):
+        """Return depth and latency per lane plus drain counters"""
+        lanes = {}
+        for lane, name in enumerate(LANE_NAMES):
+            latencies = self.latencies[lane].window()
+            count = len(latencies)
+            lanes[name] = {
+                'depth': self.depth(lane),
+                'max_depth': self.max_depth[lane],
+                'put': self.put_count[lane],
+                'coalesced': self.coalesced[lane],
+                'handled': self.handled[lane],
+                'avg_latency_ms': sum(latencies) / count * 1000 if count else 0.0,
+                'max_latency_ms': max(latencies) * 1000 if count else 0.0,
+            }
+        return {
+            'lanes': lanes,
+            'depth': sum(lane['depth'] for lane in lanes.values()),
+            'ticks': self.ticks,
+            'behind_ticks': self.behind_ticks,
+            'last_drain_ms': self.last_drain_ms,
+        }
+
+    def _pop(self):
+        """Remove and return (lane, enqueued, item) of the next item, or None"""
+        with self._lock:
+            for lane, pending in enumerate(self._lanes):
+                if pending:
+                    enqueued, item = pending.popitem(last=False)[1]
+                    return lane, enqueued, item
+        return None
+
+
+class UIDispatcher:
+    """Runs callables posted from any thread on the UI thread
+
+    The dispatcher belongs to the thread that creates it. Once started with
+    a Tk root it drains itself every interval_ms via root.after(), spending
+    at most budget_ms per tick; without a root the owner calls drain() from
+    its own loop. Calls made on the UI thread itself run immediately.
+    """
+
+    def __init__(self, root=None, interval_ms=16, budget_ms=8, on_error=None):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.budget_ms = budget_ms
+        self.on_error = on_error
+        self.queue = LaneQueue()
+        self.executed = 0
+        self._ui_thread = threading.get_ident()
+        self._running = False
+        self._after_id = None
+
+    def in_ui_thread(self):
+        """Return True when called from the thread that owns the dispatcher"""
+        return threading.get_ident() == self._ui_thread
+
+    def post(self, func, *args, **kwargs):
+        """Run func(*args, **kwargs) on the UI thread without waiting for it"""
+        self.queue.put((func, args, kwargs), LANE_WIDGET)
+
+    def post_latest(self, key, func, *args, **kwargs):
+        """Like post(), but replaces a pending call posted under the same key
+
+        The replaced call keeps its place in the queue, so coalescing never
+        reorders updates to different widgets.
+        """
+        self.queue.put((func, args, kwargs), LANE_WIDGET, key)
+
+    def post_to(self, lane, key, func, *args, **kwargs):
+        """Post to a given lane; a key other than None coalesces like post_latest()"""
+        self.queue.put((func, args, kwargs), lane, key)
+
+    def submit(self, func, *args, **kwargs):
+        """Run func on the UI thread and return a Future of its result"""
+        future = concurrent.futures.Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        if self.in_ui_thread():
+            run()
+        else:
+            self.post(run)
+        return future
+
+    def call(self, func, *args, timeout=5.0, **kwargs):
+        """Run func on the UI thread and wait for its result"""
+        return self.submit(func, *args, **kwargs).result(timeout=timeout)
+
+    def pending(self):
+        """Number of calls waiting for the UI thread"""
+        return self.queue.depth()
+
+    def drain(self, budget_ms=None):
+        """Run pending calls, highest lane first; must be called on the UI thread"""
+        return self.queue.drain(self._run, budget_ms)
+
+    def start(self, root=None):
+        """Start draining on the Tk event loop"""
+        if root is not None:
+            self.root = root
+        if self.root is None or self._running:
+            return
+        self._running = True
+        self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        """Stop draining; pending calls are dropped"""
+        self._running = False
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self.queue.clear()
+
+    def stats(self):
+        """Return queue depth and latency per lane, see LaneQueue.stats()"""
+        stats = self.queue.stats()
+        stats['executed'] = self.executed
+        return stats
+
+    def _run(self, call):
+        """Run one posted call, reporting instead of raising its errors"""
+        func, args, kwargs = call
+        self.executed += 1
+        try:
+            func(*args, **kwargs)
+        except Exception:
+            self._report_error()
+
+    def _tick(self):
+        """Drain within the budget and schedule the next drain"""
+        self._after_id = None
+        try:
+            self.drain(self.budget_ms)
+        finally:
+            if self._running:
+                self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def _report_error(self):
+        """Hand an exception raised by a posted call to on_error, or print it"""
+        if self.on_error is not None:
+            self.on_error(sys.exc_info()[1])
+        else:
+            print(f"Error in UI callback: {traceback.format_exc()}")
+
+
+def _run_ui_loop(drain, stop_event, busy_ms):
+    """Simulate a saturated UI thread: every tick is busy_ms of work, then a drain"""
+    while not stop_event.is_set():
+        deadline = time.perf_counter() + busy_ms / 1000.0
+        while time.perf_counter() < deadline:
+            pass
+        drain()
+    drain()
+
+
+def benchmark_blocking(workers, seconds, busy_ms, work_ms):
+    """Worker throughput with the old round trip: enqueue, then wait on an Event"""
+    callbacks = queue.Queue()
+    stop_event = threading.Event()
+    counts = [0] * workers
+
+    def drain():
+        # process_ui_queue handled at most 100 messages per tick
+        for _ in range(100):
+            try:
+                callbacks.get_nowait()()
+            except queue.Empty:
+                break
+
+    def worker(index):
+        while not stop_event.is_set():
+            time.sleep(work_ms / 1000.0)
+            done = threading.Event()
+            callbacks.put(done.set)
+            done.wait(timeout=5.0)
+            counts[index] += 1
+
+    return _run_benchmark(worker, drain, workers, seconds, busy_ms, stop_event, counts)
+
+
+def benchmark_dispatcher(workers, seconds, busy_ms, work_ms):
+    """Worker throughput with fire-and-forget posts coalesced per worker"""
+    dispatcher = UIDispatcher()
+    stop_event = threading.Event()
+    counts = [0] * workers
+    rendered = [None] * workers
+
+    def render(index, value):
+        rendered[index] = value
+
+    def worker(index):
+        while not stop_event.is_set():
+            time.sleep(work_ms / 1000.0)
+            counts[index] += 1
+            dispatcher.post_latest(index, render, index, counts[index])
+
+    result = _run_benchmark(worker, dispatcher.drain, workers, seconds, busy_ms, stop_event, counts)
+    result['ui_calls'] = dispatcher.executed
+    # Every widget must end up showing its worker's last value
+    result['latest_rendered'] = rendered == counts
+    return result
+
+
+def _run_benchmark(worker, drain, workers, seconds, busy_ms, stop_event, counts):
+    """Run workers against a simulated UI loop on the calling thread"""
+    threads = [Thread(target=worker, args=(index,), daemon=True) for index in range(workers)]
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    timer = threading.Timer(seconds, stop_event.set)
+    timer.start()
+    _run_ui_loop(drain, stop_event, busy_ms)
+    for thread in threads:
+        thread.join()
+    # Let the final updates land
+    drain()
+    elapsed = time.perf_counter() - start_time
+    total = sum(counts)
+    return {
+        'updates': total,
+        'updates_per_second': total / elapsed,
+        'ui_calls': total,
+    }
+
+
+def parse_args(argv=None):
+    """Parse the command line of the dispatcher benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark UI dispatch from worker threads")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Compare the blocking round trip with the dispatcher")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Number of worker threads (default: 4)")
+    parser.add_argument("--seconds", type=float, default=3.0,
+                        help="Duration of each run (default: 3)")
+    parser.add_argument("--busy-ms", type=float, default=50.0,
+                        help="Milliseconds the UI thread is busy per tick (default: 50)")
+    parser.add_argument("--work-ms", type=float, default=1.0,
+                        help="Milliseconds of work per worker update (default: 1)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Command line entry point"""
+    args = parse_args(argv)
+    if not args.benchmark:
+        print("Nothing to do; pass --benchmark", file=sys.stderr)
+        return 2
+
+    print(f"{args.workers} workers, {args.work_ms:g} ms work per update, "
+          f"UI thread busy {args.busy_ms:g} ms per tick, {args.seconds:g} s per run")
+    print(f"{'mode':<12}{'updates':>10}{'per second':>14}{'UI calls':>10}")
+    for mode, run in (("blocking", benchmark_blocking), ("dispatcher", benchmark_dispatcher)):
+        result = run(args.workers, args.seconds, args.busy_ms, args.work_ms)
+        print(f"{mode:<12}{result['updates']:>10}{result['updates_per_second']:>14.1f}{result['ui_calls']:>10}")
+        if result.get('latest_rendered') is False:
+            print("  warning: a widget did not end on its latest value")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
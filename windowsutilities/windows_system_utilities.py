@@ -13,17 +13,17 @@ import psutil
 import platform
 import glob
 import winreg
-from datetime import datetime, timedelta
+from datetime import timedelta
 import time
 import csv
 import socket
+import sqlite3
 import functools
 import traceback
 import concurrent.futures
 import fnmatch
 import gc
 import weakref
-import queue
 import matplotlib
 matplotlib.use('TkAgg')  # Use TkAgg backend
 from matplotlib.figure import Figure
@@ -34,6 +34,19 @@ try:
 except ImportError:
     pass  # Handle later in the code
 
+from metrics_store import TieredMetricsStore
+from chart_renderer import BlitRenderer
+from metrics_daemon import MetricsEngine, default_collectors
+from system_sampler import SystemSampler
+from process_table import ProcessTable, apply_to_treeview
+from network_throughput import ThroughputEngine, InterfaceTable, NetworkProcessTable, format_rate, sparkline
+from powershell_pool import PowerShellError, get_default_pool
+from ui_dispatcher import UIDispatcher, LANE_DIALOG, LANE_STATUS, LANE_WIDGET, LANE_LOG
+from log_buffer import LogBuffer
+from log_sink import AsyncLogSink, export_log, read_records
+from log_index import LogIndex
+from log_view import VirtualLogView
+
 # Constants for UI
 VERSION = "1.2"
 HEADING_FONT = ('Segoe UI', 12, 'bold')
@@ -56,11 +69,42 @@ SUCCESS_BG = "#d4edda"
 SUCCESS_FG = "#155724"
 LOG_BG = "#f8f9fa"
 
+# Log records kept in memory for the log view
+LOG_CAPACITY = 10000
+
+# Time ranges offered when exporting the persisted log (label, seconds)
+LOG_EXPORT_RANGES = [
+    ("Last hour", 60 * 60),
+    ("Last 24 hours", 24 * 60 * 60),
+    ("Last 7 days", 7 * 24 * 60 * 60),
+    ("Everything", None),
+]
+
+# Levels offered by the log search filter
+LOG_LEVELS = ["info", "success", "warning", "error", "network", "hyperv",
+              "optimize", "storage", "system", "background"]
+
+# Most records a log search shows
+LOG_SEARCH_LIMIT = 5000
+
+# Zoom windows offered on the Performance tab (label, seconds)
+CHART_ZOOM_WINDOWS = [
+    ("1 minute", 60),
+    ("10 minutes", 10 * 60),
+    ("1 hour", 60 * 60),
+    ("6 hours", 6 * 60 * 60),
+    ("24 hours", 24 * 60 * 60),
+    ("7 days", 7 * 24 * 60 * 60),
+    ("30 days", 30 * 24 * 60 * 60),
+]
+
 # Thread safety lock for UI updates
 ui_lock = threading.Lock()
 
-# Message queue for thread-safe updates
-ui_queue = queue.Queue()
+# Runs UI work posted by background threads on the main thread, in priority
+# lanes (dialogs, status, widget updates, logs); created here so the exception
+# handlers can reach it before the window exists
+ui_dispatcher = UIDispatcher()
 
 # Improved global exception handler to prevent application crashes
 def global_exception_handler(exc_type, exc_value, exc_traceback):
@@ -71,8 +115,8 @@ def global_exception_handler(exc_type, exc_value, exc_traceback):
     print(f"Unhandled exception: {error_msg}")
     # Show error message in dialog if possible, but use queue to avoid threading issues
     try:
-        # Put the error in the queue for the main thread to handle
-        ui_queue.put(("error_dialog", str(exc_value)))
+        # Post the error dialog for the main thread to show
+        ui_dispatcher.post_to(LANE_DIALOG, None, messagebox.showerror, "Error", str(exc_value))
     except:
         # If queue fails, just print to console
         print("Could not queue error dialog")
@@ -159,47 +203,37 @@ def handle_exception(func):
             # Show error message to user through queue to avoid threading issues
             if hasattr(self, 'update_status'):
                 self.update_status(f"Error in {func.__name__}")
-            # Push error dialog to queue
-            ui_queue.put(("error_dialog", f"An unexpected error occurred in {func.__name__}:\n\n{str(e)}"))
+            # Post the error dialog for the main thread to show
+            ui_dispatcher.post_to(LANE_DIALOG, None, messagebox.showerror, "Error",
+                                  f"An unexpected error occurred in {func.__name__}:\n\n{str(e)}")
             print(f"Error in {func.__name__}: {str(e)}")
             return None
     return wrapper
 
-def thread_safe(func):
-    """Decorator for ensuring thread-safe UI updates"""
+def thread_safe(func=None, coalesce=False, lane=LANE_WIDGET):
+    """Decorator for thread-safe UI updates
+
+    Calls from background threads are posted to the UI dispatcher's lane and
+    return None immediately instead of waiting for the main thread. With
+    coalesce=True only the latest pending call is run, for refreshers where
+    intermediate values would be overwritten anyway. Use
+    self.ui_dispatcher.submit() when a worker needs a return value.
+    """
+    if func is None:
+        return lambda f: thread_safe(f, coalesce=coalesce, lane=lane)
+
+    def locked_call(self, *args, **kwargs):
+        with ui_lock:
+            return func(self, *args, **kwargs)
+
     @functools.wraps(func)
     def wrapper(self, *args, **kwargs):
-        if threading.current_thread() is not threading.main_thread():
-            # We're not in the main thread, so we need to use the queue
-            # Create a custom callback to run the function in the main thread
-            result_container = []
-            completion_event = threading.Event()
-            
-            def main_thread_callback():
-                try:
-                    with ui_lock:
-                        result = func(self, *args, **kwargs)
-                        result_container.append(result)
-                except Exception as e:
-                    print(f"Error in thread_safe callback: {str(e)}")
-                finally:
-                    completion_event.set()
-            
-            # Put the callback in the queue
-            ui_queue.put(("callback", main_thread_callback))
-            
-            # Wait for completion with timeout to prevent deadlocks
-            completed = completion_event.wait(timeout=5.0)
-            if not completed:
-                print(f"Warning: Timed out waiting for {func.__name__} to complete in main thread")
-                return None
-                
-            # Return the result if available
-            return result_container[0] if result_container else None
-        else:
+        if threading.current_thread() is threading.main_thread():
             # Already in main thread, just use the lock
-            with ui_lock:
-                return func(self, *args, **kwargs)
+            return locked_call(self, *args, **kwargs)
+        key = func.__name__ if coalesce else None
+        self.ui_dispatcher.post_to(lane, key, locked_call, self, *args, **kwargs)
+        return None
     return wrapper
 
 class SystemUtilities:
@@ -210,6 +244,9 @@ class SystemUtilities:
         self.root = root
         self.root.title("Windows System Utilities")
         
+        # Runs UI updates posted by background threads without blocking them
+        self.ui_dispatcher = ui_dispatcher
+        
         # Make window open in fullscreen by default
         self.root.state('zoomed')  # For Windows, this maximizes the window
         
@@ -314,15 +351,20 @@ class SystemUtilities:
         self.background_monitoring = True
         self.show_verbose_logs = True
         
-        # Initialize data for real-time monitoring
-        self.monitor_data = {
-            'times': [],
-            'cpu': [],
-            'memory': [],
-            'disk': [],
-            'network': []
-        }
-        self.max_data_points = 60  # Max data points to show in charts
+        # Initialize data for real-time monitoring: raw samples for 10 minutes,
+        # 10 second rollups for 24 hours and 1 minute rollups for 30 days
+        self.monitor_data = TieredMetricsStore(['cpu', 'memory', 'disk', 'network'])
+        self.chart_window = CHART_ZOOM_WINDOWS[0][1]  # Seconds shown in charts
+        
+        # Headless collectors; the dashboard is just one consumer of their records.
+        # The sampler takes one snapshot per tick that every widget reads from.
+        self.system_sampler = SystemSampler(include_processes=True)
+        # Per-interface and per-process network rates, sampled on the throughput collector's thread
+        self.throughput_engine = ThroughputEngine()
+        self.network_utilization = float('nan')
+        self.metrics_engine = MetricsEngine(default_collectors(self.system_sampler, self.throughput_engine))
+        self.metrics_engine.add_listener(self._on_metrics_record)
+        self.metrics_engine.add_alert_listener(self._on_metrics_alert)
         
         # Keep track of the figures to properly close them later
         self.figures = []
@@ -330,8 +372,8 @@ class SystemUtilities:
         # Track active threads for proper cleanup
         self.active_threads = weakref.WeakSet()
         
-        # Process UI queue periodically
-        self.process_ui_queue()
+        # Run dispatched UI updates on every tick of the Tk event loop
+        self.ui_dispatcher.start(root)
         
         # Show a welcome message
         self.log("System Utilities initialized successfully", "info")
@@ -355,51 +397,15 @@ class SystemUtilities:
         # Set reduced update frequency for better performance
         self.update_frequency = 2000  # milliseconds
     
-    def process_ui_queue(self):
-        """Process any pending UI updates from the queue"""
-        try:
-            # Process all available messages
-            for _ in range(100):  # Process up to 100 messages at once to prevent blocking
-                try:
-                    message = ui_queue.get_nowait()
-                    if message:
-                        msg_type, msg_data = message
-                        
-                        if msg_type == "error_dialog":
-                            # Show error dialog
-                            messagebox.showerror("Error", msg_data)
-                        elif msg_type == "info_dialog":
-                            # Show info dialog
-                            messagebox.showinfo("Information", msg_data)
-                        elif msg_type == "warning_dialog":
-                            # Show warning dialog
-                            messagebox.showwarning("Warning", msg_data)
-                        elif msg_type == "status_update":
-                            # Update status bar
-                            self.status_bar.config(text=msg_data)
-                        elif msg_type == "log":
-                            # Add to log
-                            level, text = msg_data
-                            self._direct_log(text, level)
-                        elif msg_type == "callback":
-                            # Execute callback function
-                            callback_func = msg_data
-                            callback_func()
-                            
-                    ui_queue.task_done()
-                except queue.Empty:
-                    break
-                except Exception as e:
-                    print(f"Error processing UI queue message: {str(e)}")
-        finally:
-            # Schedule the next check
-            if hasattr(self, 'root') and self.root.winfo_exists():
-                self.root.after(100, self.process_ui_queue)
-    
     def on_close(self):
         """Handle window close event"""
         # Stop background monitoring
         self.background_monitoring = False
+        self.metrics_engine.stop(timeout=0)
+        self.ui_dispatcher.stop()
+        self.log_sink.close(timeout=2)
+        self.log_index.close()
+        get_default_pool().close()
         
         # Close matplotlib figures to prevent memory leaks
         import matplotlib.pyplot as plt
@@ -517,22 +523,77 @@ class SystemUtilities:
         network_frame = ttk.LabelFrame(bottom_frame, text="Network Activity", padding=8, style='Group.TLabelframe')
         network_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=5)
         
-        # Network activity display (text widget with auto-update)
-        self.network_text = tk.Text(network_frame, wrap=tk.WORD, height=8, width=30, 
-                                  font=NORMAL_FONT, bg=LOG_BG)
-        self.network_text.pack(fill=tk.BOTH, expand=True)
-        self.network_text.config(state=tk.DISABLED)
+        # Totals, connection count and a sparkline of the recent total rate
+        self.network_summary_label = ttk.Label(network_frame, text="Measuring network rates...", font=NORMAL_FONT)
+        self.network_summary_label.pack(fill=tk.X, pady=(0, 5))
+        
+        # Per-interface rates (treeview); rows are keyed by interface name and updated in place
+        self.interface_table = InterfaceTable(self.throughput_engine)
+        self.interface_tree = ttk.Treeview(network_frame, columns=InterfaceTable.COLUMNS, 
+                                          show="headings", height=3)
+        self.interface_tree.pack(fill=tk.BOTH, expand=True)
+        for column, heading, width in (
+            ("interface", "Interface", 100),
+            ("recv", "Down", 70),
+            ("sent", "Up", 70),
+            ("packets", "Pkt/s", 70),
+            ("errors", "Errors", 50),
+            ("drops", "Drops", 50),
+            ("trend", "Trend", 110),
+        ):
+            self.interface_tree.heading(column, text=heading,
+                                        command=lambda column=column: self.sort_interface_table(column))
+            self.interface_tree.column(column, width=width)
+        
+        # Estimated per-process usage; refreshed every few seconds by the engine
+        ttk.Label(network_frame, text="Top processes (estimated):", font=NORMAL_FONT).pack(anchor=tk.W, pady=(5, 0))
+        self.network_process_table = NetworkProcessTable(limit=5)
+        self.network_process_tree = ttk.Treeview(network_frame, columns=NetworkProcessTable.COLUMNS, 
+                                                show="headings", height=3)
+        self.network_process_tree.pack(fill=tk.BOTH, expand=True)
+        for column, heading, width in (
+            ("name", "Name", 110),
+            ("pid", "PID", 50),
+            ("recv", "Down", 70),
+            ("sent", "Up", 70),
+            ("connections", "Conns", 50),
+        ):
+            self.network_process_tree.heading(column, text=heading,
+                                              command=lambda column=column: self.sort_network_process_table(column))
+            self.network_process_tree.column(column, width=width)
         
         # Process info frame
         process_frame = ttk.LabelFrame(bottom_frame, text="Active Processes", padding=8, style='Group.TLabelframe')
         process_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5)
         
+        # Filter and row limit controls
+        controls_frame = ttk.Frame(process_frame)
+        controls_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(controls_frame, text="Filter:", font=NORMAL_FONT).pack(side=tk.LEFT)
+        self.process_filter_var = tk.StringVar()
+        self.process_filter_var.trace_add("write", lambda *args: self.on_process_view_changed())
+        ttk.Entry(controls_frame, textvariable=self.process_filter_var, width=15).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Label(controls_frame, text="Show:", font=NORMAL_FONT).pack(side=tk.LEFT)
+        self.process_limit_var = tk.StringVar(value="Top 10")
+        limit_combo = ttk.Combobox(
+            controls_frame,
+            textvariable=self.process_limit_var,
+            values=["Top 10", "Top 50", "Top 200", "All"],
+            state="readonly",
+            width=8
+        )
+        limit_combo.pack(side=tk.LEFT, padx=5)
+        limit_combo.bind("<<ComboboxSelected>>", lambda event: self.on_process_view_changed())
+        
         # Create a frame for the treeview and scrollbar
         tree_frame = ttk.Frame(process_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True)
         
-        # Process list (treeview)
-        self.process_tree = ttk.Treeview(tree_frame, columns=("pid", "cpu", "memory"), 
+        # Process list (treeview); rows are keyed by pid and updated in place
+        self.process_table = ProcessTable(limit=10, sort_by='cpu')
+        self.process_tree = ttk.Treeview(tree_frame, columns=ProcessTable.COLUMNS, 
                                         show="headings", height=6)
         self.process_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
@@ -541,14 +602,17 @@ class SystemUtilities:
         process_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.process_tree.configure(yscrollcommand=process_scrollbar.set)
         
-        # Configure treeview columns
-        self.process_tree.heading("pid", text="PID")
-        self.process_tree.heading("cpu", text="CPU %")
-        self.process_tree.heading("memory", text="Memory")
-        
-        self.process_tree.column("pid", width=50)
-        self.process_tree.column("cpu", width=50)
-        self.process_tree.column("memory", width=80)
+        # Configure treeview columns; clicking a heading sorts by it
+        for column, heading, width in (
+            ("name", "Name", 120),
+            ("pid", "PID", 50),
+            ("cpu", "CPU %", 50),
+            ("memory", "Memory", 80),
+            ("io", "I/O", 80),
+        ):
+            self.process_tree.heading(column, text=heading,
+                                      command=lambda column=column: self.sort_process_table(column))
+            self.process_tree.column(column, width=width)
     
     def create_performance_dashboard(self):
         """Create the performance dashboard with charts"""
@@ -598,8 +662,8 @@ class SystemUtilities:
         self.disk_canvas = FigureCanvasTkAgg(self.disk_figure, disk_frame)
         self.disk_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
-        # Create network activity chart
-        network_frame = ttk.LabelFrame(bottom_frame, text="Network Activity", padding=8, style='Group.TLabelframe')
+        # Create network chart (busier direction as a share of the link speed)
+        network_frame = ttk.LabelFrame(bottom_frame, text="Network Utilization", padding=8, style='Group.TLabelframe')
         network_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=(5,0))
         
         self.network_figure = Figure(figsize=(3, 2), dpi=100)
@@ -607,6 +671,39 @@ class SystemUtilities:
         self.network_canvas = FigureCanvasTkAgg(self.network_figure, network_frame)
         self.network_canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
+        # Build the axes and artists once; frames only update their data
+        self.chart_renderers = {}
+        for name, figure, canvas, plot, color in (
+            ('cpu', self.cpu_figure, self.cpu_canvas, self.cpu_plot, PRIMARY_COLOR),
+            ('memory', self.memory_figure, self.memory_canvas, self.memory_plot, SECONDARY_COLOR),
+            ('disk', self.disk_figure, self.disk_canvas, self.disk_plot, ACCENT_COLOR),
+            ('network', self.network_figure, self.network_canvas, self.network_plot, "#9B59B6"),
+        ):
+            renderer = BlitRenderer(canvas, figure)
+            renderer.add_band('band', plot, facecolor=color, alpha=0.2, linewidth=0)
+            renderer.add_line('line', plot, color=color)
+            plot.set_ylim(0, 100)
+            plot.set_xlim(-self.chart_window / 60, 0)
+            self.chart_renderers[name] = (renderer, plot)
+        self.cpu_plot.set_ylabel('Percent')
+        self.memory_plot.set_ylabel('Percent')
+        self.network_plot.set_ylabel('Link %')
+        
+        # Zoom window selector, each window is drawn from the matching retention tier
+        zoom_frame = ttk.Frame(frame, style='TFrame')
+        zoom_frame.pack(pady=5)
+        ttk.Label(zoom_frame, text="Show last:", font=NORMAL_FONT).pack(side=tk.LEFT, padx=(0, 5))
+        self.chart_zoom_var = tk.StringVar(value=CHART_ZOOM_WINDOWS[0][0])
+        zoom_combo = ttk.Combobox(
+            zoom_frame,
+            textvariable=self.chart_zoom_var,
+            values=[label for label, _ in CHART_ZOOM_WINDOWS],
+            state="readonly",
+            width=12
+        )
+        zoom_combo.pack(side=tk.LEFT)
+        zoom_combo.bind("<<ComboboxSelected>>", self.on_chart_zoom_changed)
+        
         # Auto-refresh checkbox
         self.auto_refresh_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(
@@ -618,11 +715,65 @@ class SystemUtilities:
         # Manual refresh button
         refresh_btn = ttk.Button(frame, text="Refresh Now", command=lambda: self.update_dashboard(force=True))
         refresh_btn.pack(pady=5)
+        
+        # Chart rendering and sampling cost
+        self.render_cost_label = ttk.Label(frame, text="Chart rendering: -", font=DESCRIPTION_FONT)
+        self.render_cost_label.pack(pady=(0, 5))
+        self.sampler_cost_label = ttk.Label(frame, text="Sampling: -", font=DESCRIPTION_FONT)
+        self.sampler_cost_label.pack(pady=(0, 5))
+        self.ui_queue_label = ttk.Label(frame, text="UI queue: -", font=DESCRIPTION_FONT)
+        self.ui_queue_label.pack(pady=(0, 5))
     
     def create_log_area(self):
         """Create the log area in the log tab"""
-        self.log_text = scrolledtext.ScrolledText(self.log_frame, wrap=tk.WORD, font=LOG_FONT, state=tk.DISABLED)
-        self.log_text.pack(fill=tk.BOTH, expand=True)
+        # Search panel over the indexed log history
+        search_frame = ttk.Frame(self.log_frame)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        
+        self.log_search_var = tk.StringVar()
+        search_entry = ttk.Entry(search_frame, textvariable=self.log_search_var, width=30)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind("<Return>", lambda event: self.search_log())
+        
+        self.log_search_regex = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Regex", variable=self.log_search_regex).pack(side=tk.LEFT, padx=5)
+        
+        self.log_search_level = ttk.Combobox(search_frame, state="readonly", width=12,
+                                             values=["All levels"] + LOG_LEVELS)
+        self.log_search_level.current(0)
+        self.log_search_level.pack(side=tk.LEFT, padx=5)
+        
+        self.log_search_range = ttk.Combobox(search_frame, state="readonly", width=14,
+                                             values=[label for label, _ in LOG_EXPORT_RANGES])
+        self.log_search_range.current(len(LOG_EXPORT_RANGES) - 1)
+        self.log_search_range.pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(search_frame, text="Search", command=self.search_log).pack(side=tk.LEFT, padx=5)
+        ttk.Button(search_frame, text="Live Log", command=self.show_live_log).pack(side=tk.LEFT, padx=5)
+        
+        self.log_search_label = ttk.Label(self.log_frame, text="", font=DESCRIPTION_FONT)
+        self.log_search_label.pack(fill=tk.X, padx=5)
+        
+        # Records live in a bounded ring buffer; the view renders only the visible lines
+        self.log_buffer = LogBuffer(capacity=LOG_CAPACITY)
+        self.log_view = VirtualLogView(self.log_frame, self.log_buffer, font=LOG_FONT)
+        self.log_view.pack(fill=tk.BOTH, expand=True)
+        self.log_text = self.log_view.text
+        
+        # Every record is also persisted by a background writer thread, which
+        # feeds each written batch to the search index
+        self.log_sink = AsyncLogSink(compress=True)
+        self.log_index = LogIndex()
+        indexed_until = self.log_index.last_timestamp()
+        self.log_sink.add_listener(self.log_index.add)
+        
+        # Index whatever was persisted but not indexed (e.g. after a crash)
+        def catch_up():
+            try:
+                self.log_index.catch_up(read_records(self.log_sink.path, start=indexed_until))
+            except Exception as e:
+                print(f"Error indexing log history: {e}")
+        Thread(target=catch_up, daemon=True).start()
         
         # Create a tag for each log level
         self.log_text.tag_configure("info", foreground="black")
@@ -645,9 +796,6 @@ class SystemUtilities:
         # Create a tag for the log message
         self.log_text.tag_configure("message", font=LOG_FONT)
         
-        # Create a tag for the separator line
-        self.log_text.tag_configure("separator", foreground="#CCCCCC")
-        
         # Create button frame below the log area
         log_button_frame = ttk.Frame(self.log_frame)
         log_button_frame.pack(fill=tk.X, pady=5)
@@ -656,117 +804,112 @@ class SystemUtilities:
         clear_log_btn = ttk.Button(log_button_frame, text="Clear Log", command=self.clear_log)
         clear_log_btn.pack(side=tk.LEFT, padx=5)
         
-        # Save log button
+        # Save log button, exporting the persisted log over the chosen range
         save_log_btn = ttk.Button(log_button_frame, text="Save Log", command=self.save_log)
         save_log_btn.pack(side=tk.LEFT, padx=5)
+        self.log_export_range = ttk.Combobox(log_button_frame, state="readonly", width=14,
+                                             values=[label for label, _ in LOG_EXPORT_RANGES])
+        self.log_export_range.current(0)
+        self.log_export_range.pack(side=tk.LEFT, padx=5)
     
-    @thread_safe
     def log(self, message, level="info"):
         """Log a message to the log area (thread-safe)"""
-        # If not on main thread, use queue
-        if threading.current_thread() is not threading.main_thread():
-            ui_queue.put(("log", (level, message)))
-            return
-        
-        # Direct logging if on main thread
-        self._direct_log(message, level)
-    
-    def _direct_log(self, message, level="info"):
-        """Direct logging implementation (should only be called from main thread)"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        formatted_message = f"[{timestamp}] [{level.upper()}] {message}\n"
-        
-        # Insert the message with the appropriate tag
-        self.log_text.configure(state=tk.NORMAL)
-        self.log_text.insert(tk.END, formatted_message, (level, "timestamp", "level", "message"))
-        self.log_text.insert(tk.END, "-" * 50 + "\n", "separator")
-        self.log_text.configure(state=tk.DISABLED)
-        
-        # Autoscroll to the end
-        self.log_text.see(tk.END)
-        
-        # If too many lines, trim the log
-        if self.log_text.index('end-1c linestart') > '5000.0':
-            self.log_text.configure(state=tk.NORMAL)
-            self.log_text.delete('1.0', '1000.0')
-            self.log_text.configure(state=tk.DISABLED)
+        # Appending is cheap and safe from any thread; the view catches up on
+        # the next dispatcher tick with a single render, however many lines arrived
+        record = self.log_buffer.append(message, level)
+        self.log_sink.write(record)
+        self.ui_dispatcher.post_to(LANE_LOG, 'log_view', self.log_view.refresh)
     
     def clear_log(self):
         """Clear the log area"""
-        self.log_text.configure(state=tk.NORMAL)
-        self.log_text.delete(1.0, tk.END)
+        self.log_buffer.clear()
         self.log("Log cleared", "info")
     
     def save_log(self):
-        """Save the log to a file"""
-        try:
-            # Get the log content
-            self.log_text.configure(state=tk.NORMAL)
-            log_content = self.log_text.get(1.0, tk.END)
-            self.log_text.configure(state=tk.DISABLED)
-            
-            # Ask for a file name
-            file_path = filedialog.asksaveasfilename(
-                initialdir=os.path.expanduser("~"),
-                title="Save Log",
-                defaultextension=".log",
-                filetypes=[("Log Files", "*.log"), ("Text Files", "*.txt"), ("All Files", "*.*")]
-            )
-            
-            if file_path:
-                # Write the log to the file
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(log_content)
-                
-                self.log(f"Log saved to {file_path}", "success")
+        """Export the persisted log over the selected time range to a file"""
+        label, seconds = LOG_EXPORT_RANGES[self.log_export_range.current()]
+        
+        # Ask for a file name
+        file_path = filedialog.asksaveasfilename(
+            initialdir=os.path.expanduser("~"),
+            title=f"Save Log ({label})",
+            defaultextension=".log",
+            filetypes=[("Log Files", "*.log"), ("Text Files", "*.txt"), ("All Files", "*.*")]
+        )
+        if not file_path:
+            return
+        
+        start = time.time() - seconds if seconds is not None else None
+        
+        def export():
+            try:
+                # Make sure records still queued for the writer are on disk first
+                self.log_sink.flush()
+                count = export_log(file_path, self.log_sink.path, start=start)
+                self.log(f"Log saved to {file_path} ({count} entries, {label.lower()})", "success")
                 self.update_status(f"Log saved to {file_path}")
-        except Exception as e:
-            self.log(f"Error saving log: {str(e)}", "error")
-            self.update_status("Error saving log")
+            except Exception as e:
+                self.log(f"Error saving log: {str(e)}", "error")
+                self.update_status("Error saving log")
+        
+        # Reading rotated (and compressed) files can take a while, keep it off the UI thread
+        self.executor.submit(export)
+    
+    def search_log(self):
+        """Search the indexed log history and show the matches in the log view"""
+        text = self.log_search_var.get().strip()
+        regex = self.log_search_regex.get()
+        level_index = self.log_search_level.current()
+        levels = [LOG_LEVELS[level_index - 1]] if level_index > 0 else None
+        _, seconds = LOG_EXPORT_RANGES[self.log_search_range.current()]
+        start = time.time() - seconds if seconds is not None else None
+        self.log_search_label.config(text="Searching...")
+        
+        def search():
+            try:
+                result = self.log_index.search(text=text or None, regex=regex, levels=levels,
+                                               start=start, limit=LOG_SEARCH_LIMIT)
+            except re.error as e:
+                self.ui_dispatcher.post(self.log_search_label.config, text=f"Invalid regular expression: {e}")
+                return
+            except sqlite3.Error as e:
+                # e.g. "database is locked"; without this the label would stay on "Searching..."
+                self.ui_dispatcher.post(self.log_search_label.config, text=f"Search failed: {e}")
+                return
+            self.ui_dispatcher.post(self._show_log_search_results, result)
+        
+        self.executor.submit(search)
+    
+    def _show_log_search_results(self, result):
+        """Swap the log view over to a buffer of search results"""
+        results = LogBuffer(capacity=max(1, len(result.records)))
+        for record in result.records:
+            results.append(record.message, record.level, record.timestamp)
+        self.log_view.set_buffer(results)
+        
+        shown = f" (newest {len(result.records)} shown)" if result.truncated else ""
+        # Short text can't use the search index, so only recent records were searched
+        partial = ", recent records only - use 3 or more plain characters to search all" if result.partial else ""
+        self.log_search_label.config(
+            text=f"{len(result.records)} matches in {result.elapsed_ms:.0f} ms{shown}{partial} - press Live Log to return"
+        )
     
-    @thread_safe
+    def show_live_log(self):
+        """Return the log view to the live log"""
+        self.log_view.set_buffer(self.log_buffer)
+        self.log_search_label.config(text="")
+    
+    @thread_safe(coalesce=True, lane=LANE_STATUS)
     def update_status(self, message):
         """Update the status bar with a message (thread-safe)"""
-        if threading.current_thread() is not threading.main_thread():
-            ui_queue.put(("status_update", message))
-            return
         self.status_bar.config(text=message)
     
     def start_background_monitoring(self):
         """Start background monitoring threads"""
         self.log("Starting background system monitoring...", "background")
         
-        # Start system metrics collection in a separate thread
-        def system_metrics_collector():
-            try:
-                while self.background_monitoring and hasattr(self, 'root') and self.root.winfo_exists():
-                    try:
-                        # Collect system metrics
-                        self._collect_system_metrics()
-                        # Sleep between collections
-                        time.sleep(1)
-                    except Exception as e:
-                        print(f"Error in system metrics collector: {str(e)}")
-                        time.sleep(2)  # Sleep a bit longer on error
-            except Exception as e:
-                print(f"System metrics collector thread died: {str(e)}")
-        
-        metrics_thread = Thread(target=system_metrics_collector)
-        metrics_thread.daemon = True
-        self.active_threads.add(metrics_thread)
-        metrics_thread.start()
-        
-        # Start network monitoring thread (less frequent)
-        network_thread = Thread(target=self._monitor_network_activity)
-        network_thread.daemon = True
-        self.active_threads.add(network_thread)
-        network_thread.start()
-        
-        # Start Hyper-V monitoring thread (if applicable)
-        hyperv_thread = Thread(target=self._monitor_hyperv_status)
-        hyperv_thread.daemon = True
-        self.active_threads.add(hyperv_thread)
-        hyperv_thread.start()
+        # System, network and Hyper-V collectors each sample on their own thread
+        self.metrics_engine.start()
         
         # Schedule first dashboard update
         self.root.after(2000, lambda: self.update_dashboard(first_time=True))
@@ -777,53 +920,12 @@ class SystemUtilities:
             return
             
         try:
-            # Get CPU and memory usage
-            cpu_percent = psutil.cpu_percent(interval=0)  # Non-blocking
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            
-            # Update CPU usage display
-            self.cpu_progressbar['value'] = cpu_percent
-            self.cpu_usage_label.config(text=f"{cpu_percent}%")
+            # Every widget reads the snapshot taken by the sampler this tick
+            snapshot = self.system_sampler.latest
+            if snapshot is not None:
+                self._show_system_indicators(snapshot)
             
-            # Update memory usage display
-            self.memory_progressbar['value'] = memory_percent
-            self.memory_usage_label.config(text=f"{memory_percent}%")
-            
-            # Update disk usage less frequently (every 10 seconds)
-            current_time = time.time()
-            if not hasattr(self, '_last_disk_check') or current_time - self._last_disk_check > 10:
-                try:
-                    disk = psutil.disk_usage('/')
-                    disk_percent = disk.percent
-                    self.disk_progressbar['value'] = disk_percent
-                    self.disk_usage_label.config(text=f"{disk_percent}%")
-                    self._last_disk_check = current_time
-                except Exception as e:
-                    print(f"Error getting disk usage: {e}")
-            
-            # Update uptime less frequently (every minute)
-            if not hasattr(self, '_last_uptime_check') or current_time - self._last_uptime_check > 60:
-                try:
-                    boot_time = psutil.boot_time()
-                    uptime = current_time - boot_time
-                    uptime_str = str(timedelta(seconds=int(uptime)))
-                    self.uptime_label.config(text=f"Uptime: {uptime_str}")
-                    self._last_uptime_check = current_time
-                except Exception as e:
-                    print(f"Error updating uptime: {e}")
-            
-            # Add data to monitor arrays
-            current_time_str = datetime.now().strftime('%H:%M:%S')
-            self.monitor_data['times'].append(current_time_str)
-            self.monitor_data['cpu'].append(cpu_percent)
-            self.monitor_data['memory'].append(memory_percent)
-            
-            # Keep arrays at a reasonable size
-            if len(self.monitor_data['times']) > self.max_data_points:
-                self.monitor_data['times'] = self.monitor_data['times'][-self.max_data_points:]
-                self.monitor_data['cpu'] = self.monitor_data['cpu'][-self.max_data_points:]
-                self.monitor_data['memory'] = self.monitor_data['memory'][-self.max_data_points:]
+            # Chart history is recorded by the background metrics collector
             
             # Only update these components conditionally to avoid freezing
             current_dashboard_tab = self.dashboard_tabs.tab(self.dashboard_tabs.select(), "text")
@@ -831,8 +933,9 @@ class SystemUtilities:
             # Update process list only when on Overview tab
             if current_dashboard_tab == "Overview" or force:
                 try:
-                    self.update_process_list()
-                    self.update_network_info()
+                    if snapshot is not None:
+                        self.update_process_list(snapshot)
+                        self.update_network_info(snapshot)
                 except Exception as e:
                     print(f"Error updating overview components: {e}")
             
@@ -851,227 +954,169 @@ class SystemUtilities:
         if hasattr(self, 'auto_refresh_var') and self.auto_refresh_var.get():
             self.root.after(2000, self.update_dashboard)
     
+    def on_chart_zoom_changed(self, event=None):
+        """Switch the performance charts to the selected zoom window"""
+        self.chart_window = dict(CHART_ZOOM_WINDOWS).get(self.chart_zoom_var.get(), CHART_ZOOM_WINDOWS[0][1])
+        resolution = self.monitor_data.tier_for(self.chart_window)
+        self.log(f"Performance charts now show the last {self.chart_zoom_var.get()} "
+                 f"({resolution}s resolution)", "info")
+        
+        # New axis limits change the static background, so redraw it once
+        for renderer, plot in self.chart_renderers.values():
+            plot.set_xlim(-self.chart_window / 60, 0)
+            renderer.invalidate()
+        self._last_chart_update = 0
+        self.update_performance_charts()
+    
+    def _render_metric(self, name):
+        """Draw one chart frame for a series over the current zoom window"""
+        renderer, plot = self.chart_renderers[name]
+        now = time.time()
+        times, mins, avgs, maxs = self.monitor_data.query(name, self.chart_window)
+        
+        # Minutes before now, so every tier shares the same x axis
+        x_values = [(timestamp - now) / 60 for timestamp in times]
+        # Rollup tiers also carry the min/max range of each bucket
+        band = (x_values, mins, maxs) if mins is not avgs else ((), (), ())
+        renderer.update(lines={'line': (x_values, avgs)}, bands={'band': band})
+    
     def update_performance_charts(self):
         """Update all performance charts with new data"""
         try:
             # Only update if we have data
-            if not self.monitor_data['times'] or len(self.monitor_data['times']) < 2:
+            if len(self.monitor_data) < 2:
                 return
             
-            # Update CPU chart
-            self.cpu_plot.clear()
-            self.cpu_plot.plot(range(len(self.monitor_data['cpu'])), 
-                              self.monitor_data['cpu'], 
-                              color=PRIMARY_COLOR)
-            self.cpu_plot.set_ylim(0, 100)
-            self.cpu_plot.set_ylabel('Percent')
-            self.cpu_figure.tight_layout()
-            try:
-                # Draw idle to prevent blocking
-                self.cpu_canvas.draw_idle()
-            except:
-                pass
-            
-            # Update Memory chart
-            self.memory_plot.clear()
-            self.memory_plot.plot(range(len(self.monitor_data['memory'])), 
-                                 self.monitor_data['memory'], 
-                                 color=SECONDARY_COLOR)
-            self.memory_plot.set_ylim(0, 100)
-            self.memory_plot.set_ylabel('Percent')
-            self.memory_figure.tight_layout()
-            try:
-                self.memory_canvas.draw_idle()
-            except:
-                pass
+            self._render_metric('cpu')
+            self._render_metric('memory')
             
             # Update other charts only occasionally to reduce CPU usage
             current_time = time.time()
             if not hasattr(self, '_last_chart_update') or current_time - self._last_chart_update > 5:
-                # Update Disk and Network charts
-                try:
-                    # Disk chart
-                    self.disk_plot.clear()
-                    self.disk_plot.plot(range(len(self.monitor_data['disk'])), 
-                                      self.monitor_data['disk'], 
-                                      color=ACCENT_COLOR)
-                    self.disk_plot.set_ylim(0, 100)
-                    self.disk_figure.tight_layout()
-                    self.disk_canvas.draw_idle()
-                    
-                    # Network chart
-                    self.network_plot.clear()
-                    self.network_plot.plot(range(len(self.monitor_data['network'])), 
-                                         self.monitor_data['network'], 
-                                         color="#9B59B6")
-                    self.network_plot.set_ylim(0, 100)
-                    self.network_figure.tight_layout()
-                    self.network_canvas.draw_idle()
-                    
-                    self._last_chart_update = current_time
-                except:
-                    pass
+                self._render_metric('disk')
+                self._render_metric('network')
+                self._last_chart_update = current_time
+            
+            # Report what the charts cost per frame
+            stats = [renderer.stats() for renderer, _ in self.chart_renderers.values()]
+            avg_ms = sum(stat['avg_ms'] for stat in stats)
+            max_ms = max(stat['max_ms'] for stat in stats)
+            full_redraws = sum(stat['full_redraws'] for stat in stats)
+            self.render_cost_label.config(
+                text=f"Chart rendering: {avg_ms:.1f} ms per refresh, {max_ms:.1f} ms slowest chart, "
+                     f"{full_redraws} full redraws"
+            )
+            
+            # Report what one sampler tick costs
+            snapshot = self.system_sampler.latest
+            if snapshot is not None:
+                sampler_stats = self.system_sampler.stats()
+                self.sampler_cost_label.config(
+                    text=f"Sampling: {snapshot.calls} psutil calls, {snapshot.elapsed * 1000:.1f} ms last tick "
+                         f"(avg {sampler_stats['avg_calls']:.0f} calls, {sampler_stats['avg_ms']:.1f} ms)"
+                )
+            
+            # Show when the UI thread falls behind the updates posted to it
+            queue_stats = self.ui_dispatcher.stats()
+            lanes = queue_stats['lanes']
+            self.ui_queue_label.config(
+                text=f"UI queue: {queue_stats['depth']} pending, "
+                     f"status {lanes['status']['max_latency_ms']:.0f} ms, "
+                     f"widgets {lanes['widget']['max_latency_ms']:.0f} ms, "
+                     f"logs {lanes['log']['max_latency_ms']:.0f} ms max latency, "
+                     f"{queue_stats['behind_ticks']} ticks over budget"
+            )
             
         except Exception as e:
             print(f"Error updating charts: {e}")
     
-    def update_process_list(self):
+    def update_process_list(self, snapshot):
         """Update the process list in the system overview"""
         try:
-            # Clear the current process list
-            for item in self.process_tree.get_children():
-                self.process_tree.delete(item)
-            
-            # Get top processes by CPU usage
-            processes = []
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info']):
-                try:
-                    info = proc.info
-                    if info['cpu_percent'] > 0:  # Only track active processes
-                        processes.append((
-                            proc.name(),
-                            info['pid'],
-                            info['cpu_percent'],
-                            info['memory_info'].rss / (1024 * 1024)  # MB
-                        ))
-                except:
-                    continue
-            
-            # Sort and display only top processes
-            processes.sort(key=lambda x: x[2], reverse=True)
-            for name, pid, cpu, memory in processes[:10]:  # Show top 10
-                self.process_tree.insert('', 'end', values=(
-                    f"{pid}",
-                    f"{cpu:.1f}",
-                    f"{memory:.1f} MB"
-                ), text=name)
+            # The sampler gathered the processes off the UI thread; only changed
+            # rows and cells are touched here
+            apply_to_treeview(self.process_tree, self.process_table.update(snapshot))
         
         except Exception as e:
             print(f"Error updating process list: {e}")
     
-    def _collect_system_metrics(self):
-        """Collect system metrics in background thread"""
+    def on_process_view_changed(self):
+        """Re-apply the process filter and row limit without sampling again"""
+        limit = self.process_limit_var.get()
+        self.process_table.limit = None if limit == "All" else int(limit.split()[-1])
+        self.process_table.filter_text = self.process_filter_var.get().strip()
         try:
-            # Get CPU and memory usage
-            cpu_percent = psutil.cpu_percent()
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            
-            # Add data to monitor data arrays with thread safety
-            current_time = datetime.now().strftime('%H:%M:%S')
-            
-            with ui_lock:
-                self.monitor_data['times'].append(current_time)
-                self.monitor_data['cpu'].append(cpu_percent)
-                self.monitor_data['memory'].append(memory_percent)
-                
-                # Keep only the last max_data_points in each array
-                if len(self.monitor_data['times']) > self.max_data_points:
-                    self.monitor_data['times'] = self.monitor_data['times'][-self.max_data_points:]
-                    self.monitor_data['cpu'] = self.monitor_data['cpu'][-self.max_data_points:]
-                    self.monitor_data['memory'] = self.monitor_data['memory'][-self.max_data_points:]
-            
-            # Get disk I/O for disk activity chart
-            try:
-                disk_io = psutil.disk_io_counters()
-                if hasattr(self, 'prev_disk_io'):
-                    read_mb = (disk_io.read_bytes - self.prev_disk_io.read_bytes) / (1024 * 1024)
-                    write_mb = (disk_io.write_bytes - self.prev_disk_io.write_bytes) / (1024 * 1024)
-                    
-                    # Cap at 100 for chart display
-                    disk_activity = min(100, (read_mb + write_mb) * 5)
-                    
-                    with ui_lock:
-                        self.monitor_data['disk'].append(disk_activity)
-                        
-                        # Keep only max_data_points
-                        if len(self.monitor_data['disk']) > self.max_data_points:
-                            self.monitor_data['disk'] = self.monitor_data['disk'][-self.max_data_points:]
-                else:
-                    # First-time initialization
-                    with ui_lock:
-                        self.monitor_data['disk'] = [0] * min(len(self.monitor_data['times']), self.max_data_points)
-                
-                self.prev_disk_io = disk_io
-            except:
-                # If disk I/O monitoring fails, add a zero
-                with ui_lock:
-                    self.monitor_data['disk'].append(0)
-                    if len(self.monitor_data['disk']) > self.max_data_points:
-                        self.monitor_data['disk'] = self.monitor_data['disk'][-self.max_data_points:]
-            
-            # Get network I/O for network activity chart
-            try:
-                net_io = psutil.net_io_counters()
-                if hasattr(self, 'prev_net_io'):
-                    sent_mb = (net_io.bytes_sent - self.prev_net_io.bytes_sent) / (1024 * 1024)
-                    recv_mb = (net_io.bytes_recv - self.prev_net_io.bytes_recv) / (1024 * 1024)
-                    
-                    # Cap at 100 for chart display
-                    network_activity = min(100, (sent_mb + recv_mb) * 10)
-                    
-                    with ui_lock:
-                        self.monitor_data['network'].append(network_activity)
-                        
-                        # Keep only max_data_points
-                        if len(self.monitor_data['network']) > self.max_data_points:
-                            self.monitor_data['network'] = self.monitor_data['network'][-self.max_data_points:]
-                else:
-                    # First-time initialization
-                    with ui_lock:
-                        self.monitor_data['network'] = [0] * min(len(self.monitor_data['times']), self.max_data_points)
-                
-                self.prev_net_io = net_io
-            except:
-                # If network I/O monitoring fails, add a zero
-                with ui_lock:
-                    self.monitor_data['network'].append(0)
-                    if len(self.monitor_data['network']) > self.max_data_points:
-                        self.monitor_data['network'] = self.monitor_data['network'][-self.max_data_points:]
+            apply_to_treeview(self.process_tree, self.process_table.refresh())
+        except Exception as e:
+            print(f"Error updating process list: {e}")
+    
+    def sort_process_table(self, column):
+        """Sort the process list by a column"""
+        self.process_table.sort_by = column
+        self.on_process_view_changed()
+    
+    def _on_metrics_record(self, record):
+        """Store system samples from the metrics engine (called on its threads)"""
+        if record['source'] == 'throughput':
+            # Link utilization is a real percentage; NaN (a chart gap) when no link speed is known
+            utilization = record['utilization']
+            self.network_utilization = float('nan') if utilization is None else utilization
+            return
+        if record['source'] != 'system' or not self.background_monitoring:
+            return
+        try:
+            # Scale disk throughput to the 0-100 range of the activity charts
+            disk_mb = (record['disk_read_bps'] + record['disk_write_bps']) / (1024 * 1024)
+            
+            # One O(1) append per series, rollups are updated incrementally
+            self.monitor_data.append(
+                timestamp=record['timestamp'],
+                cpu=record['cpu_percent'],
+                memory=record['memory_percent'],
+                disk=min(100, disk_mb * 5),
+                network=self.network_utilization
+            )
         
         except Exception as e:
-            print(f"Error collecting system metrics: {str(e)}")
+            print(f"Error storing system metrics: {str(e)}")
     
-    @thread_safe
+    def _on_metrics_alert(self, category, message):
+        """Log alerts raised by the metrics engine"""
+        # log() posts to the dispatcher's log lane from the engine's threads
+        if self.background_monitoring and self.show_verbose_logs:
+            self.log(message, category)
+    
+    def _show_system_indicators(self, snapshot):
+        """Show CPU, memory, disk and uptime from a sampler snapshot"""
+        self.cpu_progressbar['value'] = snapshot.cpu_percent
+        self.cpu_usage_label.config(text=f"{snapshot.cpu_percent}%")
+        
+        memory_percent = snapshot.memory.percent
+        self.memory_progressbar['value'] = memory_percent
+        self.memory_usage_label.config(text=f"{memory_percent}%")
+        
+        # Disk usage is only re-read by the sampler every 10 seconds
+        if snapshot.disk_usage is not None:
+            disk_percent = snapshot.disk_usage.percent
+            self.disk_progressbar['value'] = disk_percent
+            self.disk_usage_label.config(text=f"{disk_percent}%")
+        
+        uptime_str = str(timedelta(seconds=int(snapshot.timestamp - snapshot.boot_time)))
+        self.uptime_label.config(text=f"Uptime: {uptime_str}")
+    
+    @thread_safe(coalesce=True)
     def refresh_system_indicators(self):
         """Update system indicators only (not full system info)"""
         try:
-            # Update resource usage bars only
-            cpu_percent = psutil.cpu_percent(interval=0)  # Non-blocking
-            self.cpu_progressbar['value'] = cpu_percent
-            self.cpu_usage_label.config(text=f"{cpu_percent}%")
-            
-            memory = psutil.virtual_memory()
-            memory_percent = memory.percent
-            self.memory_progressbar['value'] = memory_percent
-            self.memory_usage_label.config(text=f"{memory_percent}%")
-            
-            # Only update disk usage occasionally (expensive operation)
-            if not hasattr(self, '_last_disk_check') or time.time() - self._last_disk_check > 10:
-                try:
-                    disk = psutil.disk_usage('/')
-                    disk_percent = disk.percent
-                    self.disk_progressbar['value'] = disk_percent
-                    self.disk_usage_label.config(text=f"{disk_percent}%")
-                    self._last_disk_check = time.time()
-                except:
-                    pass
-            
-            # Update uptime occasionally
-            if not hasattr(self, '_last_uptime_check') or time.time() - self._last_uptime_check > 60:
-                try:
-                    boot_time = psutil.boot_time()
-                    uptime = time.time() - boot_time
-                    uptime_str = str(timedelta(seconds=int(uptime)))
-                    self.uptime_label.config(text=f"Uptime: {uptime_str}")
-                    self._last_uptime_check = time.time()
-                except:
-                    pass
+            # Reuse the latest snapshot instead of querying psutil again
+            snapshot = self.system_sampler.latest
+            if snapshot is not None:
+                self._show_system_indicators(snapshot)
                     
         except Exception as e:
             print(f"Error refreshing system indicators: {str(e)}")
     
-    @thread_safe
+    @thread_safe(coalesce=True)
     def refresh_system_info(self):
         """Update all system information displays (full refresh)"""
         try:
@@ -1081,7 +1126,8 @@ class SystemUtilities:
                 self.cpu_label.config(text=f"CPU: {platform.processor()}")
                 
                 # Update memory info
-                memory = psutil.virtual_memory()
+                snapshot = self.system_sampler.latest
+                memory = snapshot.memory if snapshot is not None else psutil.virtual_memory()
                 total_gb = memory.total / (1024**3)
                 self.memory_label.config(text=f"RAM: {total_gb:.2f} GB Total")
             except Exception as e:
@@ -1094,188 +1140,49 @@ class SystemUtilities:
             self.log(f"Error refreshing system info: {str(e)}", "error")
             print(f"System info refresh error: {str(e)}")
     
-    @thread_safe
-    def update_network_info(self):
-        """Update network information in the network textbox"""
+    @thread_safe(coalesce=True)
+    def update_network_info(self, snapshot):
+        """Update the network rates, interface table and process estimates"""
         try:
-            # Get network interfaces
-            interfaces = psutil.net_if_addrs()
-            
             # Only update if widget exists
-            if not hasattr(self, 'network_text') or not self.network_text.winfo_exists():
+            if not hasattr(self, 'interface_tree') or not self.interface_tree.winfo_exists():
                 return
-                
-            # Clear previous content
-            self.network_text.config(state=tk.NORMAL)
-            self.network_text.delete(1.0, tk.END)
             
-            # Get network I/O
-            net_io = psutil.net_io_counters()
-            self.network_text.insert(tk.END, f"Total Sent: {net_io.bytes_sent / (1024**2):.2f} MB\n")
-            self.network_text.insert(tk.END, f"Total Received: {net_io.bytes_recv / (1024**2):.2f} MB\n\n")
+            # The throughput engine samples on its collector thread; nothing here calls psutil
+            sample = self.throughput_engine.latest
+            if sample is None:
+                return
             
-            # Active interfaces (only show IPv4)
-            self.network_text.insert(tk.END, "Active Interfaces:\n")
-            for interface_name, interface_addresses in interfaces.items():
-                for addr in interface_addresses:
-                    if str(addr.family) == 'AddressFamily.AF_INET' and not addr.address.startswith('127.'):
-                        self.network_text.insert(tk.END, f"{interface_name}: {addr.address}\n")
+            summary = f"Down {format_rate(sample.recv_bps)}   Up {format_rate(sample.sent_bps)}"
+            if sample.connections is not None:
+                summary += f"   {sample.connections} connections"
+            summary += f"   {sparkline(self.throughput_engine.history(), 30)}"
+            self.network_summary_label.config(text=summary)
             
-            # Connection count (expensive, do less frequently)
-            if not hasattr(self, '_last_connections_check') or time.time() - self._last_connections_check > 10:
-                try:
-                    # Only count established connections to reduce resource usage
-                    connections = len([c for c in psutil.net_connections(kind='inet') 
-                                     if c.status == 'ESTABLISHED'])
-                    self.network_text.insert(tk.END, f"\nActive connections: {connections}\n")
-                    self._last_connections_check = time.time()
-                except:
-                    pass
-                
-            self.network_text.config(state=tk.DISABLED)
+            # Only changed rows and cells are touched
+            apply_to_treeview(self.interface_tree, self.interface_table.update(sample.interfaces))
+            if sample.processes is not None:
+                apply_to_treeview(self.network_process_tree, self.network_process_table.update(sample.processes))
             
         except Exception as e:
             print(f"Error updating network info: {str(e)}")
     
-    def _monitor_network_activity(self):
-        """Background thread to monitor network activity"""
+    def sort_interface_table(self, column):
+        """Sort the interface table by a column"""
+        self.interface_table.sort_by = column
         try:
-            # Initialize network stats
-            prev_net_io = psutil.net_io_counters()
-            last_check_time = time.time()
-            
-            while self.background_monitoring:
-                time.sleep(10)  # Check every 10 seconds
-                
-                # Exit if application is closing
-                if not hasattr(self, 'root') or not self.root.winfo_exists():
-                    return
-                
-                try:
-                    # Get current network stats
-                    net_io = psutil.net_io_counters()
-                    current_time = time.time()
-                    time_diff = current_time - last_check_time
-                    
-                    # Calculate data transferred since last check
-                    sent_mb = (net_io.bytes_sent - prev_net_io.bytes_sent) / (1024 * 1024)
-                    recv_mb = (net_io.bytes_recv - prev_net_io.bytes_recv) / (1024 * 1024)
-                    
-                    # Calculate rate per second
-                    sent_rate = sent_mb / time_diff
-                    recv_rate = recv_mb / time_diff
-                    
-                    # Log significant network activity to avoid flooding logs
-                    if (sent_rate > 1 or recv_rate > 1) and self.show_verbose_logs:  # Only log if more than 1MB/s
-                        # Use UI queue instead of direct UI access
-                        ui_queue.put(("log", ("network", f"Network activity: {sent_rate:.2f} MB/s upload, {recv_rate:.2f} MB/s download")))
-                    
-                    # Update previous stats
-                    prev_net_io = net_io
-                    last_check_time = current_time
-                    
-                except Exception as e:
-                    print(f"Network monitoring error: {str(e)}")
-        
+            apply_to_treeview(self.interface_tree, self.interface_table.refresh())
         except Exception as e:
-            print(f"Error in network monitoring thread: {str(e)}")
+            print(f"Error updating interface table: {e}")
     
-    def _monitor_system_performance(self):
-        """Background thread to monitor system performance"""
+    def sort_network_process_table(self, column):
+        """Sort the network process table by a column"""
+        self.network_process_table.sort_by = column
         try:
-            while self.background_monitoring:
-                time.sleep(30)  # Check less frequently - every 30 seconds
-                
-                # Exit if application is closing
-                if not hasattr(self, 'root') or not self.root.winfo_exists():
-                    return
-                
-                try:
-                    # Get system performance metrics
-                    cpu_percent = psutil.cpu_percent(interval=1)
-                    memory = psutil.virtual_memory()
-                    
-                    # Log when system is under high load
-                    if cpu_percent > 85:  # Only log higher thresholds
-                        ui_queue.put(("log", ("system", f"High CPU usage: {cpu_percent}%")))
-                    
-                    if memory.percent > 90:  # Only log higher thresholds
-                        ui_queue.put(("log", ("system", f"High memory usage: {memory.percent}%")))
-                    
-                except Exception as e:
-                    print(f"Performance monitoring error: {str(e)}")
-        
+            apply_to_treeview(self.network_process_tree, self.network_process_table.refresh())
         except Exception as e:
-            print(f"Error in performance monitoring thread: {str(e)}")
+            print(f"Error updating network process table: {e}")
     
-    def _monitor_hyperv_status(self):
-        """Background thread to monitor Hyper-V status"""
-        try:
-            # Initial delay to not overload startup
-            time.sleep(20)
-            
-            # Check if we're on Windows before continuing
-            if platform.system() != 'Windows':
-                return
-                
-            while self.background_monitoring:
-                # Check much less frequently - every 5 minutes
-                time.sleep(300)
-                
-                # Exit if application is closing
-                if not hasattr(self, 'root') or not self.root.winfo_exists():
-                    return
-                
-                try:
-                    # Check Hyper-V status using PowerShell
-                    ps_command = [
-                        "powershell",
-                        "-Command",
-                        "(Get-Service -Name 'vmms' -ErrorAction SilentlyContinue).Status"
-                    ]
-                    
-                    process = subprocess.Popen(
-                        ps_command,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                        text=True,
-                        creationflags=subprocess.CREATE_NO_WINDOW
-                    )
-                    
-                    stdout, stderr = process.communicate(timeout=10)
-                    
-                    if process.returncode == 0 and stdout.strip() == "Running":
-                        # Only check running VMs if Hyper-V service is running
-                        try:
-                            vm_command = [
-                                "powershell",
-                                "-Command",
-                                "Get-VM | Where-Object {$_.State -eq 'Running'} | Measure-Object | Select-Object -ExpandProperty Count"
-                            ]
-                            
-                            vm_process = subprocess.Popen(
-                                vm_command,
-                                stdout=subprocess.PIPE,
-                                stderr=subprocess.PIPE,
-                                text=True,
-                                creationflags=subprocess.CREATE_NO_WINDOW
-                            )
-                            
-                            vm_stdout, vm_stderr = vm_process.communicate(timeout=10)
-                            
-                            # Only log if we have running VMs
-                            if vm_process.returncode == 0 and vm_stdout.strip() and int(vm_stdout.strip()) > 0:
-                                vm_count = int(vm_stdout.strip())
-                                ui_queue.put(("log", ("hyperv", f"Running VMs: {vm_count}")))
-                        except:
-                            pass
-                
-                except Exception as e:
-                    print(f"Hyper-V monitoring error: {str(e)}")
-        
-        except Exception as e:
-            print(f"Error in Hyper-V monitoring thread: {str(e)}")
-            
     def on_tab_changed(self, event):
         """Handle tab change event"""
         tab_id = self.tabs.select()
@@ -2109,71 +2016,47 @@ class SystemUtilities:
             self.vm_tree.delete(item)
         
         try:
-            # Check if Hyper-V is installed
-            ps_check_command = [
-                "powershell",
-                "-Command",
-                "(Get-WindowsOptionalFeature -FeatureName Microsoft-Hyper-V-All -Online).State"
-            ]
-            
-            process = subprocess.Popen(
-                ps_check_command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            stdout, stderr = process.communicate(timeout=10)
+            # Both queries run on the shared PowerShell workers (no cold start)
+            pool = get_default_pool()
             
-            if process.returncode != 0 or stdout.strip() != "Enabled":
+            # Check if Hyper-V is installed
+            try:
+                state = pool.run_text(
+                    "(Get-WindowsOptionalFeature -FeatureName Microsoft-Hyper-V-All -Online).State",
+                    timeout=10
+                )
+            except PowerShellError:
+                state = None
+            
+            if state != "Enabled":
                 self.vm_tree.insert('', 'end', text="Hyper-V not installed", values=(
                     "N/A", "N/A", "N/A"
                 ))
                 return
             
-            # Get VM list with PowerShell
-            ps_command = [
-                "powershell",
-                "-Command",
-                "Get-VM | Select-Object Name, State, MemoryAssigned, ProcessorCount | ConvertTo-Csv -NoTypeInformation"
-            ]
-            
-            process = subprocess.Popen(
-                ps_command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            stdout, stderr = process.communicate(timeout=10)
-            
-            if process.returncode != 0 or not stdout.strip():
+            # Get VM list as objects; the state enum is converted to its name
+            try:
+                vms = pool.run(
+                    "Get-VM | Select-Object Name, @{Name='State'; Expression={\"$($_.State)\"}}, "
+                    "MemoryAssigned, ProcessorCount",
+                    timeout=10
+                )
+            except PowerShellError:
+                vms = []
+            
+            if not vms:
                 self.vm_tree.insert('', 'end', text="No VMs found", values=(
                     "N/A", "N/A", "N/A"
                 ))
                 return
             
-            # Parse CSV output
-            import csv
-            from io import StringIO
-            
-            csv_reader = csv.reader(StringIO(stdout))
-            next(csv_reader)  # Skip header row
-            
-            for row in csv_reader:
-                if len(row) >= 4:
-                    name = row[0]
-                    state = row[1]
-                    memory = int(row[2]) / (1024**3) if row[2].isdigit() else 0
-                    cpu = row[3]
-                    
-                    self.vm_tree.insert('', 'end', text=name, values=(
-                        state,
-                        f"{memory:.2f} GB",
-                        cpu
-                    ))
+            for vm in vms:
+                memory = (vm.get('MemoryAssigned') or 0) / (1024**3)
+                self.vm_tree.insert('', 'end', text=vm.get('Name', ''), values=(
+                    vm.get('State', ''),
+                    f"{memory:.2f} GB",
+                    vm.get('ProcessorCount', '')
+                ))
             
             self.log("VM list updated", "success")
             